@@ -7,7 +7,8 @@ from .models import (
     TrainingNote, CircuitTraining, CircuitSong, EventPhoto,
     EventReaction, PaymentStatus, GlossaryTerm,
     GuideVideo, RulesDocument, EquipmentItem, UserEquipment,
-    PhotoAlbum, SubAlbum, PhotoLike, News, NewsRead, Badge
+    PhotoAlbum, SubAlbum, PhotoLike, News, NewsRead, Badge, FencerStatsSnapshot,
+    FencerRating, FencerRatingHistory, FencerSeasonRollup, ClubSeasonRollup
 )
 
 # Ensure User model is loaded before admin tries to reference it
@@ -170,6 +171,74 @@ class EventParticipationAdmin(admin.ModelAdmin):
     get_fencer_name.short_description = 'Šermíř'
 
 
+@admin.register(FencerStatsSnapshot)
+class FencerStatsSnapshotAdmin(admin.ModelAdmin):
+    """Read-only: rows are maintained from EventParticipation (rebuild_fencer_stats)."""
+    list_display = ['fencer', 'event_type', 'events_count', 'wins', 'losses', 'best_percentile', 'average_percentile', 'updated_at']
+    list_filter = ['event_type']
+    search_fields = ['fencer__first_name', 'fencer__last_name']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FencerRating)
+class FencerRatingAdmin(admin.ModelAdmin):
+    """Read-only: maintained by fencers.ratings (rebuild_ratings)."""
+    list_display = ['fencer', 'rating', 'deviation', 'events_count', 'last_event_date', 'updated_at']
+    ordering = ['-rating']
+    search_fields = ['fencer__first_name', 'fencer__last_name']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FencerRatingHistory)
+class FencerRatingHistoryAdmin(admin.ModelAdmin):
+    list_display = ['fencer', 'event', 'performance', 'rating_before', 'rating_after', 'deviation_after']
+    list_select_related = ['fencer', 'event']
+    search_fields = ['fencer__first_name', 'fencer__last_name', 'event__title']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FencerSeasonRollup)
+class FencerSeasonRollupAdmin(admin.ModelAdmin):
+    """Read-only: maintained by fencers.season_rollups (rebuild_season_rollups)."""
+    list_display = ['fencer', 'period', 'period_start', 'event_type', 'gender', 'participations', 'wins', 'losses', 'points']
+    list_filter = ['period', 'event_type', 'gender', 'season']
+    search_fields = ['fencer__first_name', 'fencer__last_name']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ClubSeasonRollup)
+class ClubSeasonRollupAdmin(admin.ModelAdmin):
+    """Read-only: maintained by fencers.season_rollups (rebuild_season_rollups)."""
+    list_display = ['club', 'period', 'period_start', 'event_type', 'gender', 'participations', 'events_count', 'points']
+    list_filter = ['period', 'event_type', 'gender', 'season', 'club']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(TrainingNote)
 class TrainingNoteAdmin(admin.ModelAdmin):
     list_display = ['get_fencer_name', 'date', 'created_at']
@@ -216,9 +285,10 @@ class SubAlbumAdmin(admin.ModelAdmin):
 
 @admin.register(EventPhoto)
 class EventPhotoAdmin(admin.ModelAdmin):
-    list_display = ['title', 'event_date', 'uploaded_by', 'is_featured', 'subalbum']
-    list_filter = ['is_featured', 'event_date', 'uploaded_at']
+    list_display = ['title', 'event_date', 'uploaded_by', 'is_featured', 'subalbum', 'like_count', 'stored_bytes']
+    list_filter = ['is_featured', 'event_date', 'uploaded_at', ('duplicate_of', admin.EmptyFieldListFilter)]
     search_fields = ['title', 'description', 'tags_search']
+    raw_id_fields = ['duplicate_of']
 
 
 @admin.register(PhotoLike)
@@ -0,0 +1,39 @@
+"""Work deferred until the current transaction commits, merged per transaction.
+
+Signal handlers fire once per saved row. An import that saves hundreds of
+participations in one transaction should still refresh each derived table
+once, so handlers hand their piece of work to `on_commit_merged`. It merges
+the work into what the transaction has already queued under the same key
+and registers a single on_commit callback for it.
+"""
+
+from django.db import transaction
+
+_PENDING_ATTR = "_fencers_deferred"
+
+
+def on_commit_merged(key, value, merge, run, using=None):
+    """Run `run(value)` after commit, merging `value` into work already queued under `key`.
+
+    `merge(queued, value)` returns the combined work. Outside a transaction
+    (autocommit) the work runs immediately, like transaction.on_commit.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        run(value)
+        return
+    pending = connection.__dict__.setdefault(_PENDING_ATTR, {})
+    entry = pending.get(key)
+    # A rolled-back savepoint drops its callbacks; the entry then no longer counts.
+    if entry is not None and any(item[1] is entry["flush"] for item in connection.run_on_commit):
+        entry["value"] = merge(entry["value"], value)
+        return
+
+    def flush():
+        current = pending.get(key)
+        if current is not None and current["flush"] is flush:
+            del pending[key]
+            run(current["value"])
+
+    pending[key] = {"value": value, "flush": flush}
+    transaction.on_commit(flush, using=using)
@@ -0,0 +1,111 @@
+"""FencerStatsSnapshot maintenance: per-fencer totals split by event type.
+
+The profile page and the member popup read one snapshot row instead of
+aggregating participations on every request. A fencer's rows are recomputed
+with one grouped query whenever one of their participations (or an event
+they took part in) changes; `rebuild_fencer_stats` redoes everyone.
+"""
+
+from django.db import transaction
+from django.db.models import Avg, Count, Min, Sum
+from django.db.models.functions import Coalesce
+
+from .deferred import on_commit_merged
+
+STAT_FIELDS = (
+    "events_count",
+    "wins",
+    "losses",
+    "touches_scored",
+    "touches_received",
+    "best_percentile",
+    "average_percentile",
+)
+
+
+def _compute(participations):
+    """Snapshot rows (unsaved) grouped from an EventParticipation queryset."""
+    from .models import FencerStatsSnapshot, round_percentile
+
+    rows = (
+        participations.values("fencer_id", "event__event_type")
+        .annotate(
+            n=Count("id"),
+            sum_wins=Coalesce(Sum("wins"), 0),
+            sum_losses=Coalesce(Sum("losses"), 0),
+            sum_scored=Coalesce(Sum("touches_scored"), 0),
+            sum_received=Coalesce(Sum("touches_received"), 0),
+            best=Min("percentile"),
+            average=Avg("percentile"),
+        )
+        .order_by()
+    )
+    return [
+        FencerStatsSnapshot(
+            fencer_id=row["fencer_id"],
+            event_type=row["event__event_type"],
+            events_count=row["n"],
+            wins=row["sum_wins"],
+            losses=row["sum_losses"],
+            touches_scored=row["sum_scored"],
+            touches_received=row["sum_received"],
+            best_percentile=round_percentile(row["best"]),
+            average_percentile=round_percentile(row["average"]),
+        )
+        for row in rows
+    ]
+
+
+def _store(snapshots):
+    from .models import FencerStatsSnapshot
+
+    FencerStatsSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["fencer", "event_type"],
+        update_fields=[*STAT_FIELDS, "updated_at"],
+    )
+
+
+def refresh_fencer_stats(fencer_ids):
+    """Recompute the snapshot rows of the given fencers."""
+    from .models import EventParticipation, FencerStatsSnapshot
+
+    fencer_ids = {fencer_id for fencer_id in fencer_ids if fencer_id}
+    if not fencer_ids:
+        return
+    snapshots = _compute(EventParticipation.objects.filter(fencer_id__in=fencer_ids))
+    with transaction.atomic():
+        keep = {(s.fencer_id, s.event_type) for s in snapshots}
+        stale = [
+            pk
+            for pk, fencer_id, event_type in FencerStatsSnapshot.objects.filter(
+                fencer_id__in=fencer_ids
+            ).values_list("pk", "fencer_id", "event_type")
+            if (fencer_id, event_type) not in keep
+        ]
+        if stale:
+            FencerStatsSnapshot.objects.filter(pk__in=stale).delete()
+        _store(snapshots)
+
+
+def schedule_fencer_stats_refresh(fencer_ids):
+    """Refresh after the current transaction commits (immediately in autocommit).
+
+    All fencers queued in one transaction are refreshed together, once.
+    """
+    fencer_ids = set(fencer_ids)
+    if fencer_ids:
+        on_commit_merged("fencer_stats", fencer_ids, set.union, refresh_fencer_stats)
+
+
+def rebuild_fencer_stats():
+    """Recompute every snapshot row; returns the number of rows stored."""
+    from .models import EventParticipation, FencerStatsSnapshot
+
+    snapshots = _compute(EventParticipation.objects.all())
+    with transaction.atomic():
+        FencerStatsSnapshot.objects.all().delete()
+        _store(snapshots)
+    return len(snapshots)
@@ -0,0 +1,74 @@
+"""Fill EventPhoto.captured_at / width / height from EXIF for older photos."""
+
+from django.core.management.base import BaseCommand
+
+from fencers.models import EventPhoto
+from fencers.photo_variants import read_capture_metadata
+from fencers.r2_storage import (
+    object_key_from_url,
+    r2_ready,
+    read_object_bytes,
+    read_object_head_bytes,
+)
+
+# JPEG keeps EXIF in APP1 (max 64 KB) before the image data, so the header
+# is enough; the full object is only fetched if parsing the head fails.
+HEADER_BYTES = 128 * 1024
+
+
+class Command(BaseCommand):
+    help = "Extract capture time and dimensions from EXIF for photos that do not have them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print actions only.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-read metadata even for photos that already have dimensions.",
+        )
+
+    def handle(self, *args, **options):
+        photos = EventPhoto.objects.order_by("id").only("id", "photo", "remote_image_url")
+        if not options["force"]:
+            photos = photos.filter(width__isnull=True)
+
+        use_r2 = r2_ready()
+        done = skipped = failed = with_time = 0
+        for photo in photos.iterator():
+            object_key = object_key_from_url(photo.remote_image_url)
+            if (object_key and not use_r2) or (not object_key and not photo.photo):
+                skipped += 1
+                continue
+            if options["dry_run"]:
+                self.stdout.write(f"[DRY] would read metadata of photo {photo.id}")
+                done += 1
+                continue
+            try:
+                metadata = self._read(photo, object_key)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Photo {photo.id}: {exc}")
+                continue
+            EventPhoto.objects.filter(pk=photo.pk).update(**metadata)
+            done += 1
+            with_time += metadata["captured_at"] is not None
+
+        self.stdout.write(self.style.SUCCESS(f"Photos updated: {done} (with capture time: {with_time})"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped (no readable source): {skipped}"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Failed: {failed}"))
+
+    def _read(self, photo, object_key):
+        if not object_key:
+            with photo.photo.open("rb") as fp:
+                return read_capture_metadata(fp)
+        head = read_object_head_bytes(object_key, HEADER_BYTES)
+        try:
+            return read_capture_metadata(head)
+        except Exception:
+            return read_capture_metadata(read_object_bytes(object_key))
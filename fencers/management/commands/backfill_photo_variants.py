@@ -0,0 +1,126 @@
+"""Render thumbnail/medium variants and inline placeholders for EventPhoto rows missing them."""
+
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from fencers.models import EventPhoto, PhotoAlbum
+from fencers.photo_variants import VARIANT_EXTENSION, render_placeholder, render_variants
+from fencers.r2_storage import (
+    format_r2_call_stats,
+    object_key_from_url,
+    r2_ready,
+    read_object_bytes,
+    upload_event_photo_variants,
+)
+
+
+def _local_variant_urls(photo, data: bytes) -> dict:
+    """Variants of a locally stored photo go next to it in default_storage."""
+    stem, _ = os.path.splitext(photo.photo.name)
+    urls = {}
+    for name, variant in render_variants(data).items():
+        saved = default_storage.save(f"{stem}__{name}{VARIANT_EXTENSION}", ContentFile(variant))
+        urls[name] = default_storage.url(saved)
+    return urls
+
+
+def _read_local(photo) -> bytes:
+    with photo.photo.open("rb") as fp:
+        return fp.read()
+
+
+class Command(BaseCommand):
+    help = "Generate variants and placeholders for existing event photos, and album cover thumbnails."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print actions only.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants even for photos that already have them.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        photos = EventPhoto.objects.order_by("id")
+        if not options["force"]:
+            photos = photos.filter(Q(thumbnail_url="") | Q(placeholder=""))
+
+        use_r2 = r2_ready()
+        done = 0
+        skipped = 0
+        failed = 0
+        for photo in list(photos):
+            object_key = object_key_from_url(photo.remote_image_url)
+            if not object_key and not photo.photo:
+                skipped += 1
+                continue
+            if object_key and not use_r2:
+                skipped += 1
+                continue
+            needs_variants = options["force"] or not photo.thumbnail_url
+            if dry_run:
+                what = "variants" if needs_variants else "placeholder"
+                self.stdout.write(f"[DRY] would render {what} for photo {photo.id}")
+                done += 1
+                continue
+            try:
+                updates = {}
+                if needs_variants:
+                    data = read_object_bytes(object_key) if object_key else _read_local(photo)
+                    if object_key:
+                        urls = upload_event_photo_variants(file_obj=data, object_key=object_key)
+                    else:
+                        urls = _local_variant_urls(photo, data)
+                    updates["thumbnail_url"] = urls.get("thumb", "")
+                    updates["medium_url"] = urls.get("medium", "")
+                else:
+                    # Only the placeholder is missing: the small thumbnail is enough.
+                    thumb_key = object_key_from_url(photo.thumbnail_url)
+                    if thumb_key and use_r2:
+                        data = read_object_bytes(thumb_key)
+                    else:
+                        data = read_object_bytes(object_key) if object_key else _read_local(photo)
+                updates["placeholder"] = render_placeholder(data)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Photo {photo.id}: {exc}")
+                continue
+            EventPhoto.objects.filter(pk=photo.pk).update(**updates)
+            done += 1
+
+        covers = 0
+        albums = PhotoAlbum.objects.exclude(cover_photo="").exclude(cover_photo=None).order_by("id")
+        if not options["force"]:
+            albums = albums.filter(cover_thumbnail__in=["", None])
+        for album in albums:
+            if dry_run:
+                self.stdout.write(f"[DRY] would render cover thumbnail for album {album.id}")
+                covers += 1
+                continue
+            try:
+                album.render_cover_thumbnail()
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Album {album.id} cover: {exc}")
+                continue
+            covers += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Photos with new variants/placeholders: {done}"))
+        self.stdout.write(self.style.SUCCESS(f"Album cover thumbnails: {covers}"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped (no readable source): {skipped}"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Failed: {failed}"))
+        for line in format_r2_call_stats():
+            self.stdout.write(f"R2 {line}")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Dry-run: no variants written."))
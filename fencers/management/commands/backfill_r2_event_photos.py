@@ -1,11 +1,34 @@
 """Create EventPhoto rows for objects in R2 that have no matching DB row yet."""
 
+import json
 import os
+from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
 from fencers.models import EventPhoto, SubAlbum
-from fencers.r2_storage import list_subalbum_images, r2_ready
+from fencers.r2_storage import (
+    EVENT_PHOTOS_PREFIX,
+    build_object_url,
+    build_subalbum_prefix,
+    is_variant_key,
+    iter_object_key_pages,
+    r2_ready,
+)
+
+# Keeps SQL IN (...) lists well below SQLite's variable limit.
+URL_LOOKUP_CHUNK = 500
+
+
+def _known_urls(urls):
+    known = set()
+    urls = list(urls)
+    for i in range(0, len(urls), URL_LOOKUP_CHUNK):
+        known.update(
+            EventPhoto.objects.filter(remote_image_url__in=urls[i:i + URL_LOOKUP_CHUNK])
+            .values_list("remote_image_url", flat=True)
+        )
+    return known
 
 
 class Command(BaseCommand):
@@ -17,47 +40,130 @@ class Command(BaseCommand):
             action="store_true",
             help="Print actions only.",
         )
+        parser.add_argument(
+            "--bucket-wide",
+            action="store_true",
+            help=f"List everything under {EVENT_PHOTOS_PREFIX} once instead of once per subalbum.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="JSON file recording progress; an interrupted run resumes from it. "
+                 "Deleted after a complete run.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per bulk_create batch (default 500).",
+        )
 
     def handle(self, *args, **options):
         if not r2_ready():
             raise CommandError("R2 is not configured.")
 
-        dry_run = options["dry_run"]
-        created = 0
-        for subalbum in SubAlbum.objects.select_related(
-            "album__event", "created_by"
-        ).order_by("id"):
-            event = subalbum.album.event
-            owner = subalbum.created_by
+        self.dry_run = options["dry_run"]
+        self.batch_size = options["batch_size"]
+        mode = "bucket" if options["bucket_wide"] else "subalbum"
+        checkpoint_path = Path(options["checkpoint"]) if options["checkpoint"] else None
+        state = self._load_checkpoint(checkpoint_path, mode)
+
+        subalbums = list(SubAlbum.objects.select_related("album__event", "created_by").order_by("id"))
+        self.created = 0
+        if mode == "bucket":
+            self._backfill_bucket_wide(subalbums, state, checkpoint_path)
+        else:
+            self._backfill_per_subalbum(subalbums, state, checkpoint_path)
+
+        if checkpoint_path and not self.dry_run and checkpoint_path.exists():
+            checkpoint_path.unlink()
+        self.stdout.write(self.style.SUCCESS(f"Created EventPhoto rows: {self.created}"))
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING("Dry-run: no rows written."))
+
+    def _backfill_per_subalbum(self, subalbums, state, checkpoint_path):
+        done = set(state.get("done_subalbums", []))
+        for subalbum in subalbums:
+            if subalbum.id in done:
+                continue
+            prefix = build_subalbum_prefix(subalbum.album.event, subalbum, subalbum.created_by)
             try:
-                objects = list_subalbum_images(
-                    event=event, subalbum=subalbum, owner_profile=owner
-                )
+                keys = [key for page in iter_object_key_pages(prefix) for key in page]
             except Exception as exc:
                 self.stderr.write(f"Subalbum {subalbum.id}: list failed: {exc}")
                 continue
-            for item in objects:
-                url = item["url"]
-                key = item["key"]
-                if EventPhoto.objects.filter(remote_image_url=url).exists():
-                    continue
-                filename = os.path.basename(key)
-                stem, _ = os.path.splitext(filename)
-                title = (stem or "foto")[:200]
-                if dry_run:
-                    self.stdout.write(f"[DRY] would create: {key}")
-                    created += 1
-                    continue
-                EventPhoto.objects.create(
-                    title=title,
-                    description="",
-                    remote_image_url=url,
-                    event_date=event.date,
-                    uploaded_by=owner,
-                    subalbum=subalbum,
-                )
-                created += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Created EventPhoto rows: {created}"))
-        if dry_run:
-            self.stdout.write(self.style.WARNING("Dry-run: no rows written."))
+            self._create_missing([(subalbum, key) for key in keys])
+            done.add(subalbum.id)
+            self._save_checkpoint(checkpoint_path, {"mode": "subalbum", "done_subalbums": sorted(done)})
+
+    def _backfill_bucket_wide(self, subalbums, state, checkpoint_path):
+        by_prefix = {
+            build_subalbum_prefix(s.album.event, s, s.created_by): s for s in subalbums
+        }
+        unmatched = 0
+        start_after = state.get("start_after", "")
+        if start_after:
+            self.stdout.write(f"Resuming after {start_after}")
+        for keys in iter_object_key_pages(EVENT_PHOTOS_PREFIX, start_after=start_after):
+            items = []
+            for key in keys:
+                subalbum = by_prefix.get(key.rsplit("/", 1)[0] + "/")
+                if subalbum is None:
+                    unmatched += 1
+                else:
+                    items.append((subalbum, key))
+            self._create_missing(items)
+            self._save_checkpoint(checkpoint_path, {"mode": "bucket", "start_after": keys[-1]})
+        if unmatched:
+            self.stdout.write(self.style.WARNING(f"Objects outside any known subalbum: {unmatched}"))
+
+    def _create_missing(self, items):
+        """Diff (subalbum, key) pairs against existing rows and bulk_create the rest."""
+        wanted = {}
+        for subalbum, key in items:
+            if not is_variant_key(key):
+                wanted[build_object_url(key)] = (subalbum, key)
+        if not wanted:
+            return
+        known = _known_urls(wanted)
+        missing = [url for url in wanted if url not in known]
+        if not missing:
+            return
+        rows = []
+        for url in missing:
+            subalbum, key = wanted[url]
+            if self.dry_run:
+                self.stdout.write(f"[DRY] would create: {key}")
+                continue
+            stem, _ = os.path.splitext(os.path.basename(key))
+            rows.append(EventPhoto(
+                title=(stem or "foto")[:200],
+                description="",
+                remote_image_url=url,
+                event_date=subalbum.album.event.date,
+                uploaded_by=subalbum.created_by,
+                subalbum=subalbum,
+            ))
+        if rows:
+            EventPhoto.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.created += len(missing)
+
+    def _load_checkpoint(self, path, mode):
+        if not path or not path.exists():
+            return {}
+        try:
+            state = json.loads(path.read_text())
+        except ValueError:
+            raise CommandError(f"Unreadable checkpoint file: {path}")
+        if state.get("mode") != mode:
+            raise CommandError(
+                f"Checkpoint {path} was written by a {state.get('mode')!r} run; "
+                "rerun in that mode or delete the file."
+            )
+        return state
+
+    def _save_checkpoint(self, path, state):
+        if not path or self.dry_run:
+            return
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
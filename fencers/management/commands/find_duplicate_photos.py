@@ -0,0 +1,92 @@
+"""List clusters of near-duplicate event photos within each album."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from fencers.models import EventPhoto
+from fencers.photo_duplicates import duplicate_clusters, photo_dhash
+from fencers.r2_storage import object_key_from_url, r2_ready, read_object_bytes
+
+
+def _photo_bytes(photo, use_r2):
+    object_key = object_key_from_url(photo.remote_image_url)
+    if object_key:
+        return read_object_bytes(object_key) if use_r2 else None
+    if photo.photo:
+        with photo.photo.open("rb") as fp:
+            return fp.read()
+    return None
+
+
+class Command(BaseCommand):
+    help = "Find near-duplicate photos (perceptual hash) inside each album."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--compute-missing",
+            action="store_true",
+            help="First hash photos uploaded before hashes were stored (downloads them).",
+        )
+        parser.add_argument(
+            "--max-distance",
+            type=int,
+            default=settings.PHOTO_DUPLICATE_MAX_DISTANCE,
+            help="Max differing bits between hashes (default: PHOTO_DUPLICATE_MAX_DISTANCE).",
+        )
+        parser.add_argument(
+            "--flag",
+            action="store_true",
+            help="Point duplicate_of of every later photo in a cluster at its oldest photo.",
+        )
+
+    def handle(self, *args, **options):
+        if options["compute_missing"]:
+            self._compute_missing()
+
+        photos = (
+            EventPhoto.objects.exclude(perceptual_hash="")
+            .values_list("id", "perceptual_hash", "subalbum__album_id")
+            .order_by("id")
+        )
+        by_album = {}
+        for photo_id, value, album_id in photos:
+            by_album.setdefault(album_id, {})[photo_id] = value
+
+        clusters = []
+        for album_id, hashes in by_album.items():
+            for cluster in duplicate_clusters(hashes, options["max_distance"]):
+                clusters.append((album_id, cluster))
+                label = f"album {album_id}" if album_id else "no album"
+                self.stdout.write(f"{label}: photos {', '.join(str(i) for i in cluster)}")
+
+        duplicates = sum(len(cluster) - 1 for _, cluster in clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f"Clusters: {len(clusters)}, redundant photos: {duplicates}"
+        ))
+
+        if options["flag"] and clusters:
+            flagged = 0
+            for _, cluster in clusters:
+                oldest, rest = cluster[0], cluster[1:]
+                flagged += EventPhoto.objects.filter(id__in=rest).update(duplicate_of_id=oldest)
+            self.stdout.write(self.style.SUCCESS(f"Flagged photos: {flagged}"))
+
+    def _compute_missing(self):
+        use_r2 = r2_ready()
+        hashed = 0
+        skipped = 0
+        for photo in EventPhoto.objects.filter(perceptual_hash="").order_by("id").iterator():
+            try:
+                data = _photo_bytes(photo, use_r2)
+                value = photo_dhash(data) if data else ""
+            except Exception as exc:
+                self.stderr.write(f"Photo {photo.id}: {exc}")
+                value = ""
+            if not value:
+                skipped += 1
+                continue
+            EventPhoto.objects.filter(pk=photo.pk).update(perceptual_hash=value)
+            hashed += 1
+        self.stdout.write(f"Hashed photos: {hashed}")
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped (no readable source): {skipped}"))
@@ -1,6 +1,10 @@
+import hashlib
+import json
 import mimetypes
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from django.conf import settings
@@ -15,7 +19,7 @@ from fencers.models import (
     PhotoAlbum,
     RulesDocument,
 )
-from fencers.r2_storage import get_r2_client, r2_ready
+from fencers.r2_storage import format_r2_call_stats, get_r2_client, r2_ready
 
 
 def _slug_part(value: str) -> str:
@@ -25,15 +29,66 @@ def _slug_part(value: str) -> str:
     return value or "unknown"
 
 
-def _upload_file(client, src_path: Path, key: str) -> None:
-    content_type = mimetypes.guess_type(str(src_path))[0] or "application/octet-stream"
+MB = 1024 * 1024
+DEFAULT_MANIFEST = ".r2_media_manifest.json"
+
+
+def _file_checksum(src_path: Path) -> str:
+    digest = hashlib.sha256()
     with src_path.open("rb") as fp:
-        client.put_object(
-            Bucket=settings.R2_BUCKET_NAME,
-            Key=key,
-            Body=fp,
-            ContentType=content_type,
-        )
+        for chunk in iter(lambda: fp.read(MB), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _upload_file(client, src_path: Path, key: str, transfer_config) -> None:
+    """upload_file switches to a multipart upload above the transfer threshold."""
+    content_type = mimetypes.guess_type(str(src_path))[0] or "application/octet-stream"
+    client.upload_file(
+        str(src_path),
+        settings.R2_BUCKET_NAME,
+        key,
+        ExtraArgs={"ContentType": content_type},
+        Config=transfer_config,
+    )
+
+
+class Manifest:
+    """What was uploaded where: {key: {"src", "size", "mtime", "sha256"}}, stored as JSON."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text())
+            except ValueError:
+                raise CommandError(f"Unreadable manifest: {path}")
+
+    def is_current(self, key: str, src_rel: str, src_path: Path, stat) -> bool:
+        """Unchanged size+mtime is trusted; a touched file is compared by checksum."""
+        entry = self.entries.get(key)
+        if not entry or entry.get("src") != src_rel or entry.get("size") != stat.st_size:
+            return False
+        if entry.get("mtime") == stat.st_mtime:
+            return True
+        if entry.get("sha256") == _file_checksum(src_path):
+            entry["mtime"] = stat.st_mtime
+            return True
+        return False
+
+    def record(self, key: str, src_rel: str, stat, checksum: str) -> None:
+        self.entries[key] = {
+            "src": src_rel,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": checksum,
+        }
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=0, sort_keys=True))
+        os.replace(tmp, self.path)
 
 
 class Command(BaseCommand):
@@ -45,6 +100,28 @@ class Command(BaseCommand):
             action="store_true",
             help="Only print what would be uploaded.",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.R2_UPLOAD_WORKERS,
+            help="Parallel file uploads (default: R2_UPLOAD_WORKERS).",
+        )
+        parser.add_argument(
+            "--manifest",
+            default=str(Path(settings.BASE_DIR) / DEFAULT_MANIFEST),
+            help=f"Manifest of uploaded files; unchanged files are skipped (default: BASE_DIR/{DEFAULT_MANIFEST}).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Upload every file even if the manifest says it is unchanged.",
+        )
+        parser.add_argument(
+            "--multipart-threshold-mb",
+            type=int,
+            default=16,
+            help="Files larger than this are sent as multipart uploads (default 16).",
+        )
 
     def handle(self, *args, **options):
         if not r2_ready():
@@ -54,14 +131,13 @@ class Command(BaseCommand):
         if not media_root.exists():
             raise CommandError(f"MEDIA_ROOT does not exist: {media_root}")
 
-        client = get_r2_client()
         dry_run = options["dry_run"]
-        uploaded = 0
-        failed = 0
+        manifest_path = Path(options["manifest"]).resolve()
+        manifest = Manifest(manifest_path)
+        jobs = []
         seen_rel_paths = set()
 
         def process(src_rel_path: str, target_key: str):
-            nonlocal uploaded, failed
             if not src_rel_path:
                 return
             src_rel_path = str(src_rel_path).replace("\\", "/")
@@ -69,16 +145,7 @@ class Command(BaseCommand):
             if not src_path.exists() or not src_path.is_file():
                 return
             seen_rel_paths.add(src_rel_path)
-            if dry_run:
-                self.stdout.write(f"[DRY] {src_rel_path} -> {target_key}")
-                uploaded += 1
-                return
-            try:
-                _upload_file(client, src_path, target_key)
-                uploaded += 1
-            except Exception as exc:
-                failed += 1
-                self.stderr.write(f"[FAIL] {src_rel_path} -> {target_key}: {exc}")
+            jobs.append((src_rel_path, src_path, target_key))
 
         # Profile photos
         for p in FencerProfile.objects.filter(profile_photo__isnull=False).exclude(profile_photo=""):
@@ -99,6 +166,7 @@ class Command(BaseCommand):
             "subalbum",
             "subalbum__album",
             "subalbum__album__event",
+            "subalbum__created_by",
             "uploaded_by",
         ):
             rel = photo.photo.name
@@ -155,17 +223,91 @@ class Command(BaseCommand):
 
         # Any remaining file under media (unreferenced)
         for path in media_root.rglob("*"):
-            if not path.is_file():
+            if not path.is_file() or path.resolve() in (manifest_path, manifest_path.with_suffix(manifest_path.suffix + ".tmp")):
                 continue
             rel = path.relative_to(media_root).as_posix()
             if rel in seen_rel_paths:
                 continue
             process(rel, f"legacy_media/{rel}")
 
+        pending = []
+        skipped = 0
+        for src_rel_path, src_path, key in jobs:
+            stat = src_path.stat()
+            if not options["force"] and manifest.is_current(key, src_rel_path, src_path, stat):
+                skipped += 1
+            else:
+                pending.append((src_rel_path, src_path, key, stat))
+
+        if dry_run:
+            for src_rel_path, _path, key, _stat in pending:
+                self.stdout.write(f"[DRY] {src_rel_path} -> {key}")
+            uploaded, failed, total_bytes, elapsed = 0, 0, 0, 0.0
+        else:
+            uploaded, failed, total_bytes, elapsed = self._upload(pending, manifest, options)
+            # Also keeps mtimes refreshed by checksum matches in is_current().
+            manifest.save()
+
         self.stdout.write("")
-        self.stdout.write(self.style.SUCCESS(f"Uploaded: {uploaded}"))
+        if dry_run:
+            self.stdout.write(f"Would upload: {len(pending)}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Uploaded: {uploaded}"))
+        self.stdout.write(f"Unchanged (skipped via manifest): {skipped}")
         self.stdout.write(self.style.WARNING(f"Failed: {failed}"))
+        if uploaded and elapsed:
+            self.stdout.write(
+                f"Transferred {total_bytes / MB:.1f} MB in {elapsed:.1f} s "
+                f"({total_bytes / MB / elapsed:.2f} MB/s)"
+            )
+        for line in format_r2_call_stats():
+            self.stdout.write(f"R2 {line}")
         if dry_run:
             self.stdout.write(self.style.WARNING("Dry-run mode: no files uploaded."))
         if failed:
             raise CommandError("Some uploads failed.")
+
+    def _upload(self, pending, manifest, options):
+        from boto3.s3.transfer import TransferConfig
+
+        client = get_r2_client()
+        workers = max(1, options["workers"])
+        # Parts of one multipart upload share the client pool with the other workers.
+        transfer_config = TransferConfig(
+            multipart_threshold=options["multipart_threshold_mb"] * MB,
+            multipart_chunksize=8 * MB,
+            max_concurrency=max(1, settings.R2_MAX_POOL_CONNECTIONS // workers),
+        )
+
+        def upload(job):
+            src_rel_path, src_path, key, stat = job
+            checksum = _file_checksum(src_path)
+            _upload_file(client, src_path, key, transfer_config)
+            return checksum
+
+        uploaded = failed = done_bytes = 0
+        total = len(pending)
+        total_bytes = sum(job[3].st_size for job in pending)
+        started = last_report = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(upload, job): job for job in pending}
+            for i, future in enumerate(as_completed(futures), start=1):
+                src_rel_path, _path, key, stat = futures[future]
+                try:
+                    manifest.record(key, src_rel_path, stat, future.result())
+                    uploaded += 1
+                    done_bytes += stat.st_size
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"[FAIL] {src_rel_path} -> {key}: {exc}")
+                now = time.monotonic()
+                if now - last_report >= 5 or i == total:
+                    last_report = now
+                    # Saving with the progress line bounds the work lost to an interruption.
+                    manifest.save()
+                    elapsed = max(now - started, 1e-6)
+                    self.stdout.write(
+                        f"[{i}/{total}] {done_bytes / MB:.1f}/{total_bytes / MB:.1f} MB, "
+                        f"{done_bytes / MB / elapsed:.2f} MB/s, {uploaded / elapsed:.1f} files/s"
+                    )
+        return uploaded, failed, done_bytes, time.monotonic() - started
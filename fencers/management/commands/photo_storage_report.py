@@ -0,0 +1,35 @@
+"""Report how much storage the upload-time photo normalization saves."""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from fencers.models import EventPhoto
+
+
+def _mb(value) -> str:
+    return f"{(value or 0) / (1024 * 1024):.1f} MB"
+
+
+class Command(BaseCommand):
+    help = "Sum original vs. stored bytes of event photos uploaded with size tracking."
+
+    def handle(self, *args, **options):
+        totals = EventPhoto.objects.filter(original_bytes__isnull=False).aggregate(
+            photos=Count("id"),
+            original=Sum("original_bytes"),
+            stored=Sum("stored_bytes"),
+        )
+        untracked = EventPhoto.objects.filter(original_bytes__isnull=True).count()
+
+        self.stdout.write(f"Photos with size data: {totals['photos']}")
+        if untracked:
+            self.stdout.write(f"Photos without size data (older uploads): {untracked}")
+        if not totals["photos"]:
+            return
+        original = totals["original"] or 0
+        stored = totals["stored"] or 0
+        saved = original - stored
+        ratio = saved * 100 / original if original else 0
+        self.stdout.write(f"Uploaded: {_mb(original)}")
+        self.stdout.write(f"Stored:   {_mb(stored)}")
+        self.stdout.write(self.style.SUCCESS(f"Saved:    {_mb(saved)} ({ratio:.1f} %)"))
@@ -0,0 +1,13 @@
+"""Recompute every FencerStatsSnapshot row from EventParticipation."""
+
+from django.core.management.base import BaseCommand
+
+from fencers.fencer_stats import rebuild_fencer_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-fencer statistics snapshots (e.g. after bulk edits that skip signals)."
+
+    def handle(self, *args, **options):
+        stored = rebuild_fencer_stats()
+        self.stdout.write(self.style.SUCCESS(f"Stored statistics rows: {stored}"))
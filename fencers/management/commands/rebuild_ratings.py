@@ -0,0 +1,13 @@
+"""Replay every rated event and rebuild FencerRating and its history."""
+
+from django.core.management.base import BaseCommand
+
+from fencers.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Rebuild club ratings from all event results (deterministic; e.g. after bulk edits that skip signals)."
+
+    def handle(self, *args, **options):
+        changes = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Stored rating changes: {changes}"))
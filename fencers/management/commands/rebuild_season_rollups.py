@@ -0,0 +1,13 @@
+"""Recompute every season and month rollup row from EventParticipation."""
+
+from django.core.management.base import BaseCommand
+
+from fencers.season_rollups import rebuild_season_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-season and per-month rollups behind the charts (e.g. after bulk edits that skip signals)."
+
+    def handle(self, *args, **options):
+        fencer_rows, club_rows = rebuild_season_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Stored fencer rows: {fencer_rows}, club rows: {club_rows}"))
@@ -0,0 +1,37 @@
+"""Recompute the denormalized EventPhoto.like_count from PhotoLike rows."""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from fencers.models import EventPhoto, PhotoLike
+
+
+class Command(BaseCommand):
+    help = "Repair EventPhoto.like_count (e.g. after likes were deleted in the admin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many photos have a wrong count.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            EventPhoto.objects.annotate(actual=Count("likes"))
+            .exclude(like_count=F("actual"))
+            .count()
+        )
+        self.stdout.write(f"Photos with a wrong like_count: {drifted}")
+        if options["dry_run"] or not drifted:
+            return
+
+        counts = (
+            PhotoLike.objects.filter(photo=OuterRef("pk"))
+            .values("photo")
+            .annotate(c=Count("id"))
+            .values("c")
+        )
+        updated = EventPhoto.objects.update(like_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(self.style.SUCCESS(f"Recounted likes for {updated} photos."))
@@ -0,0 +1,169 @@
+"""Local media: content-hashed file names and cache-friendly serving.
+
+Every file saved to the default storage gets the first hex digits of its
+SHA-256 in the name (``avatar.3f2a9c01b7de.jpg``). A hashed URL never changes
+its bytes, so it can be cached as immutable with the hash as a strong ETag;
+a new avatar or cover gets a new URL. Older, unhashed files are served with
+a revalidating ETag and answer 304 when unchanged.
+
+/media/ sits behind RequireFencerProfileMiddleware, which is the only
+authorization check. After it, the file is handed to the front web server
+(X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd) when configured,
+or streamed by Django with single byte-range support.
+"""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from email.utils import formatdate
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+
+CONTENT_HASH_LENGTH = 12
+_HASHED_NAME_RE = re.compile(r"\.([0-9a-f]{%d})(\.[^./]+)?$" % CONTENT_HASH_LENGTH)
+_HASH_SUFFIX_RE = re.compile(r"\.[0-9a-f]{%d}$" % CONTENT_HASH_LENGTH)
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash_of(name: str) -> str:
+    """The content hash embedded in a stored file name, or ""."""
+    match = _HASHED_NAME_RE.search(posixpath.basename(name or ""))
+    return match.group(1) if match else ""
+
+
+def strip_content_hash(stem: str) -> str:
+    """`stem` (a name without extension) minus a trailing ``.<hash>``."""
+    return _HASH_SUFFIX_RE.sub("", stem)
+
+
+class ContentHashedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that puts a content hash into every new file name."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        # A name that already carries a (possibly stale) hash gets the real one instead.
+        stem, ext = os.path.splitext(name)
+        name = f"{strip_content_hash(stem)}.{digest.hexdigest()[:CONTENT_HASH_LENGTH]}{ext}"
+        return super().save(name, content, max_length=max_length)
+
+
+def _media_path(path: str) -> str:
+    """Normalized relative path inside MEDIA_ROOT; Http404 for anything escaping it."""
+    path = posixpath.normpath(path).lstrip("/")
+    if not path or path == "." or path.startswith("../") or path == "..":
+        raise Http404
+    return path
+
+
+def _byte_range(header: str, size: int):
+    """(start, end) inclusive for a single `bytes=` range, None to send everything, or "invalid"."""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple ranges or another unit: a full response is always allowed.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return "invalid"
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return "invalid"
+    return start, end
+
+
+def _file_chunks(fp, length):
+    with fp:
+        while length > 0:
+            chunk = fp.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def media_response(request, path):
+    """Response for a file under MEDIA_ROOT (the caller has already authorized the request)."""
+    path = _media_path(path)
+    content_hash = content_hash_of(path)
+    cache_control = IMMUTABLE_CACHE_CONTROL if content_hash else REVALIDATE_CACHE_CONTROL
+
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    if accel_prefix:
+        # nginx serves the internal location with its own ETag, Range and 304 handling.
+        response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or "application/octet-stream")
+        response["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + quote(path)
+        response["Cache-Control"] = cache_control
+        return response
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    size = stat.st_size
+    etag = f'"{content_hash}"' if content_hash else f'"{stat.st_mtime_ns:x}-{size:x}"'
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        not_modified["Cache-Control"] = cache_control
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if getattr(settings, "MEDIA_SENDFILE_HEADER", ""):
+        response = HttpResponse(content_type=content_type)
+        response[settings.MEDIA_SENDFILE_HEADER] = full_path
+    else:
+        byte_range = None
+        range_header = request.META.get("HTTP_RANGE", "")
+        if_range = request.META.get("HTTP_IF_RANGE", "")
+        if range_header and (not if_range or if_range == etag):
+            byte_range = _byte_range(range_header, size)
+        if byte_range == "invalid":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if byte_range is None:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+        else:
+            start, end = byte_range
+            fp = open(full_path, "rb")
+            fp.seek(start)
+            response = StreamingHttpResponse(_file_chunks(fp, end - start + 1), content_type=content_type, status=206)
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Accept-Ranges"] = "bytes"
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+    response["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0046_eventphoto_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='medium_url',
+            field=models.URLField(blank=True, default='', max_length=1024, verbose_name='URL střední velikosti'),
+        ),
+        migrations.AddField(
+            model_name='eventphoto',
+            name='thumbnail_url',
+            field=models.URLField(blank=True, default='', max_length=1024, verbose_name='URL náhledu'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_like_counts(apps, schema_editor):
+    EventPhoto = apps.get_model("fencers", "EventPhoto")
+    PhotoLike = apps.get_model("fencers", "PhotoLike")
+    counts = (
+        PhotoLike.objects.filter(photo=OuterRef("pk"))
+        .values("photo")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    EventPhoto.objects.update(like_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0047_eventphoto_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Počet líbí se mi'),
+        ),
+        migrations.RunPython(fill_like_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='eventphoto',
+            index=models.Index(fields=['like_count', 'uploaded_at'], name='fencers_photo_likes_idx'),
+        ),
+    ]
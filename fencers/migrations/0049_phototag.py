@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_photo_tags(apps, schema_editor):
+    EventPhoto = apps.get_model("fencers", "EventPhoto")
+    PhotoTag = apps.get_model("fencers", "PhotoTag")
+    batch = []
+    for photo_id, tags in EventPhoto.objects.values_list("id", "tags").iterator(chunk_size=500):
+        seen = set()
+        for item in tags or []:
+            if not isinstance(item, str) or not item.strip():
+                continue
+            label = item.strip()[:200]
+            key = " ".join(item.split()).casefold()[:200]
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(PhotoTag(photo_id=photo_id, tag_key=key, label=label))
+    PhotoTag.objects.bulk_create(batch, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0048_eventphoto_like_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag_key', models.CharField(max_length=200, verbose_name='Klíč štítku')),
+                ('label', models.CharField(max_length=200, verbose_name='Štítek')),
+                ('photo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index', to='fencers.eventphoto', verbose_name='Fotka')),
+            ],
+            options={
+                'verbose_name': 'Štítek fotky',
+                'verbose_name_plural': 'Štítky fotek',
+                'indexes': [models.Index(fields=['tag_key', 'photo'], name='fencers_phototag_key_idx')],
+                'unique_together': {('photo', 'tag_key')},
+            },
+        ),
+        migrations.RunPython(populate_photo_tags, migrations.RunPython.noop),
+    ]
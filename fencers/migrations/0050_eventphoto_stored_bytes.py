@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0049_phototag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='original_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Velikost originálu (B)'),
+        ),
+        migrations.AddField(
+            model_name='eventphoto',
+            name='stored_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Uložená velikost (B)'),
+        ),
+    ]
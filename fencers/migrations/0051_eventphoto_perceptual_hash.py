@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0050_eventphoto_stored_bytes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='fencers.eventphoto', verbose_name='Pravděpodobný duplikát fotky'),
+        ),
+        migrations.AddField(
+            model_name='eventphoto',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=16, verbose_name='Perceptuální hash'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0051_eventphoto_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photoalbum',
+            name='cover_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='album_covers/thumbs/', verbose_name='Náhled obalové fotky'),
+        ),
+    ]
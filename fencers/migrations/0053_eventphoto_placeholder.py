@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0052_photoalbum_cover_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='placeholder',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Zástupný náhled'),
+        ),
+    ]
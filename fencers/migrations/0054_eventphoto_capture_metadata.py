@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0053_eventphoto_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventphoto',
+            name='captured_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Pořízeno'),
+        ),
+        migrations.AddField(
+            model_name='eventphoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Výška (px)'),
+        ),
+        migrations.AddField(
+            model_name='eventphoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Šířka (px)'),
+        ),
+        migrations.AddIndex(
+            model_name='eventphoto',
+            index=models.Index(fields=['captured_at', 'uploaded_at'], name='fencers_photo_captured_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_snapshots(apps, schema_editor):
+    """Initial snapshot rows; later kept up to date by fencers.fencer_stats."""
+    EventParticipation = apps.get_model('fencers', 'EventParticipation')
+    FencerStatsSnapshot = apps.get_model('fencers', 'FencerStatsSnapshot')
+
+    totals = {}
+    rows = EventParticipation.objects.values_list(
+        'fencer_id', 'event__event_type', 'position', 'event__participants_count',
+        'wins', 'losses', 'touches_scored', 'touches_received',
+    )
+    for fencer_id, event_type, position, count, wins, losses, scored, received in rows.iterator():
+        entry = totals.setdefault((fencer_id, event_type), [0, 0, 0, 0, 0, []])
+        entry[0] += 1
+        entry[1] += wins or 0
+        entry[2] += losses or 0
+        entry[3] += scored or 0
+        entry[4] += received or 0
+        if position and position > 0 and count and count > 0:
+            entry[5].append(position * 100.0 / count)
+
+    FencerStatsSnapshot.objects.bulk_create(
+        [
+            FencerStatsSnapshot(
+                fencer_id=fencer_id,
+                event_type=event_type,
+                events_count=n,
+                wins=wins,
+                losses=losses,
+                touches_scored=scored,
+                touches_received=received,
+                best_percentile=round(min(percentiles), 1) if percentiles else None,
+                average_percentile=round(sum(percentiles) / len(percentiles), 1) if percentiles else None,
+            )
+            for (fencer_id, event_type), (n, wins, losses, scored, received, percentiles) in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0054_eventphoto_capture_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FencerStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('tournament', 'Turnaj'), ('humanitarian', 'UŠL - univerzitní liga'), ('other', 'Ostatní akce')], max_length=20, verbose_name='Typ akce')),
+                ('events_count', models.IntegerField(default=0, verbose_name='Počet akcí')),
+                ('wins', models.IntegerField(default=0, verbose_name='Výhry')),
+                ('losses', models.IntegerField(default=0, verbose_name='Prohry')),
+                ('touches_scored', models.IntegerField(default=0, verbose_name='Zasazené zásahy')),
+                ('touches_received', models.IntegerField(default=0, verbose_name='Obdržené zásahy')),
+                ('best_percentile', models.FloatField(blank=True, null=True, verbose_name='Nejlepší percentil')),
+                ('average_percentile', models.FloatField(blank=True, null=True, verbose_name='Průměrný percentil')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fencer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_snapshots', to='fencers.fencerprofile', verbose_name='Šermíř')),
+            ],
+            options={
+                'verbose_name': 'Statistika šermíře',
+                'verbose_name_plural': 'Statistiky šermířů',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fencerstatssnapshot',
+            constraint=models.UniqueConstraint(fields=('fencer', 'event_type'), name='fencers_stats_fencer_type_uniq'),
+        ),
+        migrations.RunPython(fill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:11
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def fill_percentiles(apps, schema_editor):
+    Event = apps.get_model('fencers', 'Event')
+    EventParticipation = apps.get_model('fencers', 'EventParticipation')
+    for event_id, count in Event.objects.filter(participants_count__gt=0).values_list('id', 'participants_count'):
+        EventParticipation.objects.filter(event_id=event_id, position__gt=0).update(
+            percentile=Round(models.F('position') * 100.0 / count, 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0055_fencerstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventparticipation',
+            name='percentile',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Percentil'),
+        ),
+        migrations.AddIndex(
+            model_name='eventparticipation',
+            index=models.Index(fields=['fencer', 'percentile'], name='fencers_part_fencer_pct_idx'),
+        ),
+        migrations.RunPython(fill_percentiles, migrations.RunPython.noop),
+    ]
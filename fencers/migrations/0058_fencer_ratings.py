@@ -0,0 +1,104 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_ratings(apps, schema_editor):
+    """Initial ratings from all past results; later kept up to date by fencers.ratings."""
+    from fencers.ratings import INITIAL_DEVIATION, INITIAL_RATING, performance_score, rate
+
+    Event = apps.get_model('fencers', 'Event')
+    EventParticipation = apps.get_model('fencers', 'EventParticipation')
+    FencerRating = apps.get_model('fencers', 'FencerRating')
+    FencerRatingHistory = apps.get_model('fencers', 'FencerRatingHistory')
+
+    events = list(
+        Event.objects.filter(event_type__in=['tournament', 'humanitarian'])
+        .order_by('date', 'id')
+        .values_list('id', 'date', 'participants_count')
+    )
+    by_event = {}
+    for participation in EventParticipation.objects.filter(event_id__in=[e[0] for e in events]).order_by('event_id', 'fencer_id'):
+        by_event.setdefault(participation.event_id, []).append(participation)
+
+    ratings = {}
+    history = []
+    for event_id, event_date, participants_count in events:
+        for participation in by_event.get(event_id, ()):
+            score = performance_score(participation, participants_count)
+            if score is None:
+                continue
+            row = ratings.setdefault(
+                participation.fencer_id,
+                FencerRating(fencer_id=participation.fencer_id, rating=INITIAL_RATING, deviation=INITIAL_DEVIATION),
+            )
+            new_rating, new_deviation = rate(row.rating, row.deviation, score)
+            history.append(FencerRatingHistory(
+                fencer_id=participation.fencer_id,
+                event_id=event_id,
+                performance=score,
+                rating_before=row.rating,
+                rating_after=new_rating,
+                deviation_before=row.deviation,
+                deviation_after=new_deviation,
+            ))
+            row.rating, row.deviation = new_rating, new_deviation
+            row.events_count += 1
+            row.last_event_date = event_date
+
+    FencerRatingHistory.objects.bulk_create(history, batch_size=500)
+    FencerRating.objects.bulk_create(ratings.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0057_event_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FencerRatingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('performance', models.FloatField(verbose_name='Výkon')),
+                ('rating_before', models.FloatField(verbose_name='Hodnocení před')),
+                ('rating_after', models.FloatField(verbose_name='Hodnocení po')),
+                ('deviation_before', models.FloatField(verbose_name='Nejistota před')),
+                ('deviation_after', models.FloatField(verbose_name='Nejistota po')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_changes', to='fencers.event', verbose_name='Akce')),
+                ('fencer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_history', to='fencers.fencerprofile', verbose_name='Šermíř')),
+            ],
+            options={
+                'verbose_name': 'Změna hodnocení',
+                'verbose_name_plural': 'Historie hodnocení',
+                'ordering': ['event__date', 'event_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FencerRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(verbose_name='Hodnocení')),
+                ('deviation', models.FloatField(verbose_name='Nejistota')),
+                ('events_count', models.IntegerField(default=0, verbose_name='Hodnocené akce')),
+                ('last_event_date', models.DateField(blank=True, null=True, verbose_name='Poslední akce')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fencer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='fencers.fencerprofile', verbose_name='Šermíř')),
+            ],
+            options={
+                'verbose_name': 'Hodnocení šermíře',
+                'verbose_name_plural': 'Hodnocení šermířů',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fencerratinghistory',
+            constraint=models.UniqueConstraint(fields=('fencer', 'event'), name='fencers_rating_history_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='fencerrating',
+            index=models.Index(fields=['-rating'], name='fencers_rating_value_idx'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rollups(apps, schema_editor):
+    """Initial rollup rows; later kept up to date by fencers.season_rollups."""
+    from fencers.season_rollups import _month_totals, _rollups
+
+    EventParticipation = apps.get_model('fencers', 'EventParticipation')
+    FencerSeasonRollup = apps.get_model('fencers', 'FencerSeasonRollup')
+    ClubSeasonRollup = apps.get_model('fencers', 'ClubSeasonRollup')
+
+    participations = EventParticipation.objects.all()
+    FencerSeasonRollup.objects.bulk_create(
+        _rollups(FencerSeasonRollup, 'fencer_id', _month_totals(participations, 'fencer_id'), 'fencer_id'),
+        batch_size=500,
+    )
+    club_participations = participations.filter(fencer__club__isnull=False)
+    ClubSeasonRollup.objects.bulk_create(
+        _rollups(ClubSeasonRollup, 'club_id', _month_totals(club_participations, 'fencer__club_id'), 'fencer__club_id'),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0058_fencer_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubSeasonRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('season', 'Sezóna'), ('month', 'Měsíc')], max_length=10, verbose_name='Období')),
+                ('period_start', models.DateField(verbose_name='Začátek období')),
+                ('season', models.IntegerField(verbose_name='Sezóna')),
+                ('event_type', models.CharField(choices=[('tournament', 'Turnaj'), ('humanitarian', 'UŠL - univerzitní liga'), ('other', 'Ostatní akce')], max_length=20, verbose_name='Typ akce')),
+                ('gender', models.CharField(choices=[('M', 'M'), ('Z', 'Ž'), ('V', 'Vše')], max_length=1, verbose_name='Kategorie')),
+                ('participations', models.IntegerField(default=0, verbose_name='Účasti')),
+                ('events_count', models.IntegerField(default=0, verbose_name='Počet akcí')),
+                ('wins', models.IntegerField(default=0, verbose_name='Výhry')),
+                ('losses', models.IntegerField(default=0, verbose_name='Prohry')),
+                ('touches_scored', models.IntegerField(default=0, verbose_name='Zasazené zásahy')),
+                ('touches_received', models.IntegerField(default=0, verbose_name='Obdržené zásahy')),
+                ('points', models.FloatField(default=0, verbose_name='Body')),
+                ('best_percentile', models.FloatField(blank=True, null=True, verbose_name='Nejlepší percentil')),
+                ('percentile_sum', models.FloatField(default=0, verbose_name='Součet percentilů')),
+                ('percentile_count', models.IntegerField(default=0, verbose_name='Počet percentilů')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_rollups', to='fencers.club', verbose_name='Klub')),
+            ],
+            options={
+                'verbose_name': 'Souhrn klubu za období',
+                'verbose_name_plural': 'Souhrny klubů za období',
+            },
+        ),
+        migrations.CreateModel(
+            name='FencerSeasonRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('season', 'Sezóna'), ('month', 'Měsíc')], max_length=10, verbose_name='Období')),
+                ('period_start', models.DateField(verbose_name='Začátek období')),
+                ('season', models.IntegerField(verbose_name='Sezóna')),
+                ('event_type', models.CharField(choices=[('tournament', 'Turnaj'), ('humanitarian', 'UŠL - univerzitní liga'), ('other', 'Ostatní akce')], max_length=20, verbose_name='Typ akce')),
+                ('gender', models.CharField(choices=[('M', 'M'), ('Z', 'Ž'), ('V', 'Vše')], max_length=1, verbose_name='Kategorie')),
+                ('participations', models.IntegerField(default=0, verbose_name='Účasti')),
+                ('events_count', models.IntegerField(default=0, verbose_name='Počet akcí')),
+                ('wins', models.IntegerField(default=0, verbose_name='Výhry')),
+                ('losses', models.IntegerField(default=0, verbose_name='Prohry')),
+                ('touches_scored', models.IntegerField(default=0, verbose_name='Zasazené zásahy')),
+                ('touches_received', models.IntegerField(default=0, verbose_name='Obdržené zásahy')),
+                ('points', models.FloatField(default=0, verbose_name='Body')),
+                ('best_percentile', models.FloatField(blank=True, null=True, verbose_name='Nejlepší percentil')),
+                ('percentile_sum', models.FloatField(default=0, verbose_name='Součet percentilů')),
+                ('percentile_count', models.IntegerField(default=0, verbose_name='Počet percentilů')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fencer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_rollups', to='fencers.fencerprofile', verbose_name='Šermíř')),
+            ],
+            options={
+                'verbose_name': 'Souhrn šermíře za období',
+                'verbose_name_plural': 'Souhrny šermířů za období',
+                'indexes': [models.Index(fields=['fencer', 'season'], name='fencers_fencer_rollup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fencerseasonrollup',
+            constraint=models.UniqueConstraint(fields=('fencer', 'period', 'period_start', 'event_type', 'gender'), name='fencers_fencer_rollup_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='clubseasonrollup',
+            index=models.Index(fields=['club', 'season'], name='fencers_club_rollup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='clubseasonrollup',
+            constraint=models.UniqueConstraint(fields=('club', 'period', 'period_start', 'event_type', 'gender'), name='fencers_club_rollup_uniq'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:40
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+# Frozen copies of fencers.models.participation_percentile_expression() and
+# round_percentile() as of this migration; the live code may change later.
+def percentile_expression(participants_count):
+    if not participants_count or participants_count <= 0:
+        return models.Value(None, output_field=models.FloatField())
+    tenths = models.ExpressionWrapper(
+        (models.F('position') * 2000 + participants_count) / (2 * participants_count),
+        output_field=models.IntegerField(),
+    )
+    return models.Case(
+        models.When(
+            position__gt=0,
+            then=models.ExpressionWrapper(tenths / 10.0, output_field=models.FloatField()),
+        ),
+        default=None,
+        output_field=models.FloatField(),
+    )
+
+
+def round_half_up(value):
+    if value is None:
+        return None
+    return float(Decimal(str(round(value, 9))).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
+
+
+def refill_percentiles(apps, schema_editor):
+    """Store every percentile rounded half up and refresh the fencer stats snapshots.
+
+    The season rollups also sum percentiles; run `manage.py rebuild_season_rollups`
+    after migrating to bring them in line.
+    """
+    Event = apps.get_model('fencers', 'Event')
+    EventParticipation = apps.get_model('fencers', 'EventParticipation')
+    FencerStatsSnapshot = apps.get_model('fencers', 'FencerStatsSnapshot')
+
+    for event_id, count in Event.objects.values_list('id', 'participants_count'):
+        EventParticipation.objects.filter(event_id=event_id).update(percentile=percentile_expression(count))
+
+    snapshots = list(FencerStatsSnapshot.objects.all())
+    totals = {
+        (row['fencer_id'], row['event__event_type']): row
+        for row in EventParticipation.objects.values('fencer_id', 'event__event_type')
+        .annotate(best=models.Min('percentile'), average=models.Avg('percentile'))
+        .order_by()
+    }
+    for snapshot in snapshots:
+        row = totals.get((snapshot.fencer_id, snapshot.event_type), {})
+        snapshot.best_percentile = round_half_up(row.get('best'))
+        snapshot.average_percentile = round_half_up(row.get('average'))
+    FencerStatsSnapshot.objects.bulk_update(snapshots, ['best_percentile', 'average_percentile'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fencers', '0059_season_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_percentiles, migrations.RunPython.noop),
+    ]
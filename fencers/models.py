@@ -1,10 +1,14 @@
 import json
+from decimal import ROUND_HALF_UP, Decimal
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.conf import settings
 
+from .photo_tags import schedule_tag_vocabulary_refresh
+from .photo_variants import variant_srcset
+
 
 class UserManager(BaseUserManager):
     """Custom user manager for the User model."""
@@ -238,10 +242,69 @@ class Event(models.Model):
         verbose_name = "Akce"
         verbose_name_plural = "Akce"
         ordering = ['date']
+        indexes = [
+            models.Index(fields=['date'], name='fencers_event_date_idx'),
+            models.Index(fields=['event_type', 'date'], name='fencers_event_type_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.date:%d.%m.%Y})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_participants_count = instance.__dict__.get('participants_count')
+        return instance
+
+    def save(self, *args, **kwargs):
+        count_changed = (
+            self.pk is not None
+            and getattr(self, '_loaded_participants_count', None) != self.participants_count
+        )
+        with transaction.atomic():
+            if count_changed:
+                # Before post_save, so signal handlers already see the new percentiles.
+                self.participations.update(
+                    percentile=participation_percentile_expression(self.participants_count)
+                )
+            super().save(*args, **kwargs)
+        self._loaded_participants_count = self.participants_count
+
+
+# Percentiles are rounded half up to 0.1 in integer tenths, so Python and SQL
+# (whose ROUND() and round() disagree on halves) store the same value.
+def participation_percentile(position, participants_count):
+    """(position / participants_count) * 100 rounded half up to 0.1, or None when unknown."""
+    if not position or position <= 0 or not participants_count or participants_count <= 0:
+        return None
+    return (position * 2000 + participants_count) // (2 * participants_count) / 10
+
+
+def round_percentile(value):
+    """A percentile average rounded half up to 0.1 like the stored percentiles, or None."""
+    if value is None:
+        return None
+    # Round off float noise first, so an average of exactly x.x5 still rounds up.
+    return float(Decimal(str(round(value, 9))).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
+
+
+def participation_percentile_expression(participants_count):
+    """SQL version of participation_percentile() for all participations of one event."""
+    if not participants_count or participants_count <= 0:
+        return models.Value(None, output_field=models.FloatField())
+    tenths = models.ExpressionWrapper(
+        (models.F('position') * 2000 + participants_count) / (2 * participants_count),
+        output_field=models.IntegerField(),
+    )
+    return models.Case(
+        models.When(
+            position__gt=0,
+            then=models.ExpressionWrapper(tenths / 10.0, output_field=models.FloatField()),
+        ),
+        default=None,
+        output_field=models.FloatField(),
+    )
+
 
 class EventParticipation(models.Model):
     fencer = models.ForeignKey(FencerProfile, on_delete=models.CASCADE, related_name='event_participations', verbose_name="Šermíř")
@@ -253,21 +316,184 @@ class EventParticipation(models.Model):
     touches_received = models.IntegerField(default=0, verbose_name="Obdržené zásahy")
     points = models.FloatField(null=True, blank=True, verbose_name="Body")
     is_hall_of_fame = models.BooleanField(default=False, verbose_name="Síň slávy")
+    # (position / event.participants_count) * 100, kept in step by save() and Event.save().
+    percentile = models.FloatField(null=True, blank=True, editable=False, db_index=True, verbose_name="Percentil")
     
     class Meta:
         verbose_name = "Účast na akci"
         verbose_name_plural = "Účasti na akcích"
         unique_together = ['fencer', 'event']
         ordering = ['-event__date']
+        indexes = [
+            models.Index(fields=['fencer', 'percentile'], name='fencers_part_fencer_pct_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.percentile = participation_percentile(self.position, self.event.participants_count)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'position' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'percentile'}
+        super().save(*args, **kwargs)
     
     def get_percentile(self):
-        """Calculate percentile: (position / participants_count) * 100"""
-        if not self.position or not self.event.participants_count:
-            return None
-        if self.event.participants_count <= 0:
-            return None
-        percentile = (self.position / self.event.participants_count) * 100
-        return round(percentile, 1)
+        """Stored percentile: (position / participants_count) * 100."""
+        return self.percentile
+
+
+class FencerStatsSnapshot(models.Model):
+    """Per-fencer totals for one event type, maintained by fencers.fencer_stats."""
+
+    fencer = models.ForeignKey(FencerProfile, on_delete=models.CASCADE, related_name='stats_snapshots', verbose_name="Šermíř")
+    event_type = models.CharField(max_length=20, choices=Event.EventType.choices, verbose_name="Typ akce")
+    events_count = models.IntegerField(default=0, verbose_name="Počet akcí")
+    wins = models.IntegerField(default=0, verbose_name="Výhry")
+    losses = models.IntegerField(default=0, verbose_name="Prohry")
+    touches_scored = models.IntegerField(default=0, verbose_name="Zasazené zásahy")
+    touches_received = models.IntegerField(default=0, verbose_name="Obdržené zásahy")
+    best_percentile = models.FloatField(null=True, blank=True, verbose_name="Nejlepší percentil")
+    average_percentile = models.FloatField(null=True, blank=True, verbose_name="Průměrný percentil")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistika šermíře"
+        verbose_name_plural = "Statistiky šermířů"
+        constraints = [
+            models.UniqueConstraint(fields=['fencer', 'event_type'], name='fencers_stats_fencer_type_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.fencer} – {self.get_event_type_display()}"
+
+    @property
+    def win_rate(self):
+        bouts = self.wins + self.losses
+        return round(self.wins / bouts * 100, 1) if bouts else 0
+
+    @classmethod
+    def for_fencer(cls, fencer, event_type=Event.EventType.TOURNAMENT):
+        """The fencer's row for `event_type`, or an unsaved all-zero one."""
+        return cls.objects.filter(fencer=fencer, event_type=event_type).first() or cls(
+            fencer=fencer, event_type=event_type
+        )
+
+
+class FencerRating(models.Model):
+    """Current club rating of a fencer; maintained by fencers.ratings."""
+
+    fencer = models.OneToOneField(FencerProfile, on_delete=models.CASCADE, related_name='rating', verbose_name="Šermíř")
+    rating = models.FloatField(verbose_name="Hodnocení")
+    deviation = models.FloatField(verbose_name="Nejistota")
+    events_count = models.IntegerField(default=0, verbose_name="Hodnocené akce")
+    last_event_date = models.DateField(null=True, blank=True, verbose_name="Poslední akce")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Hodnocení šermíře"
+        verbose_name_plural = "Hodnocení šermířů"
+        indexes = [
+            models.Index(fields=['-rating'], name='fencers_rating_value_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fencer}: {self.rating:.0f}"
+
+
+class FencerRatingHistory(models.Model):
+    """Rating change of one fencer caused by one event."""
+
+    fencer = models.ForeignKey(FencerProfile, on_delete=models.CASCADE, related_name='rating_history', verbose_name="Šermíř")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='rating_changes', verbose_name="Akce")
+    performance = models.FloatField(verbose_name="Výkon")
+    rating_before = models.FloatField(verbose_name="Hodnocení před")
+    rating_after = models.FloatField(verbose_name="Hodnocení po")
+    deviation_before = models.FloatField(verbose_name="Nejistota před")
+    deviation_after = models.FloatField(verbose_name="Nejistota po")
+
+    class Meta:
+        verbose_name = "Změna hodnocení"
+        verbose_name_plural = "Historie hodnocení"
+        ordering = ['event__date', 'event_id']
+        constraints = [
+            models.UniqueConstraint(fields=['fencer', 'event'], name='fencers_rating_history_uniq'),
+        ]
+
+    @property
+    def delta(self):
+        return self.rating_after - self.rating_before
+
+
+class RollupPeriod(models.TextChoices):
+    SEASON = 'season', "Sezóna"
+    MONTH = 'month', "Měsíc"
+
+
+class SeasonRollup(models.Model):
+    """Additive result totals for one period, event type and event gender.
+
+    Maintained by fencers.season_rollups; `period_start` is the first day of
+    the month or of the season (1 September) and `season` its start year.
+    """
+
+    period = models.CharField(max_length=10, choices=RollupPeriod.choices, verbose_name="Období")
+    period_start = models.DateField(verbose_name="Začátek období")
+    season = models.IntegerField(verbose_name="Sezóna")
+    event_type = models.CharField(max_length=20, choices=Event.EventType.choices, verbose_name="Typ akce")
+    gender = models.CharField(max_length=1, choices=Event.Gender.choices, verbose_name="Kategorie")
+    participations = models.IntegerField(default=0, verbose_name="Účasti")
+    events_count = models.IntegerField(default=0, verbose_name="Počet akcí")
+    wins = models.IntegerField(default=0, verbose_name="Výhry")
+    losses = models.IntegerField(default=0, verbose_name="Prohry")
+    touches_scored = models.IntegerField(default=0, verbose_name="Zasazené zásahy")
+    touches_received = models.IntegerField(default=0, verbose_name="Obdržené zásahy")
+    points = models.FloatField(default=0, verbose_name="Body")
+    best_percentile = models.FloatField(null=True, blank=True, verbose_name="Nejlepší percentil")
+    # Sum and count instead of an average, so rows can be added up across types and months.
+    percentile_sum = models.FloatField(default=0, verbose_name="Součet percentilů")
+    percentile_count = models.IntegerField(default=0, verbose_name="Počet percentilů")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_percentile(self):
+        return round_percentile(self.percentile_sum / self.percentile_count) if self.percentile_count else None
+
+
+class FencerSeasonRollup(SeasonRollup):
+    fencer = models.ForeignKey(FencerProfile, on_delete=models.CASCADE, related_name='season_rollups', verbose_name="Šermíř")
+
+    class Meta:
+        verbose_name = "Souhrn šermíře za období"
+        verbose_name_plural = "Souhrny šermířů za období"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fencer', 'period', 'period_start', 'event_type', 'gender'],
+                name='fencers_fencer_rollup_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['fencer', 'season'], name='fencers_fencer_rollup_idx'),
+        ]
+
+
+class ClubSeasonRollup(SeasonRollup):
+    """Totals of a club's current members; `events_count` counts distinct events."""
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='season_rollups', verbose_name="Klub")
+
+    class Meta:
+        verbose_name = "Souhrn klubu za období"
+        verbose_name_plural = "Souhrny klubů za období"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['club', 'period', 'period_start', 'event_type', 'gender'],
+                name='fencers_club_rollup_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['club', 'season'], name='fencers_club_rollup_idx'),
+        ]
 
 
 class TrainingNote(models.Model):
@@ -311,6 +537,14 @@ class CircuitSong(models.Model):
 class PhotoAlbum(models.Model):
     event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='photo_album', verbose_name="Akce")
     cover_photo = models.ImageField(upload_to='album_covers/', null=True, blank=True, verbose_name="Obalová fotka")
+    # Small rendition of cover_photo for the album index, rendered when the cover changes.
+    cover_thumbnail = models.ImageField(
+        upload_to='album_covers/thumbs/',
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Náhled obalové fotky",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -320,6 +554,31 @@ class PhotoAlbum(models.Model):
     
     def __str__(self):
         return f"Album: {self.event.title}"
+
+    def save(self, *args, **kwargs):
+        # An uncommitted FieldFile is a freshly assigned upload.
+        cover_changed = bool(self.cover_photo) and not self.cover_photo._committed
+        super().save(*args, **kwargs)
+        if cover_changed or (not self.cover_photo and self.cover_thumbnail):
+            try:
+                self.render_cover_thumbnail()
+            except OSError:
+                # Not a readable image; the index falls back to a photo thumbnail.
+                pass
+
+    def render_cover_thumbnail(self):
+        """(Re)build cover_thumbnail from cover_photo; clears it when there is no cover."""
+        from django.core.files.base import ContentFile
+
+        from .photo_variants import PHOTO_VARIANTS, VARIANT_EXTENSION, open_image, render_variant
+
+        if self.cover_thumbnail:
+            self.cover_thumbnail.delete(save=False)
+        if self.cover_photo:
+            with self.cover_photo.open("rb") as fp:
+                data = render_variant(open_image(fp), dict(PHOTO_VARIANTS)["thumb"])
+            self.cover_thumbnail.save(f"album-{self.pk}{VARIANT_EXTENSION}", ContentFile(data), save=False)
+        PhotoAlbum.objects.filter(pk=self.pk).update(cover_thumbnail=self.cover_thumbnail.name or None)
     
     @property
     def date(self):
@@ -351,6 +610,31 @@ def _empty_tag_list():
     return []
 
 
+PHOTO_TAG_MAX_LENGTH = 200
+
+
+def photo_tag_key(label: str) -> str:
+    """Case- and whitespace-insensitive lookup key for a photo tag."""
+    return " ".join(label.split()).casefold()[:PHOTO_TAG_MAX_LENGTH]
+
+
+def normalize_photo_tags(raw):
+    """Trimmed, non-empty string tags with case-insensitive duplicates removed."""
+    normalized = []
+    seen = set()
+    for item in raw or []:
+        if not isinstance(item, str):
+            continue
+        s = item.strip()
+        if not s:
+            continue
+        key = photo_tag_key(s)
+        if key not in seen:
+            seen.add(key)
+            normalized.append(s)
+    return normalized
+
+
 class EventPhoto(models.Model):
     title = models.CharField(max_length=200, verbose_name="Název")
     description = models.TextField(blank=True, verbose_name="Popis")
@@ -366,6 +650,25 @@ class EventPhoto(models.Model):
         default='',
         verbose_name="URL obrázku (vzdálené úložiště)",
     )
+    thumbnail_url = models.URLField(
+        max_length=1024,
+        blank=True,
+        default='',
+        verbose_name="URL náhledu",
+    )
+    medium_url = models.URLField(
+        max_length=1024,
+        blank=True,
+        default='',
+        verbose_name="URL střední velikosti",
+    )
+    # From EXIF at upload (`manage.py backfill_photo_metadata` for older photos);
+    # width/height are the displayed size, i.e. after EXIF rotation.
+    captured_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Pořízeno")
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Šířka (px)")
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Výška (px)")
+    # Tiny inline preview (data: URI, see photo_variants.render_placeholder).
+    placeholder = models.TextField(blank=True, default='', editable=False, verbose_name="Zástupný náhled")
     event_date = models.DateField(null=True, blank=True, verbose_name="Datum akce")
     uploaded_by = models.ForeignKey(FencerProfile, on_delete=models.SET_NULL, null=True, verbose_name="Nahrál")
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -383,39 +686,118 @@ class EventPhoto(models.Model):
         editable=False,
         verbose_name="Štítky (vyhledávání)",
     )
+    # Denormalized COUNT of PhotoLike rows, kept in step by toggle_photo_like;
+    # `manage.py recount_photo_likes` repairs any drift.
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Počet líbí se mi")
+    # Size of the upload as received and as stored (after optional WebP
+    # normalization); `manage.py photo_storage_report` sums the savings.
+    original_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False, verbose_name="Velikost originálu (B)")
+    stored_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False, verbose_name="Uložená velikost (B)")
+    # 64-bit dHash (hex) for near-duplicate detection, see photo_duplicates.py.
+    perceptual_hash = models.CharField(max_length=16, blank=True, default='', db_index=True, editable=False, verbose_name="Perceptuální hash")
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicates',
+        verbose_name="Pravděpodobný duplikát fotky",
+    )
 
     class Meta:
         verbose_name = "Fotka z akce"
         verbose_name_plural = "Fotky z akcí"
         ordering = ['-event_date', '-uploaded_at']
+        indexes = [
+            models.Index(fields=['like_count', 'uploaded_at'], name='fencers_photo_likes_idx'),
+            models.Index(fields=['captured_at', 'uploaded_at'], name='fencers_photo_captured_idx'),
+        ]
 
     def clean(self):
         super().clean()
         if not self.photo and not (self.remote_image_url or '').strip():
             raise ValidationError('Je potřeba mít buď nahraný soubor, nebo URL obrázku.')
 
-    def save(self, *args, **kwargs):
-        raw = self.tags
-        if raw is None:
-            raw = []
-        normalized = []
-        seen = set()
-        for item in raw:
-            if not isinstance(item, str):
-                continue
-            s = item.strip()
-            if not s:
-                continue
-            key = s.casefold()
-            if key not in seen:
-                seen.add(key)
-                normalized.append(s)
+    def _normalize_tags(self):
+        normalized = normalize_photo_tags(self.tags)
         self.tags = normalized
         if normalized:
             self.tags_search = " " + " ".join(t.casefold() for t in normalized) + " "
         else:
             self.tags_search = ""
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Partial saves that leave tags alone (backfills of hashes, metadata,
+        # placeholders...) skip the tag work entirely.
+        tags_saved = update_fields is None or 'tags' in update_fields
+        if tags_saved:
+            self._normalize_tags()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'tags_search'}
         super().save(*args, **kwargs)
+        if tags_saved:
+            self.sync_tag_index()
+
+    @classmethod
+    def bulk_create_tagged(cls, photos, batch_size=None):
+        """bulk_create that also does save()'s tag work: normalization and PhotoTag rows."""
+        for photo in photos:
+            photo._normalize_tags()
+        created = cls.objects.bulk_create(photos, batch_size=batch_size)
+        tag_rows = []
+        for photo in created:
+            added = {photo_tag_key(label): label[:PHOTO_TAG_MAX_LENGTH] for label in photo.tags}
+            tag_rows.extend(PhotoTag(photo=photo, tag_key=key, label=label) for key, label in added.items())
+        if tag_rows:
+            PhotoTag.objects.bulk_create(tag_rows, batch_size=batch_size)
+            schedule_tag_vocabulary_refresh()
+        return created
+
+    @classmethod
+    def bulk_update_tags(cls, photos, batch_size=None):
+        """Save the `tags` of many existing photos: one bulk_update plus the PhotoTag sync."""
+        for photo in photos:
+            photo._normalize_tags()
+        cls.objects.bulk_update(photos, ["tags", "tags_search"], batch_size=batch_size)
+        cls.sync_tag_indexes(photos)
+
+    def sync_tag_index(self):
+        """Make this photo's PhotoTag rows match `self.tags`."""
+        type(self).sync_tag_indexes([self])
+
+    @classmethod
+    def sync_tag_indexes(cls, photos):
+        """Make the PhotoTag rows of `photos` match their `tags`, in a fixed number of queries."""
+        photos = [photo for photo in photos if photo.pk]
+        if not photos:
+            return
+        existing_by_photo = {photo.pk: {} for photo in photos}
+        for row in PhotoTag.objects.filter(photo_id__in=list(existing_by_photo)):
+            existing_by_photo[row.photo_id][row.tag_key] = row
+        stale = []
+        relabeled = []
+        new_rows = []
+        for photo in photos:
+            wanted = {photo_tag_key(label): label[:PHOTO_TAG_MAX_LENGTH] for label in photo.tags or []}
+            existing = existing_by_photo[photo.pk]
+            removed = [key for key in existing if key not in wanted]
+            stale.extend(existing[key].pk for key in removed)
+            for key, label in wanted.items():
+                row = existing.get(key)
+                if row is not None and row.label != label:
+                    row.label = label
+                    relabeled.append(row)
+            added = {key: label for key, label in wanted.items() if key not in existing}
+            new_rows.extend(PhotoTag(photo=photo, tag_key=key, label=label) for key, label in added.items())
+        if stale:
+            PhotoTag.objects.filter(pk__in=stale).delete()
+        if relabeled:
+            PhotoTag.objects.bulk_update(relabeled, ["label"])
+        if new_rows:
+            PhotoTag.objects.bulk_create(new_rows)
+        if stale or relabeled or new_rows:
+            schedule_tag_vocabulary_refresh()
 
     @property
     def tags_json(self):
@@ -430,9 +812,23 @@ class EventPhoto(models.Model):
             return self.photo.url
         return ''
 
+    @property
+    def thumbnail_image_url(self):
+        """Small rendition for grid tiles; falls back to the original."""
+        return (self.thumbnail_url or '').strip() or self.display_image_url
+
+    @property
+    def medium_image_url(self):
+        """Screen-sized rendition for the presentation modal; falls back to the original."""
+        return (self.medium_url or '').strip() or self.display_image_url
+
+    @property
+    def image_srcset(self):
+        return variant_srcset({"thumb": self.thumbnail_url, "medium": self.medium_url})
+
     def get_like_count(self):
         """Get the number of likes for this photo"""
-        return self.likes.count()
+        return self.like_count
     
     def is_liked_by_fencer(self, fencer):
         """Check if a fencer has liked this photo"""
@@ -441,6 +837,28 @@ class EventPhoto(models.Model):
         return self.likes.filter(fencer=fencer).exists()
 
 
+class PhotoTag(models.Model):
+    """Inverted index over EventPhoto.tags: one row per (photo, tag).
+
+    Maintained by EventPhoto.save; tag search runs exact/prefix lookups on
+    `tag_key` instead of substring scans over `tags_search`.
+    """
+    photo = models.ForeignKey(EventPhoto, on_delete=models.CASCADE, related_name='tag_index', verbose_name="Fotka")
+    tag_key = models.CharField(max_length=PHOTO_TAG_MAX_LENGTH, verbose_name="Klíč štítku")
+    label = models.CharField(max_length=PHOTO_TAG_MAX_LENGTH, verbose_name="Štítek")
+
+    class Meta:
+        verbose_name = "Štítek fotky"
+        verbose_name_plural = "Štítky fotek"
+        unique_together = ['photo', 'tag_key']
+        indexes = [
+            models.Index(fields=['tag_key', 'photo'], name='fencers_phototag_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.label} ({self.photo_id})"
+
+
 class PhotoLike(models.Model):
     photo = models.ForeignKey(EventPhoto, on_delete=models.CASCADE, related_name='likes', verbose_name="Fotka")
     fencer = models.ForeignKey(FencerProfile, on_delete=models.CASCADE, related_name='photo_likes', verbose_name="Šermíř")
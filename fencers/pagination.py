@@ -0,0 +1,115 @@
+"""Keyset (seek) pagination for the JSON list endpoints.
+
+A page is addressed by the sort values of the last row already shown instead of
+an OFFSET, so every page costs one indexed range scan no matter how deep the
+client has scrolled.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+
+class InvalidCursor(ValueError):
+    """The client sent a cursor that does not match the requested ordering."""
+
+
+def _cursor_value(value):
+    # Full isoformat: DjangoJSONEncoder drops microseconds, which would make
+    # rows uploaded within the same millisecond repeat or vanish between pages.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Unsupported cursor value: {value!r}")
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), default=_cursor_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_len: int) -> Optional[list]:
+    """Returns the cursor values, or None for an empty cursor (= first page)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != expected_len:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def _parse_ordering(ordering: Iterable[str]) -> List[Tuple[str, bool]]:
+    return [(o[1:], True) if o.startswith("-") else (o, False) for o in ordering]
+
+
+def _order_expressions(fields, nullable):
+    exprs = []
+    for name, descending in fields:
+        if name in nullable:
+            expr = F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+        else:
+            expr = F(name).desc() if descending else F(name).asc()
+        exprs.append(expr)
+    return exprs
+
+
+def _after_filter(fields, values, nullable) -> Q:
+    """Rows strictly after `values` in the given ordering (NULLs sort last)."""
+    result = Q(pk__in=[])
+    equal_so_far = Q()
+    for (name, descending), value in zip(fields, values):
+        if value is None:
+            # Nothing sorts after NULL except further NULLs, handled by later fields.
+            equal_so_far &= Q(**{f"{name}__isnull": True})
+            continue
+        lookup = "lt" if descending else "gt"
+        strictly_after = Q(**{f"{name}__{lookup}": value})
+        if name in nullable:
+            strictly_after |= Q(**{f"{name}__isnull": True})
+        result |= equal_so_far & strictly_after
+        equal_so_far &= Q(**{name: value})
+    return result
+
+
+def _row_value(row, name):
+    """Value of an ordering field on a fetched row; follows `a__b` through select_related objects."""
+    for part in name.split("__"):
+        row = getattr(row, part) if row is not None else None
+    return row
+
+
+def keyset_page(queryset, *, ordering: Sequence[str], cursor: str = "", limit: int, nullable=()):
+    """Fetch one page of `queryset`.
+
+    `ordering` uses Django's "-field" notation and must end with a unique field
+    (normally "-id" or "id"). Fields listed in `nullable` sort NULLs last.
+    Related fields ("event__date") must be select_related.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises InvalidCursor for a cursor that was not produced by this ordering.
+    """
+    fields = _parse_ordering(ordering)
+    nullable = frozenset(nullable)
+    queryset = queryset.order_by(*_order_expressions(fields, nullable))
+    values = decode_cursor(cursor, len(fields))
+    if values is not None:
+        try:
+            queryset = queryset.filter(_after_filter(fields, values, nullable))
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+    rows = list(queryset[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([_row_value(last, name) for name, _ in fields])
+    return rows, next_cursor
@@ -0,0 +1,52 @@
+"""Album index helpers for the event_photos page.
+
+The year filter buttons come from one grouped query that is cached until an
+album or an event changes (see signals.py); the album cards get a small
+cover image without loading any photo rows.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, ExtractYear, NullIf
+
+YEAR_FACETS_CACHE_KEY = "fencers:album_year_facets:v1"
+YEAR_FACETS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_album_year_facets():
+    """[(year, album count)] newest first."""
+    facets = cache.get(YEAR_FACETS_CACHE_KEY)
+    if facets is None:
+        from .models import PhotoAlbum
+
+        facets = list(
+            PhotoAlbum.objects.annotate(year=ExtractYear("event__date"))
+            .values("year")
+            .annotate(albums=Count("id"))
+            .order_by("-year")
+            .values_list("year", "albums")
+        )
+        cache.set(YEAR_FACETS_CACHE_KEY, facets, YEAR_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_album_year_facets():
+    cache.delete(YEAR_FACETS_CACHE_KEY)
+
+
+def with_fallback_cover(albums):
+    """Annotate `fallback_cover_url`: the thumbnail of the album's first photo.
+
+    Used for albums without an uploaded cover; one correlated subquery, so the
+    index page query count does not depend on the number of albums or photos.
+    """
+    from .models import EventPhoto
+
+    first_photo = (
+        EventPhoto.objects.filter(subalbum__album=OuterRef("pk"))
+        .annotate(url=Coalesce(NullIf("thumbnail_url", Value("")), NullIf("remote_image_url", Value(""))))
+        .exclude(url=None)
+        .order_by("uploaded_at", "id")
+        .values("url")[:1]
+    )
+    return albums.annotate(fallback_cover_url=Subquery(first_photo))
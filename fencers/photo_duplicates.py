@@ -0,0 +1,107 @@
+"""Near-duplicate detection for event photos via a 64-bit difference hash.
+
+dHash compares neighbouring pixels of a tiny grayscale copy, so re-encoded,
+resized or recompressed copies of the same shot land within a few bits of
+each other. Hashes are stored as 16 hex digits on EventPhoto.perceptual_hash.
+"""
+
+import io
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+HASH_SIZE = 8
+
+
+def photo_dhash(file_obj) -> str:
+    """dHash of an image (bytes or file) as 16 hex digits; EXIF orientation is applied."""
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.BytesIO(file_obj)
+    elif hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    image = Image.open(file_obj)
+    # JPEG can decode straight at 1/8 scale, which is all a 9x8 hash needs.
+    image.draft("L", (HASH_SIZE * 16, HASH_SIZE * 16))
+    image = ImageOps.exif_transpose(image).convert("L")
+    pixels = list(image.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{value:016x}"
+
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+class DuplicateIndex:
+    """Known hashes of one album; thread-safe so an upload batch can share it.
+
+    `claim()` checks a new hash against the album and the rest of the batch
+    and registers it, so two copies in one upload are caught as well (the
+    batch photo has no id yet, so its hash is returned instead); a photo
+    that then fails to store gives its claim back with `release()`.
+    """
+
+    def __init__(self, known: Iterable[Tuple[int, str]], max_distance: int):
+        self.max_distance = max_distance
+        self._entries: List[Tuple[Optional[int], int]] = [
+            (photo_id, int(value, 16)) for photo_id, value in known if value
+        ]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_album(cls, album, max_distance: int) -> "DuplicateIndex":
+        from .models import EventPhoto
+
+        known = (
+            EventPhoto.objects.filter(subalbum__album=album)
+            .exclude(perceptual_hash="")
+            .values_list("id", "perceptual_hash")
+        )
+        return cls(known, max_distance)
+
+    def claim(self, value: str) -> Tuple[bool, Optional[int], Optional[str]]:
+        """Returns (is_duplicate, id of the matching stored photo, hash of the matching batch photo)."""
+        number = int(value, 16)
+        with self._lock:
+            for photo_id, other in self._entries:
+                if bin(number ^ other).count("1") <= self.max_distance:
+                    return True, photo_id, None if photo_id is not None else f"{other:016x}"
+            self._entries.append((None, number))
+        return False, None, None
+
+    def release(self, value: str) -> None:
+        """Forget a hash claimed by this batch (its upload failed)."""
+        entry = (None, int(value, 16))
+        with self._lock:
+            if entry in self._entries:
+                self._entries.remove(entry)
+
+
+def duplicate_clusters(hashes: Dict[int, str], max_distance: int) -> List[List[int]]:
+    """Group photo ids whose hashes are within `max_distance` bits (transitively).
+
+    Pairwise, so callers should pass one album at a time.
+    """
+    items = [(photo_id, int(value, 16)) for photo_id, value in hashes.items() if value]
+    parent = {photo_id: photo_id for photo_id, _ in items}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, (a_id, a) in enumerate(items):
+        for b_id, b in items[i + 1:]:
+            if bin(a ^ b).count("1") <= max_distance:
+                parent[find(a_id)] = find(b_id)
+
+    groups: Dict[int, List[int]] = {}
+    for photo_id, _ in items:
+        groups.setdefault(find(photo_id), []).append(photo_id)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
@@ -0,0 +1,71 @@
+"""Cached vocabulary of photo tags for the tag suggestion lists.
+
+The vocabulary is every tag used on at least one photo (with usage counts)
+plus the short name tag of every fencer. It is built from PhotoTag with one
+grouped query and kept in the cache until photo tags change or a profile is
+renamed, so the photo pages never scan the photo table.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min
+
+VOCABULARY_CACHE_KEY = "fencers:photo_tag_vocabulary:v1"
+# Upper bound on staleness for caches that are not shared between workers.
+VOCABULARY_CACHE_TIMEOUT = 15 * 60
+
+
+def _build_state():
+    from .models import FencerProfile, PhotoTag
+
+    tags = {
+        key: [label, count]
+        for key, label, count in PhotoTag.objects.values("tag_key")
+        .annotate(first_label=Min("label"), uses=Count("id"))
+        .values_list("tag_key", "first_label", "uses")
+    }
+    fencers = {}
+    for fp in FencerProfile.objects.only("first_name", "last_name", "id"):
+        short = fp.short_name_tag
+        if short:
+            fencers[str(fp.id)] = short
+    return {"tags": tags, "fencers": fencers}
+
+
+def _get_state():
+    state = cache.get(VOCABULARY_CACHE_KEY)
+    if state is None:
+        state = _build_state()
+        cache.set(VOCABULARY_CACHE_KEY, state, VOCABULARY_CACHE_TIMEOUT)
+    return state
+
+
+def get_tag_vocabulary():
+    """Sorted [{"label": ..., "count": ...}] of photo tags and fencer short names."""
+    from .models import photo_tag_key
+
+    state = _get_state()
+    entries = {key: {"label": label, "count": count} for key, (label, count) in state["tags"].items()}
+    for label in state["fencers"].values():
+        entries.setdefault(photo_tag_key(label), {"label": label, "count": 0})
+    return sorted(entries.values(), key=lambda e: e["label"].casefold())
+
+
+def get_used_tag_labels():
+    """Labels present on at least one photo (find-person options)."""
+    return sorted((label for label, count in _get_state()["tags"].values() if count > 0), key=str.casefold)
+
+
+def schedule_tag_vocabulary_refresh():
+    """Drop the cached vocabulary once the current transaction commits.
+
+    Photo tags or a fencer's short name changed. Dropping instead of patching
+    the cached counts means concurrent edits cannot overwrite each other's
+    patch, and a rolled-back save never touches the cache. The next reader
+    rebuilds it with the grouped query.
+    """
+    transaction.on_commit(invalidate_tag_vocabulary)
+
+
+def invalidate_tag_vocabulary():
+    cache.delete(VOCABULARY_CACHE_KEY)
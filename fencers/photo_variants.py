@@ -0,0 +1,164 @@
+"""Smaller renditions of event photos, rendered with Pillow.
+
+The album grid only needs a thumbnail and the presentation modal a screen-sized
+copy, so every uploaded photo gets these variants stored next to the original.
+"""
+
+import base64
+import io
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from PIL import Image, ImageOps
+
+# (variant name, longest edge in px); the order matters for srcset.
+PHOTO_VARIANTS = (
+    ("thumb", 480),
+    ("medium", 1600),
+)
+VARIANT_JPEG_QUALITY = 82
+VARIANT_CONTENT_TYPE = "image/jpeg"
+VARIANT_EXTENSION = ".jpg"
+
+# Inline placeholder painted under the lazily loaded thumbnail.
+PLACEHOLDER_EDGE = 16
+PLACEHOLDER_JPEG_QUALITY = 40
+
+NORMALIZED_CONTENT_TYPE = "image/webp"
+NORMALIZED_EXTENSION = ".webp"
+
+
+def open_image(file_obj) -> Image.Image:
+    """Open an uploaded file (or bytes) and apply its EXIF orientation."""
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.BytesIO(file_obj)
+    elif hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    image = Image.open(file_obj)
+    image.load()
+    return ImageOps.exif_transpose(image)
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGB", "L"):
+        return image
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variant(image: Image.Image, max_edge: int) -> bytes:
+    """JPEG bytes of `image` scaled down so its longest edge is at most `max_edge`."""
+    copy = _to_rgb(image).copy()
+    copy.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    out = io.BytesIO()
+    copy.save(out, format="JPEG", quality=VARIANT_JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def normalize_photo(file_obj, *, max_edge: int, quality: int) -> bytes:
+    """WebP bytes of an uploaded photo: EXIF orientation applied, metadata
+    dropped (Pillow only writes EXIF/ICC when asked to) and the longest edge
+    capped at `max_edge`."""
+    image = open_image(file_obj)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+    image = image.copy()
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="WEBP", quality=quality, method=4)
+    return out.getvalue()
+
+
+def render_variants(file_obj) -> Dict[str, bytes]:
+    """Render every configured variant of one photo: {"thumb": b"...", "medium": b"..."}."""
+    image = open_image(file_obj)
+    return {name: render_variant(image, max_edge) for name, max_edge in PHOTO_VARIANTS}
+
+
+def render_placeholder(file_obj) -> str:
+    """A ~16px JPEG of the photo as a data: URI (under 1 KB), for CSS backgrounds."""
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.BytesIO(file_obj)
+    elif hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    image = Image.open(file_obj)
+    # JPEG decodes straight at 1/8 scale; plenty for a 16px preview.
+    image.draft("RGB", (PLACEHOLDER_EDGE * 8, PLACEHOLDER_EDGE * 8))
+    image = _to_rgb(ImageOps.exif_transpose(image))
+    image.thumbnail((PLACEHOLDER_EDGE, PLACEHOLDER_EDGE), Image.BILINEAR)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=PLACEHOLDER_JPEG_QUALITY)
+    return "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def safe_render_placeholder(file_obj) -> str:
+    try:
+        return render_placeholder(file_obj)
+    except Exception:
+        return ""
+
+
+EXIF_IFD = 0x8769
+EXIF_ORIENTATION = 0x0112
+EXIF_DATETIME = 0x0132
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_OFFSET_TIME_ORIGINAL = 0x9011
+
+
+def _exif_datetime(value, offset) -> Optional[datetime]:
+    try:
+        moment = datetime.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+    if offset:
+        try:
+            return datetime.strptime(f"{moment:%Y-%m-%d %H:%M:%S} {offset.strip()}", "%Y-%m-%d %H:%M:%S %z")
+        except ValueError:
+            pass
+    # Cameras record local wall-clock time; club events happen in TIME_ZONE.
+    return timezone.make_aware(moment, timezone.get_default_timezone()) if settings.USE_TZ else moment
+
+
+def read_capture_metadata(file_obj) -> Dict[str, object]:
+    """Capture time and displayed size from the image header (no pixel decode).
+
+    Returns {"captured_at": aware datetime or None, "width": int, "height": int};
+    width/height are swapped for EXIF orientations that rotate by 90 degrees.
+    """
+    if isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.BytesIO(file_obj)
+    elif hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    image = Image.open(file_obj)
+    exif = image.getexif()
+    width, height = image.size
+    if exif.get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+        width, height = height, width
+    details = exif.get_ifd(EXIF_IFD)
+    raw = details.get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    captured_at = _exif_datetime(raw, details.get(EXIF_OFFSET_TIME_ORIGINAL)) if raw else None
+    return {"captured_at": captured_at, "width": width, "height": height}
+
+
+def safe_read_capture_metadata(file_obj) -> Dict[str, object]:
+    try:
+        return read_capture_metadata(file_obj)
+    except Exception:
+        return {}
+
+
+def variant_srcset(urls: Dict[str, str]) -> str:
+    """`srcset` value for the variants that exist, e.g. "a.jpg 480w, b.jpg 1600w"."""
+    parts = []
+    for name, max_edge in PHOTO_VARIANTS:
+        url = urls.get(name)
+        if url:
+            parts.append(f"{url} {max_edge}w")
+    return ", ".join(parts)
@@ -1,10 +1,30 @@
+import logging
 import os
 import re
+import threading
+import time
 import uuid
-from typing import List, Dict
-from urllib.parse import quote
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .media_files import strip_content_hash
+from .photo_variants import (
+    NORMALIZED_CONTENT_TYPE,
+    NORMALIZED_EXTENSION,
+    PHOTO_VARIANTS,
+    VARIANT_CONTENT_TYPE,
+    VARIANT_EXTENSION,
+    normalize_photo,
+    render_variants,
+)
+
+logger = logging.getLogger(__name__)
+
+EVENT_PHOTOS_PREFIX = "event_photos/"
 
 
 def _slug_part(value: str) -> str:
@@ -29,27 +49,136 @@ def r2_ready() -> bool:
     )
 
 
-def get_r2_client():
+def presigned_uploads_ready() -> bool:
+    return bool(r2_ready() and settings.R2_PRESIGNED_UPLOADS)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+_call_stats: Dict[str, Dict[str, float]] = {}
+_call_stats_lock = threading.Lock()
+
+
+def _record_call(operation: str, started: Optional[float], failed: bool) -> None:
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    with _call_stats_lock:
+        stats = _call_stats.setdefault(
+            operation, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["calls"] += 1
+        stats["errors"] += int(failed)
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+    logger.debug("R2 %s took %.1f ms%s", operation, elapsed * 1000, " (failed)" if failed else "")
+
+
+def _before_call(model, context, **kwargs):
+    # after-call-error is not given the operation model, so keep its name here.
+    context["r2_operation"] = model.name
+    context["r2_started"] = time.perf_counter()
+
+
+def _after_call(http_response, model, context, **kwargs):
+    _record_call(model.name, context.get("r2_started"), http_response.status_code >= 300)
+
+
+def _after_call_error(context, **kwargs):
+    _record_call(context.get("r2_operation", "unknown"), context.get("r2_started"), True)
+
+
+def _build_r2_client():
     import boto3
     from botocore.config import Config
 
-    return boto3.client(
+    client = boto3.session.Session().client(
         "s3",
         endpoint_url=settings.R2_ENDPOINT_URL,
         aws_access_key_id=settings.R2_ACCESS_KEY_ID,
         aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
         region_name="auto",
-        config=Config(signature_version="s3v4"),
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.R2_CONNECT_TIMEOUT,
+            read_timeout=settings.R2_READ_TIMEOUT,
+            retries={"max_attempts": settings.R2_MAX_ATTEMPTS, "mode": "standard"},
+        ),
     )
+    events = client.meta.events
+    events.register("before-call.s3", _before_call)
+    events.register("after-call.s3", _after_call)
+    events.register("after-call-error.s3", _after_call_error)
+    return client
 
 
-def build_event_photo_key(event, subalbum, owner_profile, original_name: str) -> str:
+def get_r2_client():
+    """The process-wide R2 client.
+
+    boto3 clients are thread-safe, so the upload thread pools, views and
+    management commands all share one client and its connection pool
+    (R2_MAX_POOL_CONNECTIONS) instead of paying the setup on every call.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_r2_client()
+    return _client
+
+
+def reset_r2_client() -> None:
+    """Drop the shared client; the next get_r2_client() builds a new one from settings."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def get_r2_call_stats() -> Dict[str, Dict[str, float]]:
+    """Per-operation call counts and latency of this process, e.g.
+    {"PutObject": {"calls": 3, "errors": 0, "total_seconds": 0.4, "max_seconds": 0.2, "avg_ms": 133.3}}.
+    """
+    with _call_stats_lock:
+        snapshot = {op: dict(stats) for op, stats in _call_stats.items()}
+    for stats in snapshot.values():
+        stats["avg_ms"] = round(stats["total_seconds"] * 1000 / stats["calls"], 1) if stats["calls"] else 0.0
+    return snapshot
+
+
+def reset_r2_call_stats() -> None:
+    with _call_stats_lock:
+        _call_stats.clear()
+
+
+def format_r2_call_stats() -> List[str]:
+    """One human-readable line per operation, for management command output."""
+    return [
+        f"{op}: {stats['calls']} calls, {stats['errors']} errors, "
+        f"avg {stats['avg_ms']} ms, max {stats['max_seconds'] * 1000:.1f} ms"
+        for op, stats in sorted(get_r2_call_stats().items())
+    ]
+
+
+@receiver(setting_changed)
+def _reset_client_on_setting_change(setting, **kwargs):
+    if setting.startswith("R2_"):
+        reset_r2_client()
+
+
+def build_subalbum_prefix(event, subalbum, owner_profile) -> str:
+    """Common key prefix (with trailing slash) of every photo in one subalbum."""
     event_part = f"{event.id}-{_slug_part(event.title)}"
     owner_name = owner_profile.get_full_name() if owner_profile else ""
     owner_part = f"{owner_profile.id if owner_profile else 'unknown'}-{_slug_part(owner_name)}"
     subalbum_part = f"{subalbum.id}-{_slug_part(subalbum.name)}"
+    return f"{EVENT_PHOTOS_PREFIX}{event_part}/{owner_part}/{subalbum_part}/"
+
+
+def build_event_photo_key(event, subalbum, owner_profile, original_name: str) -> str:
     file_part = f"{uuid.uuid4().hex}{_ext(original_name)}"
-    return f"event_photos/{event_part}/{owner_part}/{subalbum_part}/{file_part}"
+    return f"{build_subalbum_prefix(event, subalbum, owner_profile)}{file_part}"
 
 
 def build_object_url(object_key: str) -> str:
@@ -60,8 +189,50 @@ def build_object_url(object_key: str) -> str:
     return f"{endpoint}/{bucket}/{quote(object_key)}"
 
 
-def upload_image_to_r2(*, file_obj, object_key: str, content_type: str = "") -> None:
-    client = get_r2_client()
+def build_variant_key(object_key: str, variant: str) -> str:
+    """Sibling key for a rendition of `object_key`, e.g. `.../abc.jpg` -> `.../abc__thumb.jpg`."""
+    stem, _ = os.path.splitext(object_key)
+    return f"{stem}__{variant}{VARIANT_EXTENSION}"
+
+
+# Suffix of the untouched upload kept next to a normalized photo (R2_KEEP_ORIGINALS).
+ORIGINAL_SUFFIX = "original"
+
+
+def is_variant_key(object_key: str) -> bool:
+    # Files migrated from local media carry a content hash after the variant suffix.
+    stem = strip_content_hash(os.path.splitext(object_key or "")[0])
+    names = [name for name, _ in PHOTO_VARIANTS] + [ORIGINAL_SUFFIX]
+    return any(stem.endswith(f"__{name}") for name in names)
+
+
+def normalized_photo_key(object_key: str) -> str:
+    return os.path.splitext(object_key)[0] + NORMALIZED_EXTENSION
+
+
+def original_photo_key(object_key: str) -> str:
+    stem, ext = os.path.splitext(object_key)
+    return f"{stem}__{ORIGINAL_SUFFIX}{ext}"
+
+
+def object_key_from_url(url: str) -> str:
+    """Inverse of build_object_url; returns '' for URLs outside our bucket."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    prefixes = []
+    if settings.R2_PUBLIC_BASE_URL:
+        prefixes.append(settings.R2_PUBLIC_BASE_URL.rstrip("/") + "/")
+    if settings.R2_ENDPOINT_URL and settings.R2_BUCKET_NAME:
+        prefixes.append(f"{settings.R2_ENDPOINT_URL.rstrip('/')}/{settings.R2_BUCKET_NAME}/")
+    for prefix in prefixes:
+        if url.startswith(prefix):
+            return unquote(url[len(prefix):])
+    return ""
+
+
+def upload_image_to_r2(*, file_obj, object_key: str, content_type: str = "", client=None) -> None:
+    client = client or get_r2_client()
     params = {
         "Bucket": settings.R2_BUCKET_NAME,
         "Key": object_key,
@@ -72,19 +243,153 @@ def upload_image_to_r2(*, file_obj, object_key: str, content_type: str = "") ->
     client.put_object(**params)
 
 
+def presign_upload_url(*, object_key: str, content_type: str, client=None) -> str:
+    """Presigned PUT URL the browser can upload one object to directly.
+
+    The signature covers the content type, so the PUT must send the same
+    Content-Type header.
+    """
+    client = client or get_r2_client()
+    return client.generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": settings.R2_BUCKET_NAME,
+            "Key": object_key,
+            "ContentType": content_type,
+        },
+        ExpiresIn=settings.R2_PRESIGN_EXPIRES,
+    )
+
+
+def delete_object(object_key: str, client=None) -> None:
+    client = client or get_r2_client()
+    client.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=object_key)
+
+
+def head_object(object_key: str, client=None) -> Optional[Dict[str, object]]:
+    """Size and content type of a stored object, or None if it does not exist."""
+    from botocore.exceptions import ClientError
+
+    client = client or get_r2_client()
+    try:
+        response = client.head_object(Bucket=settings.R2_BUCKET_NAME, Key=object_key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return {
+        "size": response.get("ContentLength", 0),
+        "content_type": (response.get("ContentType") or "").lower(),
+    }
+
+
+def read_object_bytes(object_key: str, client=None) -> bytes:
+    client = client or get_r2_client()
+    response = client.get_object(Bucket=settings.R2_BUCKET_NAME, Key=object_key)
+    return response["Body"].read()
+
+
+def _normalize_upload(data: bytes) -> Optional[bytes]:
+    if not settings.R2_NORMALIZE_UPLOADS:
+        return None
+    try:
+        return normalize_photo(
+            data,
+            max_edge=settings.R2_NORMALIZE_MAX_EDGE,
+            quality=settings.R2_NORMALIZE_QUALITY,
+        )
+    except Exception:
+        logger.warning("Could not normalize upload, storing it as is", exc_info=True)
+        return None
+
+
+def store_event_photo(
+    *, data: bytes, object_key: str, content_type: str = "", in_bucket: bool = False, client=None
+) -> Dict[str, object]:
+    """Store one uploaded photo, normalized to WebP when R2_NORMALIZE_UPLOADS is on.
+
+    `in_bucket` means the original is already stored at `object_key` (presigned
+    upload); it is then moved aside (R2_KEEP_ORIGINALS) or deleted once the
+    normalized copy exists. Returns {"key", "original_bytes", "stored_bytes"}.
+    """
+    client = client or get_r2_client()
+    normalized = _normalize_upload(data)
+    if normalized is None:
+        if not in_bucket:
+            upload_image_to_r2(file_obj=data, object_key=object_key, content_type=content_type, client=client)
+        return {"key": object_key, "original_bytes": len(data), "stored_bytes": len(data)}
+
+    stored_key = normalized_photo_key(object_key)
+    # The original goes aside first: a presigned .webp key is also the normalized key.
+    if settings.R2_KEEP_ORIGINALS:
+        if in_bucket:
+            client.copy_object(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=original_photo_key(object_key),
+                CopySource={"Bucket": settings.R2_BUCKET_NAME, "Key": object_key},
+            )
+        else:
+            upload_image_to_r2(
+                file_obj=data, object_key=original_photo_key(object_key), content_type=content_type, client=client
+            )
+    upload_image_to_r2(
+        file_obj=normalized, object_key=stored_key, content_type=NORMALIZED_CONTENT_TYPE, client=client
+    )
+    if in_bucket and stored_key != object_key:
+        delete_object(object_key, client=client)
+    return {"key": stored_key, "original_bytes": len(data), "stored_bytes": len(normalized)}
+
+
+def read_object_head_bytes(object_key: str, length: int, client=None) -> bytes:
+    """First `length` bytes of an object (HTTP Range), e.g. to parse image headers."""
+    client = client or get_r2_client()
+    response = client.get_object(
+        Bucket=settings.R2_BUCKET_NAME, Key=object_key, Range=f"bytes=0-{length - 1}"
+    )
+    return response["Body"].read()
+
+
+def upload_event_photo_variants(*, file_obj, object_key: str, client=None) -> Dict[str, str]:
+    """Render thumbnail/medium variants of an uploaded photo and store them next to it.
+
+    Returns {variant name: public URL}.
+    """
+    urls = {}
+    for name, data in render_variants(file_obj).items():
+        key = build_variant_key(object_key, name)
+        upload_image_to_r2(file_obj=data, object_key=key, content_type=VARIANT_CONTENT_TYPE, client=client)
+        urls[name] = build_object_url(key)
+    return urls
+
+
+def safe_upload_event_photo_variants(*, file_obj, object_key: str, client=None) -> Dict[str, str]:
+    """Like upload_event_photo_variants, but a broken image never fails the upload itself."""
+    try:
+        return upload_event_photo_variants(file_obj=file_obj, object_key=object_key, client=client)
+    except Exception:
+        logger.warning("Could not render variants for %s", object_key, exc_info=True)
+        return {}
+
+
+def iter_object_key_pages(prefix: str, *, start_after: str = "", client=None):
+    """Yield the keys under `prefix` one listing page (up to 1000 keys) at a time, in key order."""
+    client = client or get_r2_client()
+    params = {"Bucket": settings.R2_BUCKET_NAME, "Prefix": prefix}
+    if start_after:
+        params["StartAfter"] = start_after
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(**params):
+        keys = [item["Key"] for item in page.get("Contents", []) if item.get("Key")]
+        if keys:
+            yield keys
+
+
 def list_subalbum_images(*, event, subalbum, owner_profile) -> List[Dict[str, str]]:
-    client = get_r2_client()
-    event_part = f"{event.id}-{_slug_part(event.title)}"
-    owner_name = owner_profile.get_full_name() if owner_profile else ""
-    owner_part = f"{owner_profile.id if owner_profile else 'unknown'}-{_slug_part(owner_name)}"
-    subalbum_part = f"{subalbum.id}-{_slug_part(subalbum.name)}"
-    prefix = f"event_photos/{event_part}/{owner_part}/{subalbum_part}/"
+    prefix = build_subalbum_prefix(event, subalbum, owner_profile)
     objects = []
-    paginator = client.get_paginator("list_objects_v2")
-    for page in paginator.paginate(Bucket=settings.R2_BUCKET_NAME, Prefix=prefix):
-        for item in page.get("Contents", []):
-            key = item.get("Key")
-            if not key:
+    for keys in iter_object_key_pages(prefix):
+        for key in keys:
+            if is_variant_key(key):
                 continue
             objects.append(
                 {
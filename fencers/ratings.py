@@ -0,0 +1,231 @@
+"""Club rating: an Elo/Glicko-style number per fencer built from event results.
+
+Every rated event turns a participation into a performance score in [0, 1]:
+mostly the placement within the field (position relative to
+participants_count), plus the bout win ratio and the touch differential when
+they were recorded. The score is compared with the expected score of the
+fencer's current rating against a field of FIELD_RATING, and the rating moves
+by K * (score - expected). K scales with the rating deviation, which starts
+high and shrinks with every rated event, so newcomers settle quickly and
+established ratings move slowly (the Glicko idea without the full machinery).
+
+Events are processed in (date, id) order and every change is stored in
+FencerRatingHistory. Adding results for the newest event therefore only
+processes that event; changing an older one rolls the history back to it and
+replays what follows. `rebuild_ratings()` replays everything and always ends
+in the same state.
+"""
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .deferred import on_commit_merged
+
+INITIAL_RATING = 1500.0
+INITIAL_DEVIATION = 350.0
+MIN_DEVIATION = 60.0
+# Share of the deviation kept after each rated event.
+DEVIATION_DECAY = 0.85
+FIELD_RATING = 1500.0
+# K for a fencer at INITIAL_DEVIATION; proportionally less as the deviation shrinks.
+MAX_K = 64.0
+
+PLACEMENT_WEIGHT = 0.6
+BOUTS_WEIGHT = 0.25
+TOUCHES_WEIGHT = 0.15
+
+
+def rated_event_types():
+    from .models import Event
+
+    return (Event.EventType.TOURNAMENT, Event.EventType.HUMANITARIAN)
+
+
+def performance_score(participation, participants_count):
+    """Weighted result in [0, 1], or None when the participation carries no result."""
+    parts = []
+    position = participation.position
+    if position and position > 0 and participants_count and participants_count > 0:
+        if participants_count == 1:
+            placement = 1.0
+        else:
+            placement = 1.0 - (min(position, participants_count) - 1) / (participants_count - 1)
+        parts.append((PLACEMENT_WEIGHT, placement))
+    bouts = participation.wins + participation.losses
+    if bouts > 0:
+        parts.append((BOUTS_WEIGHT, participation.wins / bouts))
+    touches = participation.touches_scored + participation.touches_received
+    if touches > 0:
+        parts.append((TOUCHES_WEIGHT, 0.5 + (participation.touches_scored - participation.touches_received) / (2 * touches)))
+    if not parts:
+        return None
+    total = sum(weight for weight, _ in parts)
+    return sum(weight * value for weight, value in parts) / total
+
+
+def expected_score(rating):
+    return 1.0 / (1.0 + 10 ** ((FIELD_RATING - rating) / 400.0))
+
+
+def rate(rating, deviation, score):
+    """(new rating, new deviation) after one event with performance `score`."""
+    k = MAX_K * deviation / INITIAL_DEVIATION
+    new_rating = rating + k * (score - expected_score(rating))
+    new_deviation = max(MIN_DEVIATION, deviation * DEVIATION_DECAY)
+    return new_rating, new_deviation
+
+
+def _after(event_date, event_id, prefix=""):
+    """Q for events at or after (event_date, event_id) in processing order."""
+    return Q(**{f"{prefix}date__gt": event_date}) | Q(
+        **{f"{prefix}date": event_date, f"{prefix}id__gte": event_id}
+    )
+
+
+def _rollback(event_date, event_id):
+    """Undo all history from (event_date, event_id) on; returns the restored ratings by fencer id."""
+    from .models import FencerRating, FencerRatingHistory
+
+    later = FencerRatingHistory.objects.filter(_after(event_date, event_id, "event__"))
+    restored = {}
+    undone = {}
+    # History rows are only ever appended in processing order, so the lowest pk is the
+    # fencer's first undone change even when the event it belongs to has since moved.
+    for fencer_id, rating, deviation in later.order_by("pk").values_list(
+        "fencer_id", "rating_before", "deviation_before"
+    ):
+        restored.setdefault(fencer_id, (rating, deviation))
+        undone[fencer_id] = undone.get(fencer_id, 0) + 1
+    if not restored:
+        return {}
+    later.delete()
+
+    last_dates = dict(
+        FencerRatingHistory.objects.filter(fencer_id__in=list(restored))
+        .values("fencer_id")
+        .annotate(last=Max("event__date"))
+        .values_list("fencer_id", "last")
+    )
+    ratings = {r.fencer_id: r for r in FencerRating.objects.filter(fencer_id__in=list(restored))}
+    for fencer_id, (rating, deviation) in restored.items():
+        row = ratings.get(fencer_id)
+        if row is None:
+            continue
+        row.rating = rating
+        row.deviation = deviation
+        row.events_count = max(row.events_count - undone[fencer_id], 0)
+        row.last_event_date = last_dates.get(fencer_id)
+    return ratings
+
+
+def _replay(event_date=None, event_id=None):
+    """Process rated events from (event_date, event_id) on (everything when None)."""
+    from .models import Event, EventParticipation, FencerRating, FencerRatingHistory
+
+    ratings = _rollback(event_date, event_id) if event_date is not None else {}
+    events = Event.objects.filter(event_type__in=rated_event_types()).order_by("date", "id")
+    if event_date is not None:
+        events = events.filter(_after(event_date, event_id))
+    events = list(events.only("id", "date", "participants_count"))
+    participations = (
+        EventParticipation.objects.filter(event__in=events)
+        .only("id", "fencer_id", "event_id", "position", "wins", "losses", "touches_scored", "touches_received")
+        .order_by("event_id", "fencer_id")
+    )
+    by_event = {}
+    for participation in participations:
+        by_event.setdefault(participation.event_id, []).append(participation)
+
+    fencer_ids = {p.fencer_id for rows in by_event.values() for p in rows}
+    missing = fencer_ids - set(ratings)
+    if missing:
+        ratings.update({r.fencer_id: r for r in FencerRating.objects.filter(fencer_id__in=missing)})
+
+    history = []
+    for event in events:
+        for participation in by_event.get(event.id, ()):
+            score = performance_score(participation, event.participants_count)
+            if score is None:
+                continue
+            row = ratings.get(participation.fencer_id)
+            if row is None:
+                row = ratings[participation.fencer_id] = FencerRating(
+                    fencer_id=participation.fencer_id,
+                    rating=INITIAL_RATING,
+                    deviation=INITIAL_DEVIATION,
+                )
+            new_rating, new_deviation = rate(row.rating, row.deviation, score)
+            history.append(
+                FencerRatingHistory(
+                    fencer_id=participation.fencer_id,
+                    event_id=event.id,
+                    performance=score,
+                    rating_before=row.rating,
+                    rating_after=new_rating,
+                    deviation_before=row.deviation,
+                    deviation_after=new_deviation,
+                )
+            )
+            row.rating = new_rating
+            row.deviation = new_deviation
+            row.events_count += 1
+            row.last_event_date = event.date
+
+    _store(ratings, history)
+    return len(history)
+
+
+def _store(ratings, history):
+    """Save replayed (or rolled back) FencerRating rows and new history rows."""
+    from .models import FencerRating, FencerRatingHistory
+
+    FencerRatingHistory.objects.bulk_create(history, batch_size=500)
+    FencerRating.objects.bulk_create(
+        [row for row in ratings.values() if row.pk is None], batch_size=500
+    )
+    now = timezone.now()
+    stored = []
+    for row in ratings.values():
+        if row.pk is not None and row.events_count:
+            row.updated_at = now
+            stored.append(row)
+    if stored:
+        FencerRating.objects.bulk_update(
+            stored, ["rating", "deviation", "events_count", "last_event_date", "updated_at"], batch_size=500
+        )
+    # Fencers whose only rated results were rolled back end up unrated, as after a rebuild.
+    FencerRating.objects.filter(
+        pk__in=[row.pk for row in ratings.values() if row.pk is not None and not row.events_count]
+    ).delete()
+
+
+def update_ratings_from(event_date, event_id):
+    """Re-rate everything from one event on, e.g. after its results were imported or edited."""
+    with transaction.atomic():
+        return _replay(event_date, event_id)
+
+
+def rollback_ratings_from(event_date, event_id):
+    """Undo the history from one event on without replaying, e.g. before the event is deleted."""
+    with transaction.atomic():
+        _store(_rollback(event_date, event_id), [])
+
+
+def schedule_ratings_update(event_date, event_id):
+    """update_ratings_from() once the current transaction commits.
+
+    Everything queued in one transaction is replayed once, from the earliest
+    (date, id) point, so a whole import costs a single replay.
+    """
+    on_commit_merged("ratings", (event_date, event_id), min, lambda point: update_ratings_from(*point))
+
+
+def rebuild_ratings():
+    """Drop all ratings and replay every rated event; returns the number of history rows."""
+    from .models import FencerRating, FencerRatingHistory
+
+    with transaction.atomic():
+        FencerRatingHistory.objects.all().delete()
+        FencerRating.objects.all().delete()
+        return _replay()
@@ -0,0 +1,196 @@
+"""Season and month rollups of event results for charts.
+
+FencerSeasonRollup and ClubSeasonRollup hold additive totals per period
+(season or calendar month), event type and event gender. Charts read a
+handful of these rows instead of scanning EventParticipation. A change to a
+participation recomputes only the season it falls into, for its fencer and
+the fencer's club. `rebuild_season_rollups` recomputes everything.
+
+Club rows count the results of the club's current members, so a fencer
+who changes clubs takes their history along.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .deferred import on_commit_merged
+from .seasons import season_bounds, season_start_year
+
+ADDITIVE_FIELDS = (
+    "participations",
+    "events_count",
+    "wins",
+    "losses",
+    "touches_scored",
+    "touches_received",
+    "points",
+    "percentile_sum",
+    "percentile_count",
+)
+
+
+def _month_totals(participations, owner):
+    """Grouped totals per (owner, event type, gender, month) as dicts."""
+    return (
+        participations.values(owner, "event__event_type", "event__gender", month=TruncMonth("event__date"))
+        .annotate(
+            participations=Count("id"),
+            events_count=Count("event_id", distinct=True),
+            wins=Coalesce(Sum("wins"), 0),
+            losses=Coalesce(Sum("losses"), 0),
+            touches_scored=Coalesce(Sum("touches_scored"), 0),
+            touches_received=Coalesce(Sum("touches_received"), 0),
+            points=Coalesce(Sum("points"), Value(0.0)),
+            best_percentile=Min("percentile"),
+            percentile_sum=Coalesce(Sum("percentile"), Value(0.0)),
+            percentile_count=Count("percentile"),
+        )
+        .order_by()
+    )
+
+
+def _rollups(model, owner_field, rows, owner):
+    """Unsaved month rows plus the season rows summed from them.
+
+    An event falls into exactly one month, so adding months up keeps even the
+    distinct `events_count` exact.
+    """
+    from .models import RollupPeriod
+
+    months = []
+    seasons = {}
+    for row in rows:
+        month = row["month"]
+        season = season_start_year(month)
+        values = {field: row[field] for field in ADDITIVE_FIELDS}
+        months.append(
+            model(
+                **{owner_field: row[owner]},
+                period=RollupPeriod.MONTH,
+                period_start=month,
+                season=season,
+                event_type=row["event__event_type"],
+                gender=row["event__gender"],
+                best_percentile=row["best_percentile"],
+                **values,
+            )
+        )
+        key = (row[owner], season, row["event__event_type"], row["event__gender"])
+        total = seasons.get(key)
+        if total is None:
+            seasons[key] = model(
+                **{owner_field: row[owner]},
+                period=RollupPeriod.SEASON,
+                period_start=season_bounds(season)[0],
+                season=season,
+                event_type=row["event__event_type"],
+                gender=row["event__gender"],
+                best_percentile=row["best_percentile"],
+                **values,
+            )
+            continue
+        for field, value in values.items():
+            setattr(total, field, getattr(total, field) + value)
+        if row["best_percentile"] is not None and (
+            total.best_percentile is None or row["best_percentile"] < total.best_percentile
+        ):
+            total.best_percentile = row["best_percentile"]
+    return months + list(seasons.values())
+
+
+def _fencer_rollups(participations):
+    from .models import FencerSeasonRollup
+
+    return _rollups(FencerSeasonRollup, "fencer_id", _month_totals(participations, "fencer_id"), "fencer_id")
+
+
+def _club_rollups(participations):
+    from .models import ClubSeasonRollup
+
+    participations = participations.filter(fencer__club__isnull=False)
+    return _rollups(ClubSeasonRollup, "club_id", _month_totals(participations, "fencer__club_id"), "fencer__club_id")
+
+
+def _with_clubs(fencer_ids, club_ids):
+    from .models import FencerProfile
+
+    fencer_ids = {fencer_id for fencer_id in fencer_ids if fencer_id}
+    club_ids = set(club_ids) | set(
+        FencerProfile.objects.filter(pk__in=fencer_ids, club__isnull=False).values_list("club_id", flat=True)
+    )
+    club_ids.discard(None)
+    return fencer_ids, club_ids
+
+
+def refresh_season_rollups(fencer_ids, seasons, club_ids=()):
+    """Recompute the given seasons (start years; None = all) for the fencers, their clubs and `club_ids`."""
+    from .models import ClubSeasonRollup, EventParticipation, FencerSeasonRollup
+
+    fencer_ids, club_ids = _with_clubs(fencer_ids, club_ids)
+    if not fencer_ids and not club_ids:
+        return
+    periods = [None] if seasons is None else sorted({season for season in seasons if season is not None})
+
+    with transaction.atomic():
+        for season in periods:
+            participations = EventParticipation.objects.all()
+            fencer_rows = FencerSeasonRollup.objects.filter(fencer_id__in=fencer_ids)
+            club_rows = ClubSeasonRollup.objects.filter(club_id__in=club_ids)
+            if season is not None:
+                participations = participations.filter(event__date__range=season_bounds(season))
+                fencer_rows = fencer_rows.filter(season=season)
+                club_rows = club_rows.filter(season=season)
+            if fencer_ids:
+                fencer_rows.delete()
+                FencerSeasonRollup.objects.bulk_create(
+                    _fencer_rollups(participations.filter(fencer_id__in=fencer_ids)), batch_size=500
+                )
+            if club_ids:
+                club_rows.delete()
+                ClubSeasonRollup.objects.bulk_create(
+                    _club_rollups(participations.filter(fencer__club_id__in=club_ids)), batch_size=500
+                )
+
+
+def _merge_season_groups(queued, groups):
+    for season, (fencer_ids, club_ids) in groups.items():
+        queued_fencers, queued_clubs = queued.setdefault(season, (set(), set()))
+        queued_fencers |= fencer_ids
+        queued_clubs |= club_ids
+    return queued
+
+
+def _refresh_season_groups(groups):
+    for season, (fencer_ids, club_ids) in groups.items():
+        refresh_season_rollups(fencer_ids, None if season is None else [season], club_ids)
+
+
+def schedule_season_rollups_refresh(fencer_ids, seasons, club_ids=()):
+    """refresh_season_rollups() after the current transaction commits.
+
+    Clubs are looked up now: a fencer being deleted is gone by then. Work
+    queued in one transaction is merged per season (None = all seasons) and
+    refreshed once.
+    """
+    fencer_ids, club_ids = _with_clubs(fencer_ids, club_ids)
+    if not fencer_ids and not club_ids:
+        return
+    seasons = [None] if seasons is None else {season for season in seasons if season is not None}
+    groups = {season: (set(fencer_ids), set(club_ids)) for season in seasons}
+    if groups:
+        on_commit_merged("season_rollups", groups, _merge_season_groups, _refresh_season_groups)
+
+
+def rebuild_season_rollups():
+    """Recompute every rollup row; returns (fencer rows, club rows) stored."""
+    from .models import ClubSeasonRollup, EventParticipation, FencerSeasonRollup
+
+    fencer_rows = _fencer_rollups(EventParticipation.objects.all())
+    club_rows = _club_rollups(EventParticipation.objects.all())
+    with transaction.atomic():
+        FencerSeasonRollup.objects.all().delete()
+        ClubSeasonRollup.objects.all().delete()
+        FencerSeasonRollup.objects.bulk_create(fencer_rows, batch_size=500)
+        ClubSeasonRollup.objects.bulk_create(club_rows, batch_size=500)
+    return len(fencer_rows), len(club_rows)
@@ -0,0 +1,30 @@
+"""Fencing seasons: a season runs from September to the end of August.
+
+A season is identified by the year it starts in; 2024 is "2024/2025".
+"""
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+SEASON_START_MONTH = 9
+
+
+def season_start_year(day: date) -> int:
+    return day.year if day.month >= SEASON_START_MONTH else day.year - 1
+
+
+def season_bounds(start_year: int) -> Tuple[date, date]:
+    """First and last day of the season starting in `start_year` (both inclusive)."""
+    return date(start_year, SEASON_START_MONTH, 1), date(start_year + 1, SEASON_START_MONTH, 1) - timedelta(days=1)
+
+
+def season_label(start_year: int) -> str:
+    return f"{start_year}/{start_year + 1}"
+
+
+def parse_season(value: str) -> Optional[int]:
+    """Start year from "2024", "2024/2025" or "2024/25"; None when it is not a season."""
+    head = (value or "").strip().split("/", 1)[0]
+    if len(head) != 4 or not head.isdigit():
+        return None
+    return int(head)
@@ -1,6 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Event, PhotoAlbum
+from .fencer_stats import schedule_fencer_stats_refresh
+from .models import Event, EventParticipation, EventPhoto, FencerProfile, PhotoAlbum
+from .photo_albums import invalidate_album_year_facets
+from .photo_tags import schedule_tag_vocabulary_refresh
+from .ratings import rated_event_types, rollback_ratings_from, schedule_ratings_update
+from .season_rollups import schedule_season_rollups_refresh
+from .seasons import season_start_year
 
 
 @receiver(post_save, sender=Event)
@@ -9,3 +16,174 @@ def create_photo_album_for_event(sender, instance, created, **kwargs):
     if created:
         PhotoAlbum.objects.get_or_create(event=instance)
 
+
+@receiver(post_save, sender=PhotoAlbum)
+@receiver(post_delete, sender=PhotoAlbum)
+@receiver(post_save, sender=Event)
+def forget_album_year_facets(sender, **kwargs):
+    """Albums or event dates changed: the year filter counts must be rebuilt."""
+    invalidate_album_year_facets()
+
+
+@receiver(post_delete, sender=EventPhoto)
+def forget_deleted_photo_tags(sender, instance, **kwargs):
+    """The cached tag vocabulary counts the deleted photo's tags."""
+    if instance.tags:
+        schedule_tag_vocabulary_refresh()
+
+
+@receiver(pre_save, sender=FencerProfile)
+def remember_fencer_short_name_tag(sender, instance, **kwargs):
+    """Short name tag before the save: only a change to it touches the tag vocabulary."""
+    instance._previous_short_name_tag = None
+    if instance.pk:
+        previous = FencerProfile.objects.filter(pk=instance.pk).values_list('first_name', 'last_name').first()
+        if previous:
+            instance._previous_short_name_tag = FencerProfile(first_name=previous[0], last_name=previous[1]).short_name_tag
+
+
+@receiver(post_save, sender=FencerProfile)
+def update_fencer_tag_label(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_previous_short_name_tag', None) != instance.short_name_tag:
+        schedule_tag_vocabulary_refresh()
+
+
+@receiver(post_delete, sender=FencerProfile)
+def forget_fencer_tag_label(sender, instance, **kwargs):
+    schedule_tag_vocabulary_refresh()
+
+
+@receiver(pre_save, sender=EventParticipation)
+def remember_participation_fencer(sender, instance, **kwargs):
+    """A participation moved to another fencer (or event) must refresh the old one too."""
+    instance._previous_fencer_id = None
+    instance._previous_event_id = None
+    if instance.pk:
+        previous = EventParticipation.objects.filter(pk=instance.pk).values_list('fencer_id', 'event_id').first()
+        if previous:
+            instance._previous_fencer_id, instance._previous_event_id = previous
+
+
+@receiver(post_save, sender=EventParticipation)
+@receiver(post_delete, sender=EventParticipation)
+def refresh_participation_fencer_stats(sender, instance, **kwargs):
+    schedule_fencer_stats_refresh({instance.fencer_id, getattr(instance, '_previous_fencer_id', None)} - {None})
+
+
+def _earliest_rating_point(event_ids):
+    """(date, id) of the earliest of the given rated events that still exist, or None."""
+    return (
+        Event.objects.filter(pk__in=[pk for pk in event_ids if pk], event_type__in=rated_event_types())
+        .order_by('date', 'id')
+        .values_list('date', 'id')
+        .first()
+    )
+
+
+def _deleted_with(origin, *models):
+    """True when a post_delete cascades from deleting an instance (or queryset) of `models`."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+
+@receiver(post_save, sender=EventParticipation)
+@receiver(post_delete, sender=EventParticipation)
+def update_participation_ratings(sender, instance, origin=None, **kwargs):
+    """Results imported or edited: re-rate from that event on."""
+    if _deleted_with(origin, Event, FencerProfile):
+        # The event's own pre_delete has handled it; a deleted fencer's ratings go with them.
+        return
+    point = _earliest_rating_point({instance.event_id, getattr(instance, '_previous_event_id', None)})
+    if point:
+        schedule_ratings_update(*point)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_result_inputs(sender, instance, **kwargs):
+    """(date, event_type, gender, participants_count) before the save, for ratings and rollups."""
+    instance._previous_result_inputs = None
+    if instance.pk:
+        instance._previous_result_inputs = (
+            Event.objects.filter(pk=instance.pk)
+            .values_list('date', 'event_type', 'gender', 'participants_count')
+            .first()
+        )
+
+
+def _changed_result_inputs(instance, created):
+    """The event's previous result inputs when a saved change affects results, else None."""
+    previous = getattr(instance, '_previous_result_inputs', None)
+    if created or not previous:
+        return None
+    if previous == (instance.date, instance.event_type, instance.gender, instance.participants_count):
+        return None
+    return previous
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_fencer_stats(sender, instance, created, **kwargs):
+    """A new event type or participant count changes the stats of everyone who took part."""
+    previous = _changed_result_inputs(instance, created)
+    if not previous or (previous[1], previous[3]) == (instance.event_type, instance.participants_count):
+        return
+    schedule_fencer_stats_refresh(instance.participations.values_list('fencer_id', flat=True))
+
+
+@receiver(post_save, sender=Event)
+def update_event_ratings(sender, instance, created, **kwargs):
+    """A new date, type or field size changes the event's ratings and the order of what follows."""
+    previous = _changed_result_inputs(instance, created)
+    if not previous:
+        return
+    if previous[1] not in rated_event_types() and instance.event_type not in rated_event_types():
+        return
+    schedule_ratings_update(min(previous[0], instance.date), instance.pk)
+
+
+@receiver(pre_delete, sender=Event)
+def drop_deleted_event_ratings(sender, instance, **kwargs):
+    """Roll ratings back before the cascade removes the event's history rows, replay after commit."""
+    if instance.rating_changes.exists():
+        rollback_ratings_from(instance.date, instance.pk)
+        schedule_ratings_update(instance.date, instance.pk)
+
+
+@receiver(post_save, sender=EventParticipation)
+@receiver(post_delete, sender=EventParticipation)
+def refresh_participation_season_rollups(sender, instance, **kwargs):
+    dates = Event.objects.filter(
+        pk__in={instance.event_id, getattr(instance, '_previous_event_id', None)} - {None}
+    ).values_list('date', flat=True)
+    schedule_season_rollups_refresh(
+        {instance.fencer_id, getattr(instance, '_previous_fencer_id', None)} - {None},
+        {season_start_year(day) for day in dates},
+    )
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_season_rollups(sender, instance, created, **kwargs):
+    previous = _changed_result_inputs(instance, created)
+    if not previous:
+        return
+    schedule_season_rollups_refresh(
+        instance.participations.values_list('fencer_id', flat=True),
+        {season_start_year(previous[0]), season_start_year(instance.date)},
+    )
+
+
+@receiver(pre_save, sender=FencerProfile)
+def remember_fencer_club(sender, instance, **kwargs):
+    instance._previous_club_id = None
+    if instance.pk:
+        instance._previous_club_id = (
+            FencerProfile.objects.filter(pk=instance.pk).values_list('club_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=FencerProfile)
+def refresh_club_season_rollups(sender, instance, created, **kwargs):
+    """Club totals follow members: both the old and the new club are recounted."""
+    previous = getattr(instance, '_previous_club_id', None)
+    if created or previous == instance.club_id:
+        return
+    schedule_season_rollups_refresh((), None, {previous, instance.club_id} - {None})
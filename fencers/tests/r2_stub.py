@@ -0,0 +1,94 @@
+"""In-memory stand-in for the boto3 S3 client used against R2."""
+
+import io
+import threading
+
+from botocore.exceptions import ClientError
+from PIL import Image
+
+
+class StubR2Client:
+    """The subset of the S3 client API fencers.r2_storage calls, backed by a dict."""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+        # That many of the next put_object calls fail, as a flaky R2 would.
+        self.fail_next_puts = 0
+        self._lock = threading.Lock()
+
+    def _record(self, operation, key):
+        with self._lock:
+            self.calls.append((operation, key))
+
+    def _missing(self, operation):
+        return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, operation)
+
+    def put_object(self, *, Bucket, Key, Body, ContentType="", **kwargs):
+        self._record("put_object", Key)
+        with self._lock:
+            failing = self.fail_next_puts > 0
+            self.fail_next_puts -= failing
+        if failing:
+            raise ClientError({"Error": {"Code": "500", "Message": "Internal Error"}}, "PutObject")
+        data = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+        with self._lock:
+            self.objects[Key] = (bytes(data), ContentType)
+        return {}
+
+    def get_object(self, *, Bucket, Key, **kwargs):
+        self._record("get_object", Key)
+        if Key not in self.objects:
+            raise self._missing("GetObject")
+        return {"Body": io.BytesIO(self.objects[Key][0])}
+
+    def head_object(self, *, Bucket, Key):
+        self._record("head_object", Key)
+        if Key not in self.objects:
+            raise self._missing("HeadObject")
+        data, content_type = self.objects[Key]
+        return {"ContentLength": len(data), "ContentType": content_type}
+
+    def copy_object(self, *, Bucket, Key, CopySource, **kwargs):
+        self._record("copy_object", Key)
+        with self._lock:
+            self.objects[Key] = self.objects[CopySource["Key"]]
+        return {}
+
+    def delete_object(self, *, Bucket, Key):
+        self._record("delete_object", Key)
+        with self._lock:
+            self.objects.pop(Key, None)
+        return {}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn=None):
+        return f"https://r2.test/{Params['Bucket']}/{Params['Key']}?signature=stub"
+
+    def browser_put(self, key, data, content_type):
+        """What the browser does with a presigned URL."""
+        self.objects[key] = (data, content_type)
+
+
+R2_TEST_SETTINGS = {
+    "R2_ENABLED": True,
+    "R2_ACCESS_KEY_ID": "test",
+    "R2_SECRET_ACCESS_KEY": "test",
+    "R2_BUCKET_NAME": "photos",
+    "R2_ENDPOINT_URL": "https://r2.test",
+    "R2_PUBLIC_BASE_URL": "",
+    "R2_PRESIGNED_UPLOADS": True,
+    "R2_NORMALIZE_UPLOADS": False,
+    "R2_KEEP_ORIGINALS": False,
+    "R2_UPLOAD_WORKERS": 2,
+    "PHOTO_DUPLICATE_POLICY": "reject",
+    "SECURE_SSL_REDIRECT": False,
+}
+
+
+def jpeg_bytes(color=(200, 30, 30), box=(0, 0, 32, 24)):
+    """A small photo with enough structure for a stable perceptual hash; `box` sets its shape."""
+    buffer = io.BytesIO()
+    image = Image.new("RGB", (64, 48), color)
+    image.paste((20, 20, 220), box)
+    image.save(buffer, "JPEG")
+    return buffer.getvalue()
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.test import TestCase
+
+from fencers.deferred import on_commit_merged
+
+
+class OnCommitMergedTests(TestCase):
+    def queue(self, runs, value):
+        on_commit_merged("test", {value}, set.union, runs.append)
+
+    def test_work_of_one_transaction_runs_once(self):
+        runs = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for value in (1, 2, 2, 3):
+                self.queue(runs, value)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(runs, [{1, 2, 3}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.queue(runs, 4)
+        self.assertEqual(runs, [{1, 2, 3}, {4}])
+
+    def test_rolled_back_savepoint_does_not_swallow_later_work(self):
+        runs = []
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.queue(runs, 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.queue(runs, 2)
+        self.assertEqual(runs, [{2}])
@@ -0,0 +1,48 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from fencers import fencer_stats
+from fencers.models import Event, EventParticipation, FencerProfile, FencerStatsSnapshot
+
+
+def snapshot_state():
+    return sorted(
+        FencerStatsSnapshot.objects.values_list(
+            "fencer_id", "event_type", "events_count", "wins", "losses", "best_percentile", "average_percentile"
+        )
+    )
+
+
+class FencerStatsRefreshTests(TestCase):
+    def test_import_refreshes_once_and_matches_rebuild(self):
+        fencers = [FencerProfile.objects.create(first_name=f"F{i}", last_name="L") for i in range(4)]
+        refresh = mock.Mock(wraps=fencer_stats.refresh_fencer_stats)
+        with mock.patch.object(fencer_stats, "refresh_fencer_stats", refresh):
+            with self.captureOnCommitCallbacks(execute=True):
+                for k in range(3):
+                    event = Event.objects.create(
+                        title=f"T{k}", date=date(2025, 1 + k, 1), event_type=Event.EventType.TOURNAMENT, participants_count=8
+                    )
+                    for j, fencer in enumerate(fencers):
+                        EventParticipation.objects.create(event=event, fencer=fencer, position=j + 1, wins=3 - j, losses=j)
+        refresh.assert_called_once_with({f.id for f in fencers})
+
+        incremental = snapshot_state()
+        fencer_stats.rebuild_fencer_stats()
+        self.assertEqual(incremental, snapshot_state())
+        self.assertEqual(len(incremental), 4)
+
+    def test_event_edits_refresh_only_when_results_change(self):
+        fencer = FencerProfile.objects.create(first_name="Jan", last_name="Novák")
+        event = Event.objects.create(title="Cup", date=date(2025, 3, 1), event_type=Event.EventType.TOURNAMENT, participants_count=8)
+        EventParticipation.objects.create(event=event, fencer=fencer, position=2)
+        with mock.patch("fencers.signals.schedule_fencer_stats_refresh") as schedule:
+            event.title = "Cup 2025"
+            event.location = "Praha"
+            event.save()
+            schedule.assert_not_called()
+            event.participants_count = 16
+            event.save()
+        self.assertEqual(list(schedule.call_args.args[0]), [fencer.id])
@@ -0,0 +1,57 @@
+from datetime import date
+
+from django.test import TestCase
+
+from fencers.fencer_stats import refresh_fencer_stats
+from fencers.models import (
+    Event, EventParticipation, FencerProfile, FencerStatsSnapshot, participation_percentile, round_percentile,
+)
+
+
+class PercentileRoundingTests(TestCase):
+    def test_python_rounds_half_up(self):
+        self.assertEqual(participation_percentile(1, 16), 6.3)
+        self.assertEqual(participation_percentile(1, 8), 12.5)
+        self.assertEqual(participation_percentile(3, 3), 100.0)
+        self.assertIsNone(participation_percentile(0, 16))
+        self.assertIsNone(participation_percentile(1, 0))
+
+    def test_save_and_event_update_store_the_same_value(self):
+        fencer = FencerProfile.objects.create(first_name="Jan", last_name="Novák")
+        event = Event.objects.create(title="Cup", date=date(2025, 3, 1), event_type=Event.EventType.TOURNAMENT, participants_count=16)
+        participations = [
+            EventParticipation.objects.create(event=event, fencer=fencer, position=1),
+            EventParticipation.objects.create(
+                event=Event.objects.create(title="Cup 2", date=date(2025, 4, 1), participants_count=8),
+                fencer=fencer,
+                position=7,
+            ),
+        ]
+        saved = [p.percentile for p in participations]
+
+        for participation in participations:
+            event = participation.event
+            count = event.participants_count
+            event.participants_count = count + 1
+            event.save()
+            event.participants_count = count
+            event.save()
+        updated = list(
+            EventParticipation.objects.filter(pk__in=[p.pk for p in participations]).order_by("pk").values_list("percentile", flat=True)
+        )
+        self.assertEqual(saved, [6.3, 87.5])
+        self.assertEqual(updated, saved)
+
+    def test_averages_round_half_up(self):
+        self.assertEqual(round_percentile(12.25), 12.3)
+        self.assertEqual(round_percentile((6.3 + 12.5 + 18.8 + 11.4) / 4), 12.3)
+        self.assertEqual(round_percentile(0.05), 0.1)
+        self.assertIsNone(round_percentile(None))
+
+        fencer = FencerProfile.objects.create(first_name="Jan", last_name="Novák")
+        for title, position, count in (("A", 1, 8), ("B", 3, 25)):
+            event = Event.objects.create(title=title, date=date(2025, 3, 1), event_type=Event.EventType.TOURNAMENT, participants_count=count)
+            EventParticipation.objects.create(event=event, fencer=fencer, position=position)
+        refresh_fencer_stats([fencer.id])
+        # (12.5 + 12.0) / 2 = 12.25, which round() would take down to 12.2.
+        self.assertEqual(FencerStatsSnapshot.objects.get(fencer=fencer).average_percentile, 12.3)
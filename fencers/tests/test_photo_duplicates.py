@@ -0,0 +1,71 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from fencers.models import Event, EventPhoto, FencerProfile, SubAlbum
+from fencers.photo_duplicates import DuplicateIndex
+
+from .r2_stub import R2_TEST_SETTINGS, StubR2Client, jpeg_bytes
+
+
+class DuplicateIndexTests(TestCase):
+    def test_claim_release(self):
+        index = DuplicateIndex([(7, "00000000000000ff")], max_distance=4)
+        self.assertEqual(index.claim("00000000000000fe"), (True, 7, None))
+        self.assertEqual(index.claim("ff00000000000000"), (False, None, None))
+        self.assertEqual(index.claim("ff00000000000001"), (True, None, "ff00000000000000"))
+        index.release("ff00000000000000")
+        self.assertEqual(index.claim("ff00000000000001"), (False, None, None))
+
+
+@override_settings(**{**R2_TEST_SETTINGS, "R2_UPLOAD_WORKERS": 1})
+class UploadDuplicateTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("jan", password="heslo")
+        profile = FencerProfile.objects.create(user=user, first_name="Jan", last_name="Novák")
+        event = Event.objects.create(title="Cup", date=date(2025, 3, 1))
+        self.subalbum = SubAlbum.objects.create(album=event.photo_album, name="Den 1", created_by=profile)
+        self.client.login(username="jan", password="heslo")
+        self.r2 = StubR2Client()
+        patcher = mock.patch("fencers.views.get_r2_client", return_value=self.r2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, *names):
+        data = jpeg_bytes()
+        return self.client.post(
+            reverse("upload_photo_r2", args=[self.subalbum.id]),
+            {"photo": [SimpleUploadedFile(name, data, content_type="image/jpeg") for name in names]},
+            HTTP_ACCEPT="application/json",
+        ).json()
+
+    def test_copy_in_one_batch_is_rejected(self):
+        data = self.upload("a.jpg", "b.jpg")
+        self.assertEqual([r["ok"] for r in data["results"]], [True, False])
+        self.assertEqual(data["results"][1]["error"], "stejná fotka už v albu je")
+
+    def test_failed_upload_does_not_block_its_copy(self):
+        self.r2.fail_next_puts = 1
+        data = self.upload("a.jpg", "b.jpg")
+        self.assertEqual(data["results"][0]["error"], "nahrání do R2 selhalo")
+        self.assertTrue(data["results"][1]["ok"])
+        self.assertEqual(EventPhoto.objects.count(), 1)
+
+    @override_settings(PHOTO_DUPLICATE_POLICY="flag")
+    def test_copy_in_one_batch_is_flagged(self):
+        data = self.upload("a.jpg", "b.jpg", "c.jpg")
+        self.assertEqual([r["ok"] for r in data["results"]], [True, True, True])
+        first, *copies = EventPhoto.objects.order_by("pk")
+        self.assertIsNone(first.duplicate_of_id)
+        self.assertEqual([photo.duplicate_of_id for photo in copies], [first.pk, first.pk])
+
+    @override_settings(PHOTO_DUPLICATE_POLICY="flag")
+    def test_copy_in_later_batch_is_flagged(self):
+        self.upload("a.jpg")
+        self.upload("b.jpg")
+        first, copy = EventPhoto.objects.order_by("pk")
+        self.assertEqual(copy.duplicate_of_id, first.pk)
@@ -0,0 +1,76 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from fencers.models import Event, EventPhoto, FencerProfile, PhotoTag, SubAlbum
+from fencers.photo_tags import get_tag_vocabulary, get_used_tag_labels
+
+
+class TagVocabularyCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        event = Event.objects.create(title="Cup", date=date(2025, 3, 1))
+        self.subalbum = SubAlbum.objects.create(album=event.photo_album, name="Den 1")
+
+    def photo(self, *tags):
+        return EventPhoto(title="Foto", subalbum=self.subalbum, remote_image_url="https://r2.test/a.jpg", tags=list(tags))
+
+    def counts(self):
+        return {entry["label"]: entry["count"] for entry in get_tag_vocabulary()}
+
+    def test_committed_tag_changes_show_up(self):
+        self.assertEqual(self.counts(), {})
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = self.photo("Finále", "Kord")
+            photo.save()
+        self.assertEqual(self.counts(), {"Finále": 1, "Kord": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.tags = ["Kord"]
+            photo.save()
+            EventPhoto.bulk_create_tagged([self.photo("Kord")])
+        self.assertEqual(self.counts(), {"Kord": 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        self.assertEqual(get_used_tag_labels(), ["Kord"])
+        self.assertEqual(self.counts(), {"Kord": 1})
+
+    def test_rolled_back_save_leaves_no_phantom_counts(self):
+        self.assertEqual(self.counts(), {})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.photo("Fantom").save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.counts(), {})
+
+    def test_renamed_fencer_replaces_short_name(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fencer = FencerProfile.objects.create(first_name="Jan", last_name="Novák")
+        self.assertIn("Jan N.", self.counts())
+        with self.captureOnCommitCallbacks(execute=True):
+            fencer.last_name = "Dvořák"
+            fencer.save()
+        self.assertIn("Jan D.", self.counts())
+        self.assertNotIn("Jan N.", self.counts())
+
+    def test_partial_saves_without_tags_skip_the_tag_index(self):
+        photo = self.photo("Finále")
+        photo.save()
+        photo.tags = [" finále ", "Kord"]
+        photo.placeholder = "data:image/webp;base64,AA"
+        with self.assertNumQueries(1):
+            photo.save(update_fields=["placeholder"])
+        self.assertEqual(photo.tags, [" finále ", "Kord"])
+        photo.save(update_fields=["tags"])
+        photo.refresh_from_db()
+        self.assertEqual(photo.tags, ["finále", "Kord"])
+        self.assertIn(" kord ", photo.tags_search)
+        self.assertEqual(sorted(PhotoTag.objects.filter(photo=photo).values_list("label", flat=True)), ["Kord", "finále"])
@@ -0,0 +1,131 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from fencers.models import Event, EventPhoto, FencerProfile, SubAlbum
+from fencers.r2_storage import build_object_url, build_subalbum_prefix
+
+from .r2_stub import R2_TEST_SETTINGS, StubR2Client, jpeg_bytes
+
+
+@override_settings(**R2_TEST_SETTINGS)
+class PresignedUploadTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("jan", password="heslo")
+        self.profile = FencerProfile.objects.create(user=user, first_name="Jan", last_name="Novák")
+        event = Event.objects.create(title="Cup", date=date(2025, 3, 1))
+        self.subalbum = SubAlbum.objects.create(album=event.photo_album, name="Den 1", created_by=self.profile)
+        self.client.login(username="jan", password="heslo")
+        self.r2 = StubR2Client()
+        patcher = mock.patch("fencers.views.get_r2_client", return_value=self.r2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def presign(self, files):
+        response = self.client.post(
+            reverse("presign_photo_uploads", args=[self.subalbum.id]),
+            {
+                "name": [name for name, _, _ in files],
+                "content_type": [content_type for _, content_type, _ in files],
+                "size": [str(size) for _, _, size in files],
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["uploads"]
+
+    def complete(self, keys, names=None):
+        response = self.client.post(
+            reverse("complete_photo_uploads", args=[self.subalbum.id]),
+            {"key": keys, "name": names or [f"{i}.jpg" for i in range(len(keys))]},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def upload_one(self, data=None):
+        data = data or jpeg_bytes()
+        upload = self.presign([("a.jpg", "image/jpeg", len(data))])[0]
+        self.r2.browser_put(upload["key"], data, "image/jpeg")
+        return upload["key"]
+
+    def test_presign_signs_images_only(self):
+        uploads = self.presign([
+            ("a.jpg", "image/jpeg", 1000),
+            ("notes.txt", "text/plain", 10),
+            ("huge.jpg", "image/jpeg", 10 ** 10),
+        ])
+        prefix = build_subalbum_prefix(self.subalbum.album.event, self.subalbum, self.profile)
+        self.assertTrue(uploads[0]["key"].startswith(prefix))
+        self.assertIn(uploads[0]["key"], uploads[0]["url"])
+        self.assertEqual(uploads[0]["headers"], {"Content-Type": "image/jpeg"})
+        self.assertEqual(uploads[1]["error"], "soubor není obrázek")
+        self.assertNotIn("url", uploads[2])
+
+    @override_settings(R2_PRESIGNED_UPLOADS=False)
+    def test_presign_unavailable_falls_back(self):
+        response = self.client.post(
+            reverse("presign_photo_uploads", args=[self.subalbum.id]),
+            {"name": ["a.jpg"], "content_type": ["image/jpeg"], "size": ["10"]},
+        )
+        self.assertEqual(response.status_code, 503)
+
+    def test_complete_creates_photo_with_variants(self):
+        key = self.upload_one()
+        data = self.complete([key])
+        self.assertEqual(data["uploaded_count"], 1)
+        photo = EventPhoto.objects.get()
+        self.assertEqual(photo.remote_image_url, build_object_url(key))
+        self.assertTrue(photo.thumbnail_url)
+        self.assertTrue(photo.perceptual_hash)
+        self.assertEqual(photo.subalbum, self.subalbum)
+
+    def test_retried_completion_does_not_duplicate(self):
+        key = self.upload_one()
+        self.complete([key])
+        data = self.complete([key])
+        self.assertEqual(data["uploaded_count"], 0)
+        self.assertEqual(data["results"][0]["error"], "fotka už je v albu")
+        self.assertEqual(EventPhoto.objects.count(), 1)
+
+    def test_same_key_twice_in_one_request_is_one_photo(self):
+        key = self.upload_one()
+        data = self.complete([key, key])
+        self.assertEqual(data["uploaded_count"], 1)
+        self.assertEqual(EventPhoto.objects.count(), 1)
+        self.assertEqual([r["ok"] for r in data["results"]].count(True), 1)
+        self.assertEqual(self.r2.calls.count(("head_object", key)), 1)
+
+    def test_complete_rejects_foreign_and_missing_keys(self):
+        missing = self.presign([("a.jpg", "image/jpeg", 100)])[0]["key"]
+        data = self.complete(["event-photos/other/a.jpg", missing])
+        self.assertEqual(data["uploaded_count"], 0)
+        self.assertEqual(data["results"][0]["error"], "neplatný klíč")
+        self.assertEqual(data["results"][1]["error"], "soubor v úložišti nebyl nalezen")
+
+    def test_complete_rejects_and_removes_non_images(self):
+        upload = self.presign([("a.jpg", "image/jpeg", 100)])[0]
+        self.r2.browser_put(upload["key"], b"not an image", "text/plain")
+        data = self.complete([upload["key"]])
+        self.assertEqual(data["uploaded_count"], 0)
+        self.assertNotIn(upload["key"], self.r2.objects)
+
+    def test_near_duplicate_of_album_photo_is_rejected(self):
+        self.complete([self.upload_one()])
+        copy = self.upload_one()
+        data = self.complete([copy])
+        self.assertEqual(data["results"][0]["error"], "stejná fotka už v albu je")
+        self.assertNotIn(copy, self.r2.objects)
+        self.assertEqual(EventPhoto.objects.count(), 1)
+
+    def test_results_follow_request_order_without_queued_messages(self):
+        done = self.upload_one()
+        self.complete([done])
+        fresh = self.upload_one(jpeg_bytes(box=(40, 8, 64, 48)))
+        data = self.complete([fresh, done, "event-photos/other/a.jpg"], ["new.jpg", "done.jpg", "foreign.jpg"])
+        self.assertEqual([r["name"] for r in data["results"]], ["new.jpg", "done.jpg", "foreign.jpg"])
+        self.assertEqual([r["ok"] for r in data["results"]], [True, False, False])
+        self.assertEqual(data["results"][1]["error"], "fotka už je v albu")
+        response = self.client.get(reverse("album_detail", args=[self.subalbum.album.id]))
+        self.assertEqual(list(response.context["messages"]), [])
@@ -0,0 +1,124 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from fencers import ratings
+from fencers.models import Event, EventParticipation, FencerProfile, FencerRating, FencerRatingHistory
+
+
+def rating_state():
+    return (
+        sorted(
+            (r.fencer_id, round(r.rating, 9), round(r.deviation, 9), r.events_count, r.last_event_date)
+            for r in FencerRating.objects.all()
+        ),
+        sorted(
+            (h.fencer_id, h.event_id, round(h.rating_before, 9), round(h.rating_after, 9))
+            for h in FencerRatingHistory.objects.all()
+        ),
+    )
+
+
+class RatingTests(TestCase):
+    def setUp(self):
+        self.fencers = [FencerProfile.objects.create(first_name=f"F{i}", last_name="L") for i in range(5)]
+        self.events = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for k in range(6):
+                self.events.append(self.add_event(date(2025, 1 + k, 10), shift=k))
+
+    def add_event(self, day, shift=0, fencers=None):
+        event = Event.objects.create(
+            title=f"T{day}", date=day, event_type=Event.EventType.TOURNAMENT, participants_count=20
+        )
+        for j, fencer in enumerate(fencers or self.fencers):
+            EventParticipation.objects.create(
+                event=event,
+                fencer=fencer,
+                position=(j + shift) % len(self.fencers) * 3 + 1,
+                wins=5 - j,
+                losses=j,
+                touches_scored=20,
+                touches_received=10 + 2 * j,
+            )
+        return event
+
+    def assertMatchesRebuild(self):
+        incremental = rating_state()
+        self.assertTrue(incremental[1])
+        ratings.rebuild_ratings()
+        self.assertEqual(incremental, rating_state())
+
+    def test_initial_build_matches_rebuild(self):
+        self.assertEqual(FencerRatingHistory.objects.count(), 30)
+        self.assertMatchesRebuild()
+
+    def test_new_latest_event(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_event(date(2025, 12, 1), shift=2)
+        self.assertMatchesRebuild()
+
+    def test_edited_older_event(self):
+        participation = EventParticipation.objects.get(event=self.events[1], fencer=self.fencers[4])
+        with self.captureOnCommitCallbacks(execute=True):
+            participation.position = 1
+            participation.save()
+        self.assertMatchesRebuild()
+
+    def test_event_moved_later(self):
+        event = self.events[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            event.date = date(2025, 8, 1)
+            event.save()
+        self.assertMatchesRebuild()
+
+    def test_event_moved_earlier(self):
+        event = self.events[4]
+        with self.captureOnCommitCallbacks(execute=True):
+            event.date = date(2024, 12, 1)
+            event.save()
+        self.assertMatchesRebuild()
+
+    def test_event_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.events[2].delete()
+        self.assertEqual(FencerRatingHistory.objects.count(), 25)
+        self.assertMatchesRebuild()
+
+    def test_fencer_deleted(self):
+        update = mock.Mock(wraps=ratings.update_ratings_from)
+        with mock.patch.object(ratings, "update_ratings_from", update):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.fencers[0].delete()
+        update.assert_not_called()
+        self.assertEqual(FencerRatingHistory.objects.count(), 24)
+        self.assertMatchesRebuild()
+
+    def test_event_no_longer_rated(self):
+        event = self.events[3]
+        with self.captureOnCommitCallbacks(execute=True):
+            event.event_type = Event.EventType.OTHER
+            event.save()
+        self.assertMatchesRebuild()
+
+    def test_import_replays_once_from_earliest_event(self):
+        update = mock.Mock(wraps=ratings.update_ratings_from)
+        with mock.patch.object(ratings, "update_ratings_from", update):
+            with self.captureOnCommitCallbacks(execute=True):
+                late = self.add_event(date(2025, 11, 1))
+                early = self.add_event(date(2025, 2, 1))
+                self.add_event(date(2025, 12, 1))
+        update.assert_called_once_with(early.date, early.id)
+        self.assertTrue(FencerRatingHistory.objects.filter(event=late).exists())
+        self.assertMatchesRebuild()
+
+    def test_event_delete_replays_once(self):
+        event = self.events[1]
+        point = (event.date, event.id)
+        update = mock.Mock(wraps=ratings.update_ratings_from)
+        with mock.patch.object(ratings, "update_ratings_from", update):
+            with self.captureOnCommitCallbacks(execute=True):
+                event.delete()
+        update.assert_called_once_with(*point)
+        self.assertMatchesRebuild()
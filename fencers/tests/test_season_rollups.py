@@ -0,0 +1,82 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from fencers import season_rollups
+from fencers.models import Club, ClubSeasonRollup, Event, EventParticipation, FencerProfile, FencerSeasonRollup
+
+FIELDS = (
+    "period", "period_start", "season", "event_type", "gender", "participations", "events_count",
+    "wins", "losses", "touches_scored", "touches_received", "best_percentile", "percentile_count",
+)
+
+
+def rollup_state():
+    fencer_rows = [
+        (*row[:-2], round(row[-2], 6), round(row[-1], 6))
+        for row in FencerSeasonRollup.objects.values_list("fencer_id", *FIELDS, "points", "percentile_sum")
+    ]
+    club_rows = [
+        (*row[:-2], round(row[-2], 6), round(row[-1], 6))
+        for row in ClubSeasonRollup.objects.values_list("club_id", *FIELDS, "points", "percentile_sum")
+    ]
+    return sorted(fencer_rows, key=repr), sorted(club_rows, key=repr)
+
+
+class SeasonRollupRefreshTests(TestCase):
+    def setUp(self):
+        self.clubs = [Club.objects.create(name="A"), Club.objects.create(name="B")]
+        self.fencers = [
+            FencerProfile.objects.create(first_name=f"F{i}", last_name="L", club=self.clubs[i % 2]) for i in range(4)
+        ]
+
+    def import_events(self, dates):
+        events = []
+        for k, day in enumerate(dates):
+            event = Event.objects.create(
+                title=f"T{k}", date=day, event_type=Event.EventType.TOURNAMENT, participants_count=8
+            )
+            for j, fencer in enumerate(self.fencers):
+                EventParticipation.objects.create(
+                    event=event, fencer=fencer, position=j + 1, wins=3 - j, losses=j, touches_scored=10 + j
+                )
+            events.append(event)
+        return events
+
+    def assert_matches_rebuild(self):
+        incremental = rollup_state()
+        season_rollups.rebuild_season_rollups()
+        self.assertEqual(incremental, rollup_state())
+
+    def test_import_refreshes_once_and_matches_rebuild(self):
+        refresh = mock.Mock(wraps=season_rollups.refresh_season_rollups)
+        with mock.patch.object(season_rollups, "refresh_season_rollups", refresh):
+            with self.captureOnCommitCallbacks(execute=True):
+                # Two seasons: 2024/25 and 2025/26.
+                self.import_events([date(2025, 1, 10), date(2025, 3, 5), date(2025, 10, 1)])
+        self.assertEqual(refresh.call_count, 2)
+        fencer_ids = {fencer.id for fencer in self.fencers}
+        club_ids = {club.id for club in self.clubs}
+        refresh.assert_any_call(fencer_ids, [2024], club_ids)
+        refresh.assert_any_call(fencer_ids, [2025], club_ids)
+        self.assertTrue(FencerSeasonRollup.objects.exists())
+        self.assert_matches_rebuild()
+
+    def test_edits_and_deletes_match_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            events = self.import_events([date(2025, 1, 10), date(2025, 10, 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            events[0].date = date(2025, 11, 2)
+            events[0].save()
+            participation = events[1].participations.get(fencer=self.fencers[0])
+            participation.wins = 7
+            participation.save()
+            events[1].participations.filter(fencer=self.fencers[3]).get().delete()
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fencers[0].club = self.clubs[1]
+            self.fencers[0].save()
+            self.fencers[2].delete()
+        self.assert_matches_rebuild()
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from fencers.models import Club, FencerProfile
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ClubMembersTableTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("jan", password="heslo")
+        club = Club.objects.create(name="Klub")
+        FencerProfile.objects.create(user=user, first_name="Jan", last_name="Novák", club=club)
+        self.client.login(username="jan", password="heslo")
+
+    def test_rank_only_for_rating_sorts(self):
+        response = self.client.get(reverse("statistics_club"))
+        self.assertTrue(response.context["members_ranked"])
+        self.assertContains(response, "<th>#</th>", html=True)
+        response = self.client.get(reverse("statistics_club"), {"members_sort": "name"})
+        self.assertFalse(response.context["members_ranked"])
+        self.assertNotContains(response, "<th>#</th>", html=True)
+
+    def test_sort_links_keep_other_parameters(self):
+        response = self.client.get(reverse("statistics_club"), {"tournament": "Pohár A", "members_sort": "name"})
+        self.assertEqual(response.context["members_query"], "tournament=Poh%C3%A1r+A&")
+        self.assertContains(response, 'href="?tournament=Poh%C3%A1r+A&amp;members_sort=-rating"')
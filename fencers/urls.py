@@ -55,6 +55,8 @@ urlpatterns = [
     path('api/member-detail/<int:profile_id>/', views.member_detail_api, name='member_detail_api'),
     path('statistics/individual/', views.statistics_individual, name='statistics_individual'),
     path('statistics/club/', views.statistics_club, name='statistics_club'),
+    path('statistics/api/', views.statistics_api, name='statistics_api'),
+    path('statistics/series/', views.statistics_series_api, name='statistics_series_api'),
     path('training/notes/', views.training_notes, name='training_notes'),
     path('training/circuits/', views.circuit_trainings, name='circuit_trainings'),
     path('training/circuits/<int:circuit_id>/edit/', views.edit_circuit_training, name='edit_circuit_training'),
@@ -63,12 +65,20 @@ urlpatterns = [
     path('photos/my-favorites/', views.my_favorite_photos, name='my_favorite_photos'),
     path('photos/most-liked/', views.most_liked_photos, name='most_liked_photos'),
     path('photos/find-person/', views.find_person_photos, name='find_person_photos'),
+    path('photos/api/feed/', views.photo_feed_api, name='photo_feed_api'),
+    path('photos/api/tags/', views.photo_tag_vocabulary_api, name='photo_tag_vocabulary_api'),
+    path('photos/api/tags/bulk/', views.bulk_update_photo_tags, name='bulk_update_photo_tags'),
+    path('photos/api/<int:photo_id>/likers/', views.photo_likers_api, name='photo_likers_api'),
     path('photos/photo/<int:photo_id>/tags/', views.update_photo_tags, name='update_photo_tags'),
     path('photos/album/<int:album_id>/', views.album_detail, name='album_detail'),
     path('photos/album/<int:album_id>/cover/', views.update_album_cover, name='update_album_cover'),
+    path('photos/album/<int:album_id>/download/', views.download_album_zip, name='download_album_zip'),
+    path('photos/subalbum/<int:subalbum_id>/download/', views.download_subalbum_zip, name='download_subalbum_zip'),
     path('photos/album/<int:album_id>/subalbum/create/', views.create_subalbum, name='create_subalbum'),
     path('photos/subalbum/<int:subalbum_id>/upload/', views.upload_photo, name='upload_photo'),
     path('photos/subalbum/<int:subalbum_id>/upload-r2/', views.upload_photo_r2, name='upload_photo_r2'),
+    path('photos/subalbum/<int:subalbum_id>/presign/', views.presign_photo_uploads, name='presign_photo_uploads'),
+    path('photos/subalbum/<int:subalbum_id>/presign/complete/', views.complete_photo_uploads, name='complete_photo_uploads'),
     path('photos/photo/<int:photo_id>/like/', views.toggle_photo_like, name='toggle_photo_like'),
     path('calendar/', views.calendar_events, name='calendar_events'),
     path('calendar/<int:event_id>/reaction/', views.event_reaction, name='event_reaction'),
@@ -1,8 +1,10 @@
+import csv
 import os
 import re
 import random
 import string
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta, datetime
 from urllib.parse import urlencode
 
@@ -12,14 +14,17 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import login, authenticate, get_user_model
 from django.contrib import messages
-from django.db.models import Q, Count, Avg, Sum
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Q, Count, Avg, F, Max, Min, Prefetch, Sum
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.forms import modelformset_factory
 from django.core.files.storage import default_storage
 from django.views.decorators.http import require_POST
 from django.views.decorators.http import require_http_methods
 from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.text import slugify
 MAX_PROFILE_PHOTO_BYTES = 2 * 1024 * 1024  # 2 MB
 PROFILE_PHOTO_ALLOWED_CONTENT_TYPES = frozenset({
     "image/jpeg",
@@ -29,11 +34,12 @@ PROFILE_PHOTO_ALLOWED_CONTENT_TYPES = frozenset({
 })
 
 from .models import (
-    FencerProfile, Event, EventParticipation, TrainingNote,
+    FencerProfile, FencerStatsSnapshot, Event, EventParticipation, TrainingNote,
     CircuitTraining, CircuitSong, EventPhoto, EventReaction,
     PaymentStatus, EquipmentItem,
-    UserEquipment, Club, PhotoAlbum, SubAlbum, PhotoLike, News, NewsRead,
-    ContentPage, ContentBlock
+    UserEquipment, Club, PhotoAlbum, SubAlbum, PhotoLike, PhotoTag, News, NewsRead,
+    ContentPage, ContentBlock, FencerSeasonRollup, ClubSeasonRollup, RollupPeriod, photo_tag_key,
+    round_percentile,
 )
 from .forms import (
     TrainingNoteForm,
@@ -45,12 +51,30 @@ from .forms import (
     ContentBlockForm,
 )
 from .i18n import tr
+from .media_files import media_response
+from .pagination import InvalidCursor, keyset_page
+from .photo_albums import get_album_year_facets, with_fallback_cover
+from .photo_duplicates import DuplicateIndex, photo_dhash
+from .photo_tags import get_tag_vocabulary, get_used_tag_labels
+from .photo_variants import safe_read_capture_metadata, safe_render_placeholder
+from .photo_zip import member_name, stream_photos_zip
 from .r2_storage import (
     r2_ready,
+    presigned_uploads_ready,
+    get_r2_client,
     build_event_photo_key,
+    build_subalbum_prefix,
     build_object_url,
-    upload_image_to_r2,
+    delete_object,
+    head_object,
+    is_variant_key,
+    normalized_photo_key,
+    presign_upload_url,
+    read_object_bytes,
+    safe_upload_event_photo_variants,
+    store_event_photo,
 )
+from .seasons import parse_season, season_bounds, season_label, season_start_year
 
 # Profile self-match: failed birth-year check blocks retries for this many minutes.
 PROFILE_JOIN_BLOCK_SECONDS = 120
@@ -280,50 +304,145 @@ def _parse_photo_tags_post(raw: str):
     return out
 
 
-def _distinct_tags_from_event_photos():
-    """All unique non-empty tag strings currently stored on photos."""
-    seen = set()
-    out = []
-    for tags in EventPhoto.objects.values_list("tags", flat=True).iterator(chunk_size=500):
-        if not tags:
-            continue
-        for item in tags:
-            if not isinstance(item, str):
-                continue
-            s = item.strip()
-            if not s:
-                continue
-            k = s.casefold()
-            if k not in seen:
-                seen.add(k)
-                out.append(s)
-    return out
+# Photo listings (album, favorites, most liked, find person) are served in
+# keyset-paginated pages; the first page is rendered with the page, the rest
+# is fetched by the gallery's infinite scroll from photo_feed_api.
+PHOTO_PAGE_SIZE = 48
+PHOTO_FEED_SCOPES = frozenset({"album", "favorites", "most_liked", "person"})
+# "captured" follows the EXIF capture time (bout order); photos without one go last.
+PHOTO_FEED_ORDERS = ("uploaded", "captured")
+PHOTO_TAG_SEARCH_MODES = ("any", "all")
+PHOTO_TAG_MATCH_MODES = ("exact", "prefix")
+PRESIGNED_UPLOAD_MAX_FILES = 100
+SUBALBUM_PREVIEW_SIZE = 6
+PHOTO_TOP_LIKERS = 5
+
+
+def _photo_tag_term_q(term, match):
+    key = photo_tag_key(term)
+    if match == "prefix":
+        # A key range rather than LIKE, so SQLite can answer it from the tag_key index.
+        return Q(tag_key__gte=key, tag_key__lt=key + "\U0010ffff")
+    return Q(tag_key=key)
+
+
+def _filter_photos_by_tags(photos, tag_terms, mode="any", match="exact"):
+    """Photos tagged with any (OR) / all (AND) of `tag_terms`, via the PhotoTag index."""
+    if mode == "all":
+        for term in tag_terms:
+            photos = photos.filter(
+                id__in=PhotoTag.objects.filter(_photo_tag_term_q(term, match)).values("photo_id")
+            )
+        return photos
+    q_combined = Q(pk__in=[])
+    for term in tag_terms:
+        q_combined |= _photo_tag_term_q(term, match)
+    return photos.filter(id__in=PhotoTag.objects.filter(q_combined).values("photo_id"))
+
+
+def _photo_tag_search_params(params):
+    """(mode, match) from request parameters, falling back to any/exact."""
+    mode = params.get("mode", "")
+    match = params.get("match", "")
+    return (
+        mode if mode in PHOTO_TAG_SEARCH_MODES else "any",
+        match if match in PHOTO_TAG_MATCH_MODES else "exact",
+    )
 
 
-def _photo_tag_options_for_find():
-    """Labels that already exist on at least one photo (for find-person multiselect)."""
-    return sorted(_distinct_tags_from_event_photos(), key=str.casefold)
+def _top_likes_prefetch():
+    """The PHOTO_TOP_LIKERS most recent likes of each photo as `top_likes`, in one windowed query."""
+    likes = PhotoLike.objects.select_related("fencer").order_by("-created_at", "-id")[:PHOTO_TOP_LIKERS]
+    return Prefetch("likes", queryset=likes, to_attr="top_likes")
+
+
+def _photo_feed_order(params):
+    order = params.get("order", "uploaded")
+    return order if order in PHOTO_FEED_ORDERS else "uploaded"
+
+
+def _photo_feed_queryset(scope, profile, album=None, tag_terms=(), tag_mode="any", tag_match="exact",
+                         order="uploaded"):
+    """Returns (queryset, keyset ordering, nullable ordering fields) for one photo listing."""
+    photos = EventPhoto.objects.select_related(
+        "subalbum",
+        "subalbum__album",
+        "subalbum__album__event",
+        "uploaded_by",
+    ).prefetch_related(_top_likes_prefetch())
+    ordering = ("-uploaded_at", "-id")
+    if order == "captured":
+        ordering = ("captured_at", "uploaded_at", "id")
+    if scope == "album":
+        photos = photos.filter(subalbum__album=album)
+    elif scope == "favorites":
+        photos = photos.filter(likes__fencer=profile)
+    elif scope == "most_liked":
+        photos = photos.filter(like_count__gte=1)
+        ordering = ("-like_count", "-uploaded_at", "-id")
+    elif scope == "person":
+        if not tag_terms:
+            return photos.none(), ordering, ("captured_at",)
+        photos = _filter_photos_by_tags(photos, tag_terms, mode=tag_mode, match=tag_match)
+    return photos, ordering, ("captured_at",)
+
+
+def _photo_feed_page(request, profile, scope, album=None, tag_terms=(), tag_mode="any",
+                     tag_match="exact", cursor="", next_url="", order="uploaded"):
+    """One page of a photo listing plus everything the gallery needs to render it.
+
+    Raises InvalidCursor for a tampered cursor.
+    """
+    photos, ordering, nullable = _photo_feed_queryset(
+        scope, profile, album=album, tag_terms=tag_terms, tag_mode=tag_mode, tag_match=tag_match,
+        order=order,
+    )
+    page, next_cursor = keyset_page(
+        photos, ordering=ordering, cursor=cursor, limit=PHOTO_PAGE_SIZE, nullable=nullable
+    )
+    for photo in page:
+        photo.more_likers_count = max(photo.like_count - len(photo.top_likes), 0)
+    user_liked_photo_ids = set(
+        PhotoLike.objects.filter(fencer=profile, photo_id__in=[p.id for p in page]).values_list(
+            "photo_id", flat=True
+        )
+    )
+    next_url = next_url or request.get_full_path()
+    params = {"scope": scope, "next": next_url}
+    if album is not None:
+        params["album"] = album.id
+    if tag_terms:
+        params.update({"tags": list(tag_terms), "mode": tag_mode, "match": tag_match})
+    if order != "uploaded":
+        params["order"] = order
+    return {
+        "all_photos": page,
+        "user_liked_photo_ids": user_liked_photo_ids,
+        "photos_next_cursor": next_cursor,
+        "photo_feed_url": f"{reverse('photo_feed_api')}?{urlencode(params, doseq=True)}",
+        "photo_next_url": next_url,
+        "photo_order": order,
+    }
 
 
-def _photo_tag_datalist_values():
-    """Short fencer labels (Jméno P.) plus every tag already used on at least one photo."""
-    seen = set()
-    values = []
-    for fp in FencerProfile.objects.order_by("last_name", "first_name").only(
-        "first_name", "last_name", "id"
-    ):
-        short = fp.short_name_tag
-        if short:
-            k = short.casefold()
-            if k not in seen:
-                seen.add(k)
-                values.append(short)
-    for s in _distinct_tags_from_event_photos():
-        k = s.casefold()
-        if k not in seen:
-            seen.add(k)
-            values.append(s)
-    return sorted(values, key=str.casefold)
+def _serialize_photo(photo, user_liked_photo_ids):
+    return {
+        "id": photo.id,
+        "title": photo.title,
+        "description": photo.description,
+        "thumbnail_url": photo.thumbnail_image_url,
+        "medium_url": photo.medium_image_url,
+        "url": photo.display_image_url,
+        "srcset": photo.image_srcset,
+        "placeholder": photo.placeholder,
+        "width": photo.width,
+        "height": photo.height,
+        "captured_at": photo.captured_at.isoformat() if photo.captured_at else None,
+        "tags": photo.tags or [],
+        "like_count": photo.like_count,
+        "is_liked": photo.id in user_liked_photo_ids,
+        "uploaded_at": photo.uploaded_at.isoformat() if photo.uploaded_at else None,
+    }
 
 
 def login_view(request):
@@ -583,12 +702,7 @@ def about_me(request):
     ).select_related('event')
     
     # Basic statistics (only tournament-type events count here)
-    total_tournaments = tournament_participations.count()
-    total_wins = tournament_participations.aggregate(Sum('wins'))['wins__sum'] or 0
-    total_losses = tournament_participations.aggregate(Sum('losses'))['losses__sum'] or 0
-    total_touches_scored = tournament_participations.aggregate(Sum('touches_scored'))['touches_scored__sum'] or 0
-    total_touches_received = tournament_participations.aggregate(Sum('touches_received'))['touches_received__sum'] or 0
-    win_rate = (total_wins / (total_wins + total_losses) * 100) if (total_wins + total_losses) > 0 else 0
+    stats = FencerStatsSnapshot.for_fencer(profile)
     
     # Filter events: show events that match user's gender or are "Vše" (All)
     all_events = Event.objects.all().order_by('-date')
@@ -649,12 +763,14 @@ def about_me(request):
         'profile': profile,
         'participations': tournament_participations,
         'combined_items': combined_items,
-        'total_tournaments': total_tournaments,
-        'total_wins': total_wins,
-        'total_losses': total_losses,
-        'total_touches_scored': total_touches_scored,
-        'total_touches_received': total_touches_received,
-        'win_rate': round(win_rate, 1),
+        'total_tournaments': stats.events_count,
+        'total_wins': stats.wins,
+        'total_losses': stats.losses,
+        'total_touches_scored': stats.touches_scored,
+        'total_touches_received': stats.touches_received,
+        'win_rate': stats.win_rate,
+        'best_percentile': stats.best_percentile,
+        'average_percentile': stats.average_percentile,
         'club_fencers_m': club_fencers_m,
         'club_fencers_z': club_fencers_z,
         'club_fencers_undefined': club_fencers_undefined,
@@ -689,19 +805,8 @@ def member_detail_api(request, profile_id):
             name = f"{profile.first_name} {profile.last_name}".strip() or "Nepřiřazený profil"
             username = None
         
-        # Get tournament participations for statistics
-        tournament_participations = EventParticipation.objects.filter(
-            fencer=profile,
-            event__event_type=Event.EventType.TOURNAMENT
-        ).select_related('event')
-        
-        # Calculate statistics
-        total_tournaments = tournament_participations.count()
-        total_wins = tournament_participations.aggregate(Sum('wins'))['wins__sum'] or 0
-        total_losses = tournament_participations.aggregate(Sum('losses'))['losses__sum'] or 0
-        total_touches_scored = tournament_participations.aggregate(Sum('touches_scored'))['touches_scored__sum'] or 0
-        total_touches_received = tournament_participations.aggregate(Sum('touches_received'))['touches_received__sum'] or 0
-        win_rate = (total_wins / (total_wins + total_losses) * 100) if (total_wins + total_losses) > 0 else 0
+        # Tournament statistics from the precomputed snapshot
+        stats = FencerStatsSnapshot.for_fencer(profile)
         
         data = {
             'name': name,
@@ -709,12 +814,14 @@ def member_detail_api(request, profile_id):
             'club': str(profile.club) if profile.club else None,
             'birth_year': profile.birth_year,
             'phone': profile.phone,
-            'total_tournaments': total_tournaments,
-            'total_wins': total_wins,
-            'total_losses': total_losses,
-            'total_touches_scored': total_touches_scored,
-            'total_touches_received': total_touches_received,
-            'win_rate': round(win_rate, 1),
+            'total_tournaments': stats.events_count,
+            'total_wins': stats.wins,
+            'total_losses': stats.losses,
+            'total_touches_scored': stats.touches_scored,
+            'total_touches_received': stats.touches_received,
+            'win_rate': stats.win_rate,
+            'best_percentile': stats.best_percentile,
+            'average_percentile': stats.average_percentile,
         }
         
         return JsonResponse(data)
@@ -746,7 +853,6 @@ def statistics_individual(request):
     ).select_related('event').order_by('-event__date')
     
     club = None
-    club_fencers = None
     club_participations = None
     club_humanitarian_participations = None
     hall_of_fame_participations = None
@@ -761,45 +867,26 @@ def statistics_individual(request):
     if tournament_filter:
         individual_participations = individual_participations.filter(event__title__icontains=tournament_filter)
     
+    club_participations_next_cursor = None
+    club_statistics_sort = STATISTICS_DEFAULT_SORT
+    gender_filter = ''
     if profile.club:
         club = profile.club
-        club_fencers = FencerProfile.objects.filter(club=profile.club).select_related('user')
-        
-        # Base queryset for all club participations
-        club_participations_base = EventParticipation.objects.filter(
-            fencer__in=club_fencers
-        ).select_related('fencer', 'fencer__user', 'event')
+        gender_filter = request.GET.get('gender', '').strip()
         
         # Get humanitarian participations separately (not affected by filters)
-        club_humanitarian_participations = club_participations_base.filter(
-            event__event_type=Event.EventType.HUMANITARIAN
-        ).order_by('-event__date')
-        
-        # Apply filters to main participations queryset
-        club_participations_qs = club_participations_base
+        club_humanitarian_participations = _statistics_queryset(profile, 'club_humanitarian', {}).order_by('-event__date')
         
-        # Apply tournament filter if provided
-        if tournament_filter:
-            club_participations_qs = club_participations_qs.filter(event__title__icontains=tournament_filter)
-        
-        # Apply gender filter if provided
-        gender_filter = request.GET.get('gender', '').strip()
-        if gender_filter:
-            if gender_filter == 'M':
-                club_participations_qs = club_participations_qs.filter(event__gender=Event.Gender.MALE)
-            elif gender_filter == 'Z':
-                club_participations_qs = club_participations_qs.filter(event__gender=Event.Gender.FEMALE)
-            elif gender_filter == 'V':
-                club_participations_qs = club_participations_qs.filter(event__gender=Event.Gender.ALL)
-            # If gender_filter is empty or invalid, show all
-        
-        # Exclude humanitarian tournaments from main participations (they go in separate section)
-        club_participations = club_participations_qs.exclude(
-            event__event_type=Event.EventType.HUMANITARIAN
+        # First page of the club table; sorting, filters and further pages come from statistics_api
+        ordering, club_statistics_sort = _statistics_ordering(STATISTICS_DEFAULT_SORT)
+        club_participations, club_participations_next_cursor = keyset_page(
+            _statistics_queryset(profile, 'club', request.GET),
+            ordering=ordering,
+            limit=STATISTICS_PAGE_SIZE,
+            nullable=STATISTICS_NULLABLE,
         )
-        hall_of_fame_participations = club_participations.filter(is_hall_of_fame=True)
+        hall_of_fame_participations = _statistics_queryset(profile, 'hall_of_fame', request.GET).order_by('-event__date')
     else:
-        gender_filter = ''
         club_humanitarian_participations = EventParticipation.objects.none()
         hall_of_fame_participations = EventParticipation.objects.none()
     
@@ -812,11 +899,24 @@ def statistics_individual(request):
         'hall_of_fame_participations': hall_of_fame_participations,
         'initial_view': view_param,
         'initial_tournament_filter': tournament_filter,
-        'initial_gender_filter': gender_filter if profile.club else '',
+        'initial_gender_filter': gender_filter,
+        'club_participations_next_cursor': club_participations_next_cursor,
+        'club_statistics_sort': club_statistics_sort,
+        'season_options': _statistics_season_options() if club else [],
     }
     return render(request, 'fencers/statistics_individual.html', context)
 
 
+# Club member table: `members_sort` key -> ordering; unrated members always last.
+CLUB_MEMBER_SORTS = {
+    '-rating': [F('rating__rating').desc(nulls_last=True), 'last_name', 'first_name'],
+    'rating': [F('rating__rating').asc(nulls_last=True), 'last_name', 'first_name'],
+    '-rated_events': [F('rating__events_count').desc(nulls_last=True), 'last_name', 'first_name'],
+    'name': ['last_name', 'first_name', 'id'],
+}
+CLUB_MEMBER_DEFAULT_SORT = '-rating'
+
+
 @login_required
 def statistics_club(request):
     user = request.user
@@ -827,6 +927,14 @@ def statistics_club(request):
         return redirect('about_me')
     
     club_fencers = FencerProfile.objects.filter(club=profile.club).select_related('user')
+    members_sort = request.GET.get('members_sort', '')
+    if members_sort not in CLUB_MEMBER_SORTS:
+        members_sort = CLUB_MEMBER_DEFAULT_SORT
+    club_members = club_fencers.select_related('rating').order_by(*CLUB_MEMBER_SORTS[members_sort])
+    # Sort links keep the page's other parameters (e.g. the tournament filter).
+    members_query = request.GET.copy()
+    members_query.pop('members_sort', None)
+    members_query = f"{members_query.urlencode()}&" if members_query else ''
     
     participations = EventParticipation.objects.filter(
         fencer__in=club_fencers
@@ -847,6 +955,10 @@ def statistics_club(request):
     context = {
         'club': profile.club,
         'club_fencers': club_fencers,
+        'club_members': club_members,
+        'members_sort': members_sort,
+        'members_query': members_query,
+        'members_ranked': members_sort in ('-rating', 'rating'),
         'participations': participations,
         'internal_participations': internal_participations,
         'tournament_filter': tournament_filter,
@@ -854,6 +966,265 @@ def statistics_club(request):
     return render(request, 'fencers/statistics_club.html', context)
 
 
+# Statistics tables are sorted, filtered and paged in SQL; the `sort` keys are
+# the data-sort names of the table headers, "-" prefixed for descending.
+STATISTICS_PAGE_SIZE = 50
+STATISTICS_MAX_PAGE_SIZE = 200
+STATISTICS_SCOPES = ('individual', 'individual_humanitarian', 'club', 'club_humanitarian', 'hall_of_fame')
+STATISTICS_SORTS = {
+    'date': 'event__date',
+    'tournament': 'event__title',
+    'fencer': 'fencer__last_name',
+    'position': 'position',
+    'participants_count': 'event__participants_count',
+    'percentile': 'percentile',
+    'wins': 'wins',
+    'losses': 'losses',
+    'touches_scored': 'touches_scored',
+    'touches_received': 'touches_received',
+    'points': 'points',
+}
+STATISTICS_NULLABLE = ('position', 'event__participants_count', 'percentile', 'points')
+STATISTICS_DEFAULT_SORT = '-date'
+
+
+def _statistics_ordering(sort):
+    """(keyset ordering, normalized sort) for a `sort` parameter; unknown keys mean newest first."""
+    key = (sort or '').lstrip('-')
+    if key not in STATISTICS_SORTS:
+        return _statistics_ordering(STATISTICS_DEFAULT_SORT)
+    prefix = '-' if sort.startswith('-') else ''
+    ordering = [prefix + STATISTICS_SORTS[key]]
+    if key == 'fencer':
+        ordering.append(prefix + 'fencer__first_name')
+    elif key != 'date':
+        ordering.append('-event__date')
+    ordering.append('-id')
+    return ordering, prefix + key
+
+
+def _statistics_queryset(profile, scope, params):
+    """Participations of one statistics table with the request's filters applied."""
+    qs = EventParticipation.objects.select_related('event', 'fencer', 'fencer__user')
+    if scope.startswith('individual'):
+        qs = qs.filter(fencer=profile)
+    elif profile.club_id:
+        qs = qs.filter(fencer__club_id=profile.club_id)
+    else:
+        return qs.none()
+    if scope.endswith('humanitarian'):
+        qs = qs.filter(event__event_type=Event.EventType.HUMANITARIAN)
+    else:
+        qs = qs.exclude(event__event_type=Event.EventType.HUMANITARIAN)
+    if scope == 'hall_of_fame':
+        qs = qs.filter(is_hall_of_fame=True)
+
+    tournament = params.get('tournament', '').strip()
+    if tournament:
+        qs = qs.filter(event__title__icontains=tournament)
+    for word in params.get('fencer', '').split():
+        qs = qs.filter(Q(fencer__first_name__icontains=word) | Q(fencer__last_name__icontains=word))
+    gender = params.get('gender', '').strip()
+    if gender in Event.Gender.values:
+        qs = qs.filter(event__gender=gender)
+    season = parse_season(params.get('season', ''))
+    if season is not None:
+        qs = qs.filter(event__date__range=season_bounds(season))
+    for param, lookup in (('date_from', 'event__date__gte'), ('date_to', 'event__date__lte')):
+        try:
+            day = datetime.strptime(params.get(param, ''), '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        qs = qs.filter(**{lookup: day})
+    return qs
+
+
+def _statistics_row(participation):
+    event = participation.event
+    return {
+        'id': participation.id,
+        'fencer': {'id': participation.fencer_id, 'name': participation.fencer.display_name},
+        'event': {
+            'id': event.id,
+            'title': event.title,
+            'date': event.date.isoformat(),
+            'event_type': event.event_type,
+            'gender': event.gender,
+            'participants_count': event.participants_count,
+        },
+        'position': participation.position,
+        'percentile': participation.percentile,
+        'wins': participation.wins,
+        'losses': participation.losses,
+        'touches_scored': participation.touches_scored,
+        'touches_received': participation.touches_received,
+        'points': participation.points,
+        'is_hall_of_fame': participation.is_hall_of_fame,
+    }
+
+
+def _statistics_season_options():
+    """Seasons that have at least one event, newest first, as (start year, label)."""
+    years = {season_start_year(day) for day in Event.objects.dates('date', 'month')}
+    return [(year, season_label(year)) for year in sorted(years, reverse=True)]
+
+
+@login_required
+def statistics_api(request):
+    """One page of a statistics table as JSON: `scope`, `sort`, filters and `cursor`.
+
+    Filters: `tournament` (title substring), `fencer` (name words), `gender`
+    (M/Z/V), `season` (start year, e.g. 2024 or 2024/2025), `date_from` and
+    `date_to`. With `html=1` the rendered table rows are included as well.
+    """
+    profile = getattr(request.user, 'fencer_profile', None)
+    if not profile:
+        return JsonResponse({'error': 'Nejprve se prosím přiřaďte k profilu.'}, status=403)
+    scope = request.GET.get('scope', 'individual')
+    if scope not in STATISTICS_SCOPES:
+        return JsonResponse({'error': 'Neznámá tabulka.'}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', STATISTICS_PAGE_SIZE)), 1), STATISTICS_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = STATISTICS_PAGE_SIZE
+
+    ordering, sort = _statistics_ordering(request.GET.get('sort', ''))
+    try:
+        rows, next_cursor = keyset_page(
+            _statistics_queryset(profile, scope, request.GET),
+            ordering=ordering,
+            cursor=request.GET.get('cursor', ''),
+            limit=limit,
+            nullable=STATISTICS_NULLABLE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Neplatný kurzor.'}, status=400)
+
+    data = {
+        'results': [_statistics_row(p) for p in rows],
+        'next_cursor': next_cursor,
+        'sort': sort,
+    }
+    if request.GET.get('html'):
+        data['html'] = ''.join(
+            render_to_string('fencers/partials/statistics_row.html', {'participation': p}, request=request)
+            for p in rows
+        )
+    return JsonResponse(data)
+
+
+# Chart series come from the pre-aggregated season rollups; `by` splits the
+# totals of each period by event type and/or event gender.
+STATISTICS_SERIES_SPLITS = ('event_type', 'gender')
+STATISTICS_SERIES_COLUMNS = (
+    'participations', 'events_count', 'wins', 'losses', 'touches_scored', 'touches_received',
+    'points', 'best_percentile', 'average_percentile',
+)
+
+
+def _statistics_series_rows(rollups, period, split):
+    """[period label, *split values, *STATISTICS_SERIES_COLUMNS] per period (and split), oldest first."""
+    grouped = (
+        rollups.values('period_start', 'season', *split)
+        .annotate(
+            s_participations=Sum('participations'),
+            s_events_count=Sum('events_count'),
+            s_wins=Sum('wins'),
+            s_losses=Sum('losses'),
+            s_touches_scored=Sum('touches_scored'),
+            s_touches_received=Sum('touches_received'),
+            s_points=Sum('points'),
+            s_best_percentile=Min('best_percentile'),
+            s_percentile_sum=Sum('percentile_sum'),
+            s_percentile_count=Sum('percentile_count'),
+        )
+        .order_by('period_start', *split)
+    )
+    rows = []
+    for row in grouped:
+        label = season_label(row['season']) if period == RollupPeriod.SEASON else row['period_start'].strftime('%Y-%m')
+        average = (
+            round_percentile(row['s_percentile_sum'] / row['s_percentile_count']) if row['s_percentile_count'] else None
+        )
+        rows.append([
+            label,
+            *(row[field] for field in split),
+            row['s_participations'],
+            row['s_events_count'],
+            row['s_wins'],
+            row['s_losses'],
+            row['s_touches_scored'],
+            row['s_touches_received'],
+            round(row['s_points'], 1),
+            row['s_best_percentile'],
+            average,
+        ])
+    return rows
+
+
+@login_required
+def statistics_series_api(request):
+    """Season or month time series from the rollup tables, as compact JSON or CSV.
+
+    Parameters: `scope` (fencer/club), `fencer` (a member of your club,
+    defaults to you), `period` (season/month), `by` (comma list of
+    event_type, gender), filters `event_type`, `gender`, `season_from`,
+    `season_to`, and `format=csv`.
+    """
+    profile = getattr(request.user, 'fencer_profile', None)
+    if not profile:
+        return JsonResponse({'error': 'Nejprve se prosím přiřaďte k profilu.'}, status=403)
+
+    scope = request.GET.get('scope', 'fencer')
+    if scope == 'fencer':
+        fencer = profile
+        fencer_id = request.GET.get('fencer', '')
+        if fencer_id and fencer_id != str(profile.id):
+            fencer = None
+            if fencer_id.isdigit() and profile.club_id:
+                fencer = FencerProfile.objects.filter(pk=fencer_id, club_id=profile.club_id).first()
+            if fencer is None:
+                return JsonResponse({'error': 'Šermíř nenalezen.'}, status=404)
+        rollups = FencerSeasonRollup.objects.filter(fencer=fencer)
+        subject = {'fencer': {'id': fencer.id, 'name': fencer.display_name}}
+    elif scope == 'club':
+        if not profile.club_id:
+            return JsonResponse({'error': 'Nemáte přiřazený klub.'}, status=404)
+        rollups = ClubSeasonRollup.objects.filter(club_id=profile.club_id)
+        subject = {'club': {'id': profile.club_id, 'name': profile.club.name}}
+    else:
+        return JsonResponse({'error': 'Neznámý rozsah.'}, status=400)
+
+    period = request.GET.get('period', RollupPeriod.SEASON)
+    if period not in RollupPeriod.values:
+        return JsonResponse({'error': 'Neznámé období.'}, status=400)
+    split = [field for field in STATISTICS_SERIES_SPLITS if field in request.GET.get('by', '').split(',')]
+
+    rollups = rollups.filter(period=period)
+    event_type = request.GET.get('event_type', '')
+    if event_type in Event.EventType.values:
+        rollups = rollups.filter(event_type=event_type)
+    gender = request.GET.get('gender', '')
+    if gender in Event.Gender.values:
+        rollups = rollups.filter(gender=gender)
+    for param, lookup in (('season_from', 'season__gte'), ('season_to', 'season__lte')):
+        season = parse_season(request.GET.get(param, ''))
+        if season is not None:
+            rollups = rollups.filter(**{lookup: season})
+
+    columns = ['period', *split, *STATISTICS_SERIES_COLUMNS]
+    rows = _statistics_series_rows(rollups, period, split)
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="statistiky-{scope}-{period}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(columns)
+        writer.writerows(['' if value is None else value for value in row] for row in rows)
+        return response
+    return JsonResponse({'scope': scope, **subject, 'period': period, 'columns': columns, 'rows': rows})
+
+
 @login_required
 def training_notes(request):
     user = request.user
@@ -949,70 +1320,104 @@ def event_photos(request):
     profile = getattr(request.user, "fencer_profile", None)
     if not profile:
         return redirect("match_profile")
-    # Get all albums
-    all_albums = PhotoAlbum.objects.all().select_related("event").order_by("-event__date")
-    
-    # Extract unique years from albums
-    years = sorted(set(
-        album.event.date.year for album in all_albums
-    ), reverse=True)
-    
+    albums = with_fallback_cover(PhotoAlbum.objects.select_related("event").order_by("-event__date"))
+    year_facets = get_album_year_facets()
+
     # Get filter year from request
-    filter_year = request.GET.get('year')
-    if filter_year:
-        try:
-            filter_year = int(filter_year)
-            albums = all_albums.filter(event__date__year=filter_year)
-        except (ValueError, TypeError):
-            albums = all_albums
-            filter_year = None
-    else:
-        albums = all_albums
+    try:
+        filter_year = int(request.GET.get('year') or 0) or None
+    except (ValueError, TypeError):
         filter_year = None
-    
+    if filter_year:
+        albums = albums.filter(event__date__year=filter_year)
+
     context = {
         'albums': albums,
-        'available_years': years,
+        'available_years': [year for year, _count in year_facets],
+        'year_facets': year_facets,
         'selected_year': filter_year,
     }
     return render(request, 'fencers/event_photos.html', context)
 
 
+def _subalbum_summaries(album, preview_size=SUBALBUM_PREVIEW_SIZE):
+    """Subalbums of `album` with photo_count, last_upload and preview_photos.
+
+    Counts come from one grouped query; the preview is a sliced prefetch
+    (one windowed query), so only `preview_size` photos per subalbum are loaded.
+    """
+    preview = (
+        EventPhoto.objects
+        .only('id', 'subalbum_id', 'photo', 'remote_image_url', 'thumbnail_url')
+        .order_by('-event_date', '-uploaded_at', '-id')[:preview_size]
+    )
+    subalbums = list(
+        album.subalbums.select_related('created_by')
+        .annotate(photo_count=Count('photos'), last_upload=Max('photos__uploaded_at'))
+        .prefetch_related(Prefetch('photos', queryset=preview, to_attr='preview_photos'))
+        .order_by('-created_at')
+    )
+    for subalbum in subalbums:
+        subalbum.more_photo_count = subalbum.photo_count - len(subalbum.preview_photos)
+    return subalbums
+
+
 @login_required
 def album_detail(request, album_id):
     profile = getattr(request.user, "fencer_profile", None)
     if not profile:
         return redirect("match_profile")
     album = get_object_or_404(PhotoAlbum.objects.select_related("event"), id=album_id)
-    subalbums = list(album.subalbums.all().prefetch_related('photos').order_by('-created_at'))
-    
-    # Get all photos from all subalbums for browsing
-    all_photos = EventPhoto.objects.filter(subalbum__album=album).select_related(
-        'subalbum',
-        'subalbum__album',
-        'subalbum__album__event',
-        'uploaded_by'
-    ).prefetch_related('likes', 'likes__fencer', 'likes__fencer__user').order_by('-uploaded_at')
-    
-    # Get user's liked photos for this album
-    user_liked_photo_ids = set(
-        PhotoLike.objects.filter(fencer=profile, photo__in=all_photos).values_list("photo_id", flat=True)
-    )
-    
+    subalbums = _subalbum_summaries(album)
+
     context = {
         'album': album,
         'subalbums': subalbums,
-        'all_photos': all_photos,
-        'user_liked_photo_ids': user_liked_photo_ids,
         'r2_enabled': r2_ready(),
-        'fencer_tag_options': _photo_tag_datalist_values(),
+        'presigned_uploads': presigned_uploads_ready(),
         'person_search_active': False,
         'person_search_selected_tags': [],
         'person_find_tag_options': [],
+        **_photo_feed_page(request, profile, "album", album=album, order=_photo_feed_order(request.GET)),
     }
     return render(request, 'fencers/album_detail.html', context)
 
 
+def _zip_download_response(entries, filename):
+    response = StreamingHttpResponse(stream_photos_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    return response
+
+
+def _zip_photos(queryset):
+    return (
+        queryset.only('id', 'title', 'photo', 'remote_image_url', 'uploaded_at', 'subalbum_id')
+        .order_by('uploaded_at', 'id')
+        .iterator(chunk_size=200)
+    )
+
+
+@login_required
+def download_album_zip(request, album_id):
+    """Every photo of an album as one ZIP, one folder per subalbum."""
+    album = get_object_or_404(PhotoAlbum.objects.select_related('event'), id=album_id)
+    subalbum_names = dict(album.subalbums.values_list('id', 'name'))
+
+    def entries():
+        for index, photo in enumerate(_zip_photos(EventPhoto.objects.filter(subalbum__album=album)), start=1):
+            yield photo, member_name(photo, index, folder=subalbum_names.get(photo.subalbum_id, ''))
+
+    return _zip_download_response(entries(), f"album-{album.id}-{slugify(album.event.title) or 'fotky'}")
+
+
+@login_required
+def download_subalbum_zip(request, subalbum_id):
+    subalbum = get_object_or_404(SubAlbum.objects.select_related('album__event'), id=subalbum_id)
+    photos = _zip_photos(EventPhoto.objects.filter(subalbum=subalbum))
+    entries = ((photo, member_name(photo, index)) for index, photo in enumerate(photos, start=1))
+    return _zip_download_response(entries, f"subalbum-{subalbum.id}-{slugify(subalbum.name) or 'fotky'}")
+
+
 @login_required
 @require_POST
 def create_subalbum(request, album_id):
@@ -1047,6 +1452,208 @@ def upload_photo(request, subalbum_id):
     return upload_photo_r2(request, subalbum_id)
 
 
+def _photo_duplicate_index(subalbum):
+    """DuplicateIndex of the subalbum's album, or None when PHOTO_DUPLICATE_POLICY is "off"."""
+    if settings.PHOTO_DUPLICATE_POLICY not in ('reject', 'flag'):
+        return None
+    return DuplicateIndex.for_album(subalbum.album, settings.PHOTO_DUPLICATE_MAX_DISTANCE)
+
+
+def _check_photo_duplicate(result, data, duplicates):
+    """Hash the photo into `result`; returns True if it must be rejected as a near-duplicate."""
+    try:
+        result['perceptual_hash'] = photo_dhash(data)
+    except Exception:
+        return False
+    if duplicates is None:
+        return False
+    is_duplicate, duplicate_of, duplicate_of_hash = duplicates.claim(result['perceptual_hash'])
+    if not is_duplicate:
+        result['hash_claimed'] = True
+        return False
+    if settings.PHOTO_DUPLICATE_POLICY == 'reject':
+        result['error'] = 'stejná fotka už v albu je'
+        return True
+    result['duplicate_of'] = duplicate_of
+    # A copy of another photo of this batch: linked once the batch rows exist.
+    result['duplicate_of_hash'] = duplicate_of_hash
+    return False
+
+
+def _release_photo_duplicate(result, duplicates):
+    """The photo was not stored after all: later copies in the batch may take its place."""
+    if result.pop('hash_claimed', False):
+        duplicates.release(result['perceptual_hash'])
+
+
+def _upload_one_photo_to_r2(client, photo_file, subalbum, duplicates=None):
+    """Upload one file (+ its variants); returns a per-file result dict, never raises."""
+    result = {'name': photo_file.name, 'ok': False, 'error': '', 'url': '', 'variant_urls': {}}
+    content_type = (getattr(photo_file, 'content_type', '') or '').strip().lower()
+    if not content_type.startswith('image/'):
+        result['error'] = 'soubor není obrázek'
+        return result
+    data = photo_file.read()
+    if _check_photo_duplicate(result, data, duplicates):
+        return result
+    object_key = build_event_photo_key(
+        event=subalbum.album.event,
+        subalbum=subalbum,
+        owner_profile=subalbum.created_by,
+        original_name=photo_file.name,
+    )
+    try:
+        stored = store_event_photo(
+            data=data,
+            object_key=object_key,
+            content_type=content_type,
+            client=client,
+        )
+    except Exception:
+        _release_photo_duplicate(result, duplicates)
+        result['error'] = 'nahrání do R2 selhalo'
+        return result
+    _apply_stored_photo(result, stored, data, client)
+    return result
+
+
+def _apply_stored_photo(result, stored, data, client):
+    """Fill a successful upload result from store_event_photo() and render its variants."""
+    result['variant_urls'] = safe_upload_event_photo_variants(
+        file_obj=data, object_key=stored['key'], client=client
+    )
+    result['placeholder'] = safe_render_placeholder(data)
+    result['metadata'] = safe_read_capture_metadata(data)
+    result['url'] = build_object_url(stored['key'])
+    result['original_bytes'] = stored['original_bytes']
+    result['stored_bytes'] = stored['stored_bytes']
+    result['ok'] = True
+
+
+def _upload_photo_files_to_r2(photo_files, subalbum):
+    """Upload a batch over a bounded thread pool sharing one client; results keep file order."""
+    client = get_r2_client()
+    duplicates = _photo_duplicate_index(subalbum)
+    workers = max(1, min(settings.R2_UPLOAD_WORKERS, len(photo_files)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            lambda f: _upload_one_photo_to_r2(client, f, subalbum, duplicates), photo_files
+        ))
+
+
+def _verify_presigned_photo(client, prefix, object_key, name, duplicates=None):
+    """HEAD one presigned upload, reject foreign keys/non-images, then render its variants."""
+    result = {'name': name, 'ok': False, 'error': '', 'url': '', 'variant_urls': {}}
+    file_part = object_key[len(prefix):] if object_key.startswith(prefix) else ''
+    if not file_part or '/' in file_part or is_variant_key(object_key):
+        result['error'] = 'neplatný klíč'
+        return result
+    try:
+        head = head_object(object_key, client=client)
+    except Exception:
+        result['error'] = 'úložiště není dostupné'
+        return result
+    if head is None:
+        result['error'] = 'soubor v úložišti nebyl nalezen'
+        return result
+    if not head['content_type'].startswith('image/') or not 0 < head['size'] <= settings.R2_MAX_UPLOAD_BYTES:
+        result['error'] = 'soubor není obrázek nebo je příliš velký'
+        try:
+            delete_object(object_key, client=client)
+        except Exception:
+            pass
+        return result
+    try:
+        data = read_object_bytes(object_key, client=client)
+        if _check_photo_duplicate(result, data, duplicates):
+            delete_object(object_key, client=client)
+            return result
+        stored = store_event_photo(data=data, object_key=object_key, in_bucket=True, client=client)
+    except Exception:
+        _release_photo_duplicate(result, duplicates)
+        result['error'] = 'úložiště není dostupné'
+        return result
+    _apply_stored_photo(result, stored, data, client)
+    return result
+
+
+def _create_photos_from_upload_results(request, results, subalbum, profile):
+    """bulk_create EventPhoto rows for the successful upload results; returns their count."""
+    title_base = request.POST.get('title', '').strip()
+    description = request.POST.get('description', '').strip()
+    tags = _parse_photo_tags_post(request.POST.get('tags', ''))
+    rows = []
+    for result in results:
+        if not result['ok']:
+            continue
+        stem, _ext = os.path.splitext(result['name'])
+        rows.append(EventPhoto(
+            title=(title_base or stem)[:200],
+            description=description,
+            remote_image_url=result['url'],
+            thumbnail_url=result['variant_urls'].get('thumb', ''),
+            medium_url=result['variant_urls'].get('medium', ''),
+            placeholder=result.get('placeholder', ''),
+            captured_at=result.get('metadata', {}).get('captured_at'),
+            width=result.get('metadata', {}).get('width'),
+            height=result.get('metadata', {}).get('height'),
+            original_bytes=result.get('original_bytes'),
+            stored_bytes=result.get('stored_bytes'),
+            perceptual_hash=result.get('perceptual_hash', ''),
+            duplicate_of_id=result.get('duplicate_of'),
+            event_date=subalbum.album.event.date,
+            uploaded_by=profile,
+            subalbum=subalbum,
+            tags=tags,
+        ))
+    if rows:
+        EventPhoto.bulk_create_tagged(rows)
+        _link_batch_duplicates(rows, [result for result in results if result['ok']])
+    return len(rows)
+
+
+def _link_batch_duplicates(rows, results):
+    """Point flagged copies of another photo in the same batch at that photo's new row."""
+    batch_ids = {
+        row.perceptual_hash: row.pk
+        for row, result in zip(rows, results)
+        if row.perceptual_hash and result.get('hash_claimed')
+    }
+    linked = []
+    for row, result in zip(rows, results):
+        # The matching photo may have failed to store; then there is nothing to point at.
+        duplicate_of = batch_ids.get(result.get('duplicate_of_hash'))
+        if duplicate_of:
+            row.duplicate_of_id = duplicate_of
+            linked.append(row)
+    if linked:
+        EventPhoto.objects.bulk_update(linked, ['duplicate_of'])
+
+
+def _upload_results_response(request, results, uploaded_count, subalbum):
+    """Per-file upload report: JSON for fetch() callers, messages + redirect for the form."""
+    if request.headers.get('Accept', '').startswith('application/json'):
+        # fetch() callers show the report themselves; queued messages would
+        # only surface on some later page load.
+        return JsonResponse({
+            'success': uploaded_count > 0,
+            'uploaded_count': uploaded_count,
+            'results': [
+                {'name': r['name'], 'ok': r['ok'], 'error': r['error']} for r in results
+            ],
+        })
+    for result in results:
+        if not result['ok']:
+            messages.error(request, f'Soubor "{result["name"]}" nebyl nahrán: {result["error"]}')
+    if uploaded_count == 1:
+        messages.success(request, '1 fotka byla nahrána.')
+    elif uploaded_count > 1:
+        messages.success(request, f'{uploaded_count} fotek bylo nahráno.')
+    else:
+        messages.warning(request, 'Žádná fotka nebyla nahrána do R2.')
+    return redirect('album_detail', album_id=subalbum.album.id)
+
+
 @login_required
 @require_POST
 def upload_photo_r2(request, subalbum_id):
@@ -1054,7 +1661,10 @@ def upload_photo_r2(request, subalbum_id):
     if not profile:
         messages.info(request, 'Nejprve se prosím přiřaďte k profilu.')
         return redirect('match_profile')
-    subalbum = get_object_or_404(SubAlbum.objects.select_related('album', 'album__event'), id=subalbum_id)
+    # created_by is read from the upload threads, so it must not be lazy-loaded there.
+    subalbum = get_object_or_404(
+        SubAlbum.objects.select_related('album', 'album__event', 'created_by'), id=subalbum_id
+    )
     if not r2_ready():
         messages.error(request, 'Úložiště není nakonfigurováno. Doplňte proměnné v .env.')
         return redirect('album_detail', album_id=subalbum.album.id)
@@ -1064,52 +1674,116 @@ def upload_photo_r2(request, subalbum_id):
         messages.error(request, 'Musíte vybrat alespoň jednu fotku.')
         return redirect('album_detail', album_id=subalbum.album.id)
 
-    title_base = request.POST.get('title', '').strip()
-    description = request.POST.get('description', '').strip()
-    tags = _parse_photo_tags_post(request.POST.get('tags', ''))
-    uploaded_count = 0
-    for photo_file in photo_files:
-        content_type = (getattr(photo_file, 'content_type', '') or '').strip().lower()
+    results = _upload_photo_files_to_r2(photo_files, subalbum)
+    uploaded_count = _create_photos_from_upload_results(request, results, subalbum, profile)
+    return _upload_results_response(request, results, uploaded_count, subalbum)
+
+
+@login_required
+@require_POST
+def presign_photo_uploads(request, subalbum_id):
+    """Presigned PUT URLs so the browser uploads photos straight to R2.
+
+    The form posts parallel `name`/`content_type`/`size` lists; 503 tells the
+    browser to fall back to the regular upload form.
+    """
+    profile = getattr(request.user, 'fencer_profile', None)
+    if not profile:
+        return JsonResponse({'error': 'Nejprve se prosím přiřaďte k profilu.'}, status=403)
+    subalbum = get_object_or_404(
+        SubAlbum.objects.select_related('album', 'album__event', 'created_by'), id=subalbum_id
+    )
+    if not presigned_uploads_ready():
+        return JsonResponse({'error': 'Přímé nahrávání není k dispozici.'}, status=503)
+
+    names = request.POST.getlist('name')
+    content_types = request.POST.getlist('content_type')
+    sizes = request.POST.getlist('size')
+    if not names or not (len(names) == len(content_types) == len(sizes)):
+        return JsonResponse({'error': 'Chybí seznam souborů.'}, status=400)
+    if len(names) > PRESIGNED_UPLOAD_MAX_FILES:
+        return JsonResponse({'error': f'Najednou lze nahrát nejvýše {PRESIGNED_UPLOAD_MAX_FILES} fotek.'}, status=400)
+
+    client = get_r2_client()
+    uploads = []
+    for name, content_type, size in zip(names, content_types, sizes):
+        content_type = content_type.strip().lower()
         if not content_type.startswith('image/'):
+            uploads.append({'name': name, 'error': 'soubor není obrázek'})
+            continue
+        try:
+            size = int(size)
+        except ValueError:
+            size = 0
+        if size <= 0 or size > settings.R2_MAX_UPLOAD_BYTES:
+            uploads.append({'name': name, 'error': 'soubor je prázdný nebo příliš velký'})
             continue
         object_key = build_event_photo_key(
             event=subalbum.album.event,
             subalbum=subalbum,
             owner_profile=subalbum.created_by,
-            original_name=photo_file.name,
+            original_name=name,
         )
-        try:
-            upload_image_to_r2(
-                file_obj=photo_file,
-                object_key=object_key,
-                content_type=content_type,
-            )
-            public_url = build_object_url(object_key)
-            stem, _ext = os.path.splitext(photo_file.name)
-            row_title = (title_base or stem)[:200]
-            EventPhoto.objects.create(
-                title=row_title,
-                description=description,
-                remote_image_url=public_url,
-                event_date=subalbum.album.event.date,
-                uploaded_by=profile,
-                subalbum=subalbum,
-                tags=tags,
-            )
-            uploaded_count += 1
-        except Exception:
-            messages.error(
-                request,
-                f'Nepodařilo se nahrát soubor "{photo_file.name}" do R2.',
-            )
+        uploads.append({
+            'name': name,
+            'key': object_key,
+            'url': presign_upload_url(object_key=object_key, content_type=content_type, client=client),
+            'headers': {'Content-Type': content_type},
+        })
+    return JsonResponse({'uploads': uploads})
 
-    if uploaded_count == 1:
-        messages.success(request, '1 fotka byla nahrána.')
-    elif uploaded_count > 1:
-        messages.success(request, f'{uploaded_count} fotek bylo nahráno.')
-    else:
-        messages.warning(request, 'Žádná fotka nebyla nahrána do R2.')
-    return redirect('album_detail', album_id=subalbum.album.id)
+
+@login_required
+@require_POST
+def complete_photo_uploads(request, subalbum_id):
+    """Verify objects the browser PUT to presigned URLs and create their EventPhoto rows."""
+    profile = getattr(request.user, 'fencer_profile', None)
+    if not profile:
+        return JsonResponse({'error': 'Nejprve se prosím přiřaďte k profilu.'}, status=403)
+    subalbum = get_object_or_404(
+        SubAlbum.objects.select_related('album', 'album__event', 'created_by'), id=subalbum_id
+    )
+    if not presigned_uploads_ready():
+        return JsonResponse({'error': 'Přímé nahrávání není k dispozici.'}, status=503)
+
+    keys = request.POST.getlist('key')
+    names = request.POST.getlist('name')
+    if not keys or len(keys) != len(names) or len(keys) > PRESIGNED_UPLOAD_MAX_FILES:
+        return JsonResponse({'error': 'Chybí seznam nahraných souborů.'}, status=400)
+
+    # A retried completion must not create (or re-render) the same photo twice.
+    # The row may point at the key itself or at its normalized WebP sibling.
+    candidate_urls = {key: (build_object_url(key), build_object_url(normalized_photo_key(key))) for key in keys}
+    known_urls = set(
+        EventPhoto.objects.filter(
+            remote_image_url__in=[url for urls in candidate_urls.values() for url in urls]
+        ).values_list('remote_image_url', flat=True)
+    )
+    # Results keep the request's order; the client matches them to its files.
+    results = [None] * len(keys)
+    pending = []
+    seen_keys = set()
+    for index, (key, name) in enumerate(zip(keys, names)):
+        # The same key twice in one request is one photo, not two.
+        if key in seen_keys or known_urls.intersection(candidate_urls[key]):
+            results[index] = {'name': name, 'ok': False, 'error': 'fotka už je v albu', 'url': '', 'variant_urls': {}}
+        else:
+            seen_keys.add(key)
+            pending.append((index, key, name))
+
+    if pending:
+        prefix = build_subalbum_prefix(subalbum.album.event, subalbum, subalbum.created_by)
+        client = get_r2_client()
+        duplicates = _photo_duplicate_index(subalbum)
+        workers = max(1, min(settings.R2_UPLOAD_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            verified = pool.map(
+                lambda item: _verify_presigned_photo(client, prefix, *item[1:], duplicates=duplicates), pending
+            )
+            for (index, _key, _name), result in zip(pending, verified):
+                results[index] = result
+    uploaded_count = _create_photos_from_upload_results(request, results, subalbum, profile)
+    return _upload_results_response(request, results, uploaded_count, subalbum)
 
 
 @login_required
@@ -1804,27 +2478,31 @@ def toggle_photo_like(request, photo_id):
     
     photo = get_object_or_404(EventPhoto, id=photo_id)
     
-    like, created = PhotoLike.objects.get_or_create(
-        photo=photo,
-        fencer=profile
-    )
-    
-    if not created:
-        # Unlike - delete the like
-        like.delete()
-        is_liked = False
-    else:
-        # Like - keep it
-        is_liked = True
+    with transaction.atomic():
+        like, created = PhotoLike.objects.get_or_create(
+            photo=photo,
+            fencer=profile
+        )
+        
+        if not created:
+            # Unlike - delete the like (a concurrent unlike may have won the race)
+            deleted, _ = PhotoLike.objects.filter(pk=like.pk).delete()
+            if deleted:
+                EventPhoto.objects.filter(pk=photo.pk, like_count__gt=0).update(
+                    like_count=F('like_count') - 1
+                )
+            is_liked = False
+        else:
+            # Like - keep it
+            EventPhoto.objects.filter(pk=photo.pk).update(like_count=F('like_count') + 1)
+            is_liked = True
     
-    like_count = photo.get_like_count()
+    photo.refresh_from_db(fields=['like_count'])
+    like_count = photo.like_count
     recent_likes = list(
-        photo.likes.select_related('fencer', 'fencer__user').order_by('-created_at')[:5]
+        photo.likes.select_related('fencer').order_by('-created_at', '-id')[:PHOTO_TOP_LIKERS]
     )
-    liked_users = []
-    for like_obj in recent_likes:
-        if like_obj.fencer:
-            liked_users.append(like_obj.fencer.display_name)
+    liked_users = [like_obj.fencer.display_name for like_obj in recent_likes]
     remaining_likes = max(like_count - len(liked_users), 0)
     
     return JsonResponse({
@@ -1836,6 +2514,25 @@ def toggle_photo_like(request, photo_id):
     })
 
 
+@login_required
+def photo_likers_api(request, photo_id):
+    """Everyone who liked a photo, newest first; loaded when the liker tooltip is expanded."""
+    photo = get_object_or_404(EventPhoto.objects.only('id', 'like_count'), id=photo_id)
+    likes = (
+        PhotoLike.objects.filter(photo=photo)
+        .select_related('fencer')
+        .only('created_at', 'fencer__id', 'fencer__first_name', 'fencer__last_name')
+        .order_by('-created_at', '-id')
+    )
+    return JsonResponse({
+        'like_count': photo.like_count,
+        'likers': [
+            {'name': like.fencer.display_name, 'liked_at': like.created_at.isoformat()}
+            for like in likes
+        ],
+    })
+
+
 @login_required
 def my_favorite_photos(request):
     """View for 'Moje oblíbené' - user's liked photos"""
@@ -1844,27 +2541,13 @@ def my_favorite_photos(request):
         messages.info(request, 'Nejprve se prosím přiřaďte k profilu.')
         return redirect('match_profile')
     
-    # Get all photos liked by the current fencer
-    liked_photos = EventPhoto.objects.filter(
-        likes__fencer=profile
-    ).select_related(
-        'subalbum',
-        'subalbum__album',
-        'subalbum__album__event',
-        'uploaded_by'
-    ).prefetch_related('likes', 'likes__fencer', 'likes__fencer__user').distinct().order_by('-likes__created_at')
-    
-    user_liked_photo_ids = set([photo.id for photo in liked_photos])
-    
     context = {
-        'all_photos': liked_photos,
-        'user_liked_photo_ids': user_liked_photo_ids,
         'is_special_album': True,
         'album_title': 'Moje oblíbené',
-        'fencer_tag_options': _photo_tag_datalist_values(),
         'person_search_active': False,
         'person_search_selected_tags': [],
         'person_find_tag_options': [],
+        **_photo_feed_page(request, profile, "favorites"),
     }
     return render(request, 'fencers/album_detail.html', context)
 
@@ -1876,83 +2559,102 @@ def most_liked_photos(request):
     if not profile:
         return redirect("match_profile")
 
-    # Get all photos with at least 1 like, ordered by like count
-    liked_photos = EventPhoto.objects.annotate(
-        like_count=Count('likes')
-    ).filter(
-        like_count__gte=1
-    ).select_related(
-        'subalbum',
-        'subalbum__album',
-        'subalbum__album__event',
-        'uploaded_by'
-    ).prefetch_related('likes', 'likes__fencer', 'likes__fencer__user').order_by('-like_count', '-uploaded_at')
-    
-    user_liked_photo_ids = set(
-        PhotoLike.objects.filter(fencer=profile, photo__in=liked_photos).values_list("photo_id", flat=True)
-    )
-
     context = {
-        'all_photos': liked_photos,
-        'user_liked_photo_ids': user_liked_photo_ids,
         'is_special_album': True,
         'album_title': 'Nejoblíbenější fotky',
-        'fencer_tag_options': _photo_tag_datalist_values(),
         'person_search_active': False,
         'person_search_selected_tags': [],
         'person_find_tag_options': [],
+        **_photo_feed_page(request, profile, "most_liked"),
     }
     return render(request, 'fencers/album_detail.html', context)
 
 
 @login_required
 def find_person_photos(request):
-    """Photos that match any of the selected tag strings (OR)."""
+    """Photos tagged with any (OR) or all (AND) of the selected tags."""
     profile = getattr(request.user, "fencer_profile", None)
     if not profile:
         return redirect("match_profile")
 
     tag_terms = [t.strip() for t in request.GET.getlist("tags") if t.strip()]
-    all_photos = EventPhoto.objects.none()
-    if tag_terms:
-        q_combined = Q()
-        for t in tag_terms:
-            q_combined |= Q(tags_search__icontains=t.casefold())
-        all_photos = (
-            EventPhoto.objects.filter(q_combined)
-            .distinct()
-            .select_related(
-                "subalbum",
-                "subalbum__album",
-                "subalbum__album__event",
-                "uploaded_by",
-            )
-            .prefetch_related("likes", "likes__fencer", "likes__fencer__user")
-            .order_by("-uploaded_at")
-        )
-
-    user_liked_photo_ids = set()
-    if all_photos:
-        user_liked_photo_ids = set(
-            PhotoLike.objects.filter(fencer=profile, photo__in=all_photos).values_list(
-                "photo_id", flat=True
-            )
-        )
+    tag_mode, tag_match = _photo_tag_search_params(request.GET)
 
     context = {
-        "all_photos": all_photos,
-        "user_liked_photo_ids": user_liked_photo_ids,
         "is_special_album": True,
         "album_title": "Najít podle jména",
         "person_search_active": True,
         "person_search_selected_tags": tag_terms,
-        "person_find_tag_options": _photo_tag_options_for_find(),
-        "fencer_tag_options": _photo_tag_datalist_values(),
+        "person_search_mode": tag_mode,
+        "person_search_match": tag_match,
+        "person_find_tag_options": get_used_tag_labels(),
         "r2_enabled": r2_ready(),
+        **_photo_feed_page(
+            request, profile, "person", tag_terms=tag_terms, tag_mode=tag_mode, tag_match=tag_match
+        ),
     }
     return render(request, "fencers/album_detail.html", context)
 
 
+@login_required
+def photo_feed_api(request):
+    """Next page of a photo listing (JSON) for the gallery's infinite scroll."""
+    profile = getattr(request.user, "fencer_profile", None)
+    if not profile:
+        return JsonResponse({"error": "Nejprve se prosím přiřaďte k profilu."}, status=403)
+
+    scope = request.GET.get("scope", "album")
+    if scope not in PHOTO_FEED_SCOPES:
+        return JsonResponse({"error": "Neznámý výpis fotek."}, status=400)
+    album = None
+    if scope == "album":
+        try:
+            album_id = int(request.GET.get("album", ""))
+        except ValueError:
+            return JsonResponse({"error": "Chybí album."}, status=400)
+        album = get_object_or_404(PhotoAlbum, id=album_id)
+    tag_terms = [t.strip() for t in request.GET.getlist("tags") if t.strip()]
+    tag_mode, tag_match = _photo_tag_search_params(request.GET)
+
+    next_url = request.GET.get("next", "")
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse("event_photos")
+
+    try:
+        page = _photo_feed_page(
+            request,
+            profile,
+            scope,
+            album=album,
+            tag_terms=tag_terms,
+            tag_mode=tag_mode,
+            tag_match=tag_match,
+            cursor=request.GET.get("cursor", ""),
+            next_url=next_url,
+            order=_photo_feed_order(request.GET),
+        )
+    except InvalidCursor:
+        return JsonResponse({"error": "Neplatný kurzor."}, status=400)
+
+    html = "".join(
+        render_to_string("fencers/partials/photo_card.html", {**page, "photo": photo}, request=request)
+        for photo in page["all_photos"]
+    )
+    return JsonResponse({
+        "photos": [_serialize_photo(p, page["user_liked_photo_ids"]) for p in page["all_photos"]],
+        "html": html,
+        "next_cursor": page["photos_next_cursor"],
+    })
+
+
+@login_required
+def photo_tag_vocabulary_api(request):
+    """Tag suggestions (photo tags with usage counts + fencer short names) as JSON."""
+    response = JsonResponse({"tags": get_tag_vocabulary()})
+    response["Cache-Control"] = "private, max-age=60"
+    return response
+
+
 @login_required
 @require_POST
 def update_photo_tags(request, photo_id):
@@ -1976,6 +2678,72 @@ def update_photo_tags(request, photo_id):
     return redirect("event_photos")
 
 
+PHOTO_BULK_TAG_ACTIONS = ("add", "remove", "replace")
+PHOTO_BULK_TAG_MAX_PHOTOS = 500
+
+
+@login_required
+@require_POST
+def bulk_update_photo_tags(request):
+    """Add, remove or replace tags on many photos in one transaction (album multi-select).
+
+    Posts a `photo_id` list, `action` (add/remove/replace) and comma-separated
+    `tags`; answers with the resulting tags of every updated photo.
+    """
+    profile = getattr(request.user, "fencer_profile", None)
+    if not profile:
+        return JsonResponse({"error": "Nejprve se prosím přiřaďte k profilu."}, status=403)
+
+    action = request.POST.get("action", "")
+    if action not in PHOTO_BULK_TAG_ACTIONS:
+        return JsonResponse({"error": "Neznámá akce."}, status=400)
+    try:
+        photo_ids = {int(value) for value in request.POST.getlist("photo_id")}
+    except ValueError:
+        return JsonResponse({"error": "Neplatný seznam fotek."}, status=400)
+    if not photo_ids:
+        return JsonResponse({"error": "Nejsou vybrané žádné fotky."}, status=400)
+    if len(photo_ids) > PHOTO_BULK_TAG_MAX_PHOTOS:
+        return JsonResponse(
+            {"error": f"Najednou lze upravit nejvýše {PHOTO_BULK_TAG_MAX_PHOTOS} fotek."}, status=400
+        )
+    tags = _parse_photo_tags_post(request.POST.get("tags", ""))
+    if not tags and action != "replace":
+        return JsonResponse({"error": "Zadejte alespoň jeden štítek."}, status=400)
+
+    remove_keys = {photo_tag_key(tag) for tag in tags}
+    with transaction.atomic():
+        photos = list(
+            EventPhoto.objects.select_for_update()
+            .filter(id__in=photo_ids)
+            .only("id", "tags", "tags_search")
+            .order_by("id")
+        )
+        for photo in photos:
+            if action == "replace":
+                photo.tags = list(tags)
+            elif action == "add":
+                photo.tags = list(photo.tags or []) + tags
+            else:
+                photo.tags = [t for t in photo.tags or [] if photo_tag_key(t) not in remove_keys]
+        EventPhoto.bulk_update_tags(photos)
+
+    return JsonResponse({
+        "updated": len(photos),
+        "photos": [{"id": photo.id, "tags": photo.tags} for photo in photos],
+    })
+
+
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, path):
+    """Uploaded files under MEDIA_URL.
+
+    Access is decided by RequireFencerProfileMiddleware (logged in and paired
+    to a profile) before this view runs; it only serves the file.
+    """
+    return media_response(request, path)
+
+
 @login_required
 def news_list(request):
     """API endpoint to get list of news items for dropdown"""
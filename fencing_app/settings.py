@@ -101,6 +101,15 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # Media files (user uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# New uploads get a content hash in their name, so /media/ can cache them as immutable.
+STORAGES = {
+    'default': {'BACKEND': 'fencers.media_files.ContentHashedFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Hand /media/ files to the front server after the access check: an nginx
+# internal location (X-Accel-Redirect) or e.g. "X-Sendfile" for Apache/lighttpd.
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='')
+MEDIA_SENDFILE_HEADER = config('MEDIA_SENDFILE_HEADER', default='')
 
 # Cloudflare R2 (opt-in, parallel to local /media storage)
 R2_ENABLED = config('R2_ENABLED', default=False, cast=bool)
@@ -109,6 +118,26 @@ R2_SECRET_ACCESS_KEY = config('R2_SECRET_ACCESS_KEY', default='')
 R2_BUCKET_NAME = config('R2_BUCKET_NAME', default='')
 R2_ENDPOINT_URL = config('R2_ENDPOINT_URL', default='')
 R2_PUBLIC_BASE_URL = config('R2_PUBLIC_BASE_URL', default='')
+# Parallel uploads per multi-file photo upload request.
+R2_UPLOAD_WORKERS = config('R2_UPLOAD_WORKERS', default=4, cast=int)
+# Shared per-process R2 client: connection pool size, retries and timeouts (seconds).
+R2_MAX_POOL_CONNECTIONS = config('R2_MAX_POOL_CONNECTIONS', default=20, cast=int)
+R2_MAX_ATTEMPTS = config('R2_MAX_ATTEMPTS', default=3, cast=int)
+R2_CONNECT_TIMEOUT = config('R2_CONNECT_TIMEOUT', default=5, cast=float)
+R2_READ_TIMEOUT = config('R2_READ_TIMEOUT', default=30, cast=float)
+# Browser uploads straight to R2 via presigned PUT URLs (needs a CORS rule on the bucket).
+R2_PRESIGNED_UPLOADS = config('R2_PRESIGNED_UPLOADS', default=False, cast=bool)
+R2_PRESIGN_EXPIRES = config('R2_PRESIGN_EXPIRES', default=900, cast=int)
+R2_MAX_UPLOAD_BYTES = config('R2_MAX_UPLOAD_BYTES', default=30 * 1024 * 1024, cast=int)
+# Re-encode uploaded photos to WebP (EXIF rotation applied, metadata stripped, longest edge capped).
+R2_NORMALIZE_UPLOADS = config('R2_NORMALIZE_UPLOADS', default=False, cast=bool)
+R2_NORMALIZE_MAX_EDGE = config('R2_NORMALIZE_MAX_EDGE', default=2560, cast=int)
+R2_NORMALIZE_QUALITY = config('R2_NORMALIZE_QUALITY', default=82, cast=int)
+R2_KEEP_ORIGINALS = config('R2_KEEP_ORIGINALS', default=False, cast=bool)
+# Near-duplicate photo uploads within one album: "reject", "flag" (store with duplicate_of) or "off".
+PHOTO_DUPLICATE_POLICY = config('PHOTO_DUPLICATE_POLICY', default='reject')
+# Max differing bits (of 64) between perceptual hashes to count as the same shot.
+PHOTO_DUPLICATE_MAX_DISTANCE = config('PHOTO_DUPLICATE_MAX_DISTANCE', default=4, cast=int)
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,17 +1,22 @@
 """
 URL configuration for fencing_app project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from fencers.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Media is served in every environment: RequireFencerProfileMiddleware gates it.
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='serve_media'),
     path('', include('fencers.urls')),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 